@@ -0,0 +1,56 @@
+"""Benchmark edition -> workshop assignment: per-edition scans against one groupby
+
+Run from the repository root:
+    python benchmarks/bench_editions.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SRC_DIR)
+
+from abox_stages import workshop_editions
+
+SAMPLE_EDITIONS = 200
+PAPERS_PER_EDITION = 3
+
+def synthetic_editions(n_editions):
+    """Edition ids and a conference-paper table with PAPERS_PER_EDITION papers per edition"""
+    rng = np.random.default_rng(0)
+    edition_ids = pd.Series([f"edition{i}" for i in range(n_editions)])
+    n_papers = n_editions * PAPERS_PER_EDITION
+    papers = pd.DataFrame({
+        'DOI': [f"10.0000/paper{i}" for i in range(n_papers)],
+        'Edition_id': edition_ids.to_numpy()[rng.integers(0, n_editions, n_papers)],
+    })
+    workshop_paper_dois = set(papers['DOI'].sample(frac=1 / 3, random_state=0))
+    return edition_ids, papers, workshop_paper_dois
+
+def scan(edition_ids, papers, workshop_paper_dois):
+    """The original loop: filter the paper table once per edition"""
+    for edition_id in edition_ids:
+        edition_papers = papers[papers['Edition_id'] == str(edition_id)]
+        any(doi in workshop_paper_dois for doi in edition_papers['DOI'])
+
+def run(n_editions):
+    edition_ids, papers, workshop_paper_dois = synthetic_editions(n_editions)
+    sample = edition_ids.sample(min(SAMPLE_EDITIONS, n_editions), random_state=0)
+    start = time.perf_counter()
+    scan(sample, papers, workshop_paper_dois)
+    scan_total = (time.perf_counter() - start) / len(sample) * n_editions
+
+    start = time.perf_counter()
+    edition_ids.map(workshop_editions(papers, workshop_paper_dois)).fillna(False)
+    grouped_total = time.perf_counter() - start
+
+    print(f"{n_editions:>7} editions | {len(papers):>7} papers | scan {scan_total:9.2f}s | "
+          f"groupby {grouped_total:6.3f}s | speedup {scan_total / grouped_total:8.0f}x")
+
+if __name__ == "__main__":
+    print(f"Edition -> workshop assignment (scans extrapolated from {SAMPLE_EDITIONS} sampled editions)")
+    for n_editions in (1_000, 10_000, 100_000):
+        run(n_editions)
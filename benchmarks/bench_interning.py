@@ -0,0 +1,42 @@
+"""Benchmark peak RSS of the ABox build: rdflib Graph against interned triples
+
+Runs generate_abox.py in a subprocess on scaled copies of the data, writing
+N-Triples, once with the in-memory graph and once with --intern. Run from the
+repository root (optionally pass the scale factors):
+    python benchmarks/bench_interning.py 1 5
+"""
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+
+from scaled_data import write_scaled_data
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+MODES = {"graph": [], "interned": ["--intern"]}
+
+def run(workdir, extra_args):
+    """Run generate_abox.py in workdir and return (seconds, peak RSS in MB)"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, os.path.join(SRC_DIR, "generate_abox.py"), "--seed", "7", "--formats", "nt",
+         "--no-cache"] + extra_args,
+        cwd=workdir, capture_output=True, text=True, check=True)
+    seconds = time.perf_counter() - start
+    return seconds, float(re.search(r"Peak RSS: (\d+) MB", result.stdout).group(1))
+
+if __name__ == "__main__":
+    factors = [int(f) for f in sys.argv[1:]] or [1, 5]
+    print("ABox build to N-Triples, peak RSS per mode")
+    for factor in factors:
+        with tempfile.TemporaryDirectory() as root:
+            write_scaled_data(factor, os.path.join(root, "data"))
+            workdir = os.path.join(root, "run")
+            os.makedirs(workdir)
+            results = {mode: run(workdir, args) for mode, args in MODES.items()}
+        line = " | ".join(f"{mode} {seconds:6.1f}s {rss:6.0f} MB" for mode, (seconds, rss) in results.items())
+        saved = 1 - results["interned"][1] / results["graph"][1]
+        print(f"{factor:>4}x | {line} | RSS -{saved:.0%}")
@@ -0,0 +1,114 @@
+"""Triple/byte savings of --elide-inverses, and a check that queries still answer the same
+
+Generates the ABox twice on a scaled corpus (see scaled_data.py), once in full and
+once with --elide-inverses, plus the TBox with --declare-inverses. The elided
+ABox is then completed both ways it is meant to be used:
+    reasoning     the owl:inverseOf axioms of the TBox applied to it, as an OWL
+                  store infers them (rules prp-inv1/prp-inv2)
+    materialized  load_store.py --materialize-inverses (materialize.with_inverse_lines)
+and each SPARQL query below must return the same rows on both as on the full
+ABox (exit code 1 otherwise). Run from the repository root:
+    python benchmarks/bench_inverse_elision.py
+    python benchmarks/bench_inverse_elision.py --scale 5
+"""
+import argparse
+import gzip
+import os
+import sys
+import tempfile
+
+from rdflib import Graph, OWL
+
+from bench_pipeline import SRC_DIR, run_script
+from scaled_data import write_scaled_data
+
+sys.path.insert(0, SRC_DIR)
+from materialize import with_inverse_lines
+
+PREFIX = "PREFIX res: <http://research.org/research#>\n"
+
+# Each query reads at least one property of an inverse pair, most of them the elided side
+QUERIES = {
+    "citedBy pairs": "SELECT ?paper ?citing WHERE { ?paper res:citedBy ?citing }",
+    "most cited": "SELECT ?paper (COUNT(?citing) AS ?n) WHERE { ?paper res:citedBy ?citing } GROUP BY ?paper",
+    "cites/citedBy agree": "SELECT ?a ?b WHERE { ?a res:cites ?b . ?b res:citedBy ?a }",
+    "volumes of journals": "SELECT ?volume ?journal WHERE { ?volume res:volumeOf ?journal }",
+    "journal papers": """SELECT ?paper ?journal WHERE {
+        ?paper res:publishedInVolume ?volume . ?volume res:volumeOf ?journal }""",
+    "editions of events": "SELECT ?edition ?event WHERE { ?edition res:editionOf ?event }",
+    "events per city": """SELECT ?city (COUNT(DISTINCT ?event) AS ?n) WHERE {
+        ?edition res:editionOf ?event ; res:heldInCity ?city } GROUP BY ?city""",
+    "hasEdition pairs": "SELECT ?event ?edition WHERE { ?event res:hasEdition ?edition }",
+}
+
+def parse_nt(lines):
+    g = Graph()
+    g.parse(data="".join(lines), format="nt")
+    return g
+
+def apply_inverse_axioms(abox, tbox):
+    """abox plus (o q s) for every (s p o) where p owl:inverseOf q or q owl:inverseOf p"""
+    g = Graph()
+    g += abox
+    for p, q in tbox.subject_objects(OWL.inverseOf):
+        for s, o in abox.subject_objects(p):
+            g.add((o, q, s))
+        for s, o in abox.subject_objects(q):
+            g.add((o, p, s))
+    return g
+
+def file_sizes(path):
+    """(triples, bytes, gzip bytes) of an N-Triples file"""
+    with open(path, "rb") as f:
+        data = f.read()
+    return data.count(b"\n"), len(data), len(gzip.compress(data, 6))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Savings and query equivalence of --elide-inverses")
+    parser.add_argument("--scale", type=int, default=1, help="corpus scale factor (default: %(default)s)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        write_scaled_data(args.scale, os.path.join(root, 'data'))
+        full_dir, elided_dir = os.path.join(root, 'full'), os.path.join(root, 'elided')
+        os.makedirs(full_dir)
+        os.makedirs(elided_dir)
+        run_script('generate_tbox.py', elided_dir, ["--formats", "nt", "--declare-inverses"])
+        run_script('generate_abox.py', full_dir, ["--seed", "7", "--stream", "nt", "--no-cache"])
+        run_script('generate_abox.py', elided_dir, ["--seed", "7", "--stream", "nt", "--no-cache", "--elide-inverses"])
+
+        # --- SAVINGS --- #
+        full_path, elided_path = os.path.join(full_dir, 'abox.nt'), os.path.join(elided_dir, 'abox.nt')
+        full_size, elided_size = file_sizes(full_path), file_sizes(elided_path)
+        print(f"{'':>10} {'triples':>10} {'bytes':>13} {'gzip bytes':>12}")
+        print(f"{'full':>10} {full_size[0]:>10} {full_size[1]:>13,} {full_size[2]:>12,}")
+        print(f"{'elided':>10} {elided_size[0]:>10} {elided_size[1]:>13,} {elided_size[2]:>12,}")
+        saved = [full - elided for full, elided in zip(full_size, elided_size)]
+        print(f"{'saved':>10} {saved[0]:>10} {saved[1]:>13,} {saved[2]:>12,}")
+        print(f"{'':>10} {saved[0] / full_size[0]:>10.1%} {saved[1] / full_size[1]:>13.1%} "
+              f"{saved[2] / full_size[2]:>12.1%}")
+
+        # --- QUERY EQUIVALENCE --- #
+        with open(full_path, encoding="utf-8") as f:
+            full = parse_nt(f)
+        with open(elided_path, encoding="utf-8") as f:
+            elided_lines = f.readlines()
+        tbox = Graph().parse(os.path.join(elided_dir, 'tbox.nt'), format="nt")
+        completed = {
+            "reasoning": apply_inverse_axioms(parse_nt(elided_lines), tbox),
+            "materialized": parse_nt(with_inverse_lines(elided_lines)),
+        }
+
+    failed = False
+    print(f"\n{'query':<22} {'rows':>7}  " + "  ".join(f"{mode:<12}" for mode in completed))
+    for name, query in QUERIES.items():
+        expected = sorted(full.query(PREFIX + query))
+        outcomes = ["same" if sorted(g.query(PREFIX + query)) == expected else "DIFFERENT" for g in completed.values()]
+        failed |= "DIFFERENT" in outcomes
+        print(f"{name:<22} {len(expected):>7}  " + "  ".join(f"{outcome:<12}" for outcome in outcomes))
+    for mode, g in completed.items():
+        if set(g) != set(full):
+            print(f"{mode}: the completed ABox differs from the full one in {len(set(g) ^ set(full))} triples")
+            failed = True
+    if failed:
+        sys.exit(1)
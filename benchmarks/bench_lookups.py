@@ -0,0 +1,70 @@
+"""Benchmark DataFrame mask scans against the prebuilt lookup indexes
+
+Run from the repository root:
+    python benchmarks/bench_lookups.py
+"""
+import os
+import sys
+import time
+
+import pandas as pd
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+sys.path.insert(0, SRC_DIR)
+
+from helpers import clean_series_for_uri
+from lookups import build_author_index, build_paper_index
+
+SAMPLE_LOOKUPS = 200
+
+def blow_up(authors_df, papers_df, factor):
+    """Replicate the author and paper tables `factor` times with distinct keys"""
+    if factor == 1:
+        return authors_df, papers_df
+    authors = []
+    papers = []
+    for i in range(factor):
+        a = authors_df.copy()
+        a['Author_ID'] = a['Author_ID'] + i * 10**11
+        authors.append(a)
+        p = papers_df.copy()
+        p['DOI'] = f"x{i}/" + p['DOI'].astype(str)
+        papers.append(p)
+    return pd.concat(authors, ignore_index=True), pd.concat(papers, ignore_index=True)
+
+def time_per_lookup(fn, keys):
+    start = time.perf_counter()
+    for key in keys:
+        fn(key)
+    return (time.perf_counter() - start) / len(keys)
+
+def run(factor, authors_df, papers_df):
+    authors_df, papers_df = blow_up(authors_df, papers_df, factor)
+    author_keys = authors_df['Author_ID'].dropna().sample(SAMPLE_LOOKUPS, random_state=0).astype('int64').tolist()
+    paper_keys = papers_df['DOI'].sample(SAMPLE_LOOKUPS, random_state=0).astype(str).tolist()
+
+    scan_author = time_per_lookup(lambda k: authors_df[authors_df['Author_ID'] == k], author_keys)
+    scan_paper = time_per_lookup(lambda k: papers_df[papers_df['DOI'] == k], paper_keys)
+
+    # The stages resolve every distinct author and paper once, in bulk
+    start = time.perf_counter()
+    author_index = build_author_index(authors_df)
+    paper_index = build_paper_index(papers_df)
+    author_index.loc[authors_df['Author_ID'].dropna().astype('int64').unique()]
+    paper_index.loc[clean_series_for_uri(papers_df['DOI']).unique()]
+    index_total = time.perf_counter() - start
+
+    n_authors = len(author_index)
+    n_papers = len(paper_index)
+    scan_total = scan_author * n_authors + scan_paper * n_papers
+
+    print(f"{factor:>4}x | {n_authors:>9} authors | {n_papers:>8} papers | "
+          f"scan {scan_total:9.2f}s | index {index_total:7.3f}s | speedup {scan_total / index_total:9.0f}x")
+
+if __name__ == "__main__":
+    authors_df = pd.read_csv(os.path.join(DATA_DIR, 'Author_nodes.csv'))
+    papers_df = pd.read_csv(os.path.join(DATA_DIR, 'Paper_nodes.csv'))
+    print(f"Authorship-stage lookup cost (mask scans extrapolated from {SAMPLE_LOOKUPS} sampled lookups per table)")
+    for factor in (1, 10, 100):
+        run(factor, authors_df, papers_df)
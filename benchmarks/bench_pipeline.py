@@ -0,0 +1,142 @@
+"""End-to-end benchmark of generate_tbox.py and generate_abox.py on scaled corpora
+
+Each scale is a relabelled N-times copy of data/ (see scaled_data.py), so papers
+keep their real fan-out of authors, reviews, references, keywords and venues.
+generate_abox.py streams N-Triples with a fixed seed; throughput, peak RSS,
+triple count and output size are recorded per scale and compared against
+baselines. A run fails (exit code 1) when a scale produces a different number
+of triples or output bytes than benchmarks/baseline.json (the same on every
+machine, so it is committed), or when a scale has no entry there. Time and
+peak RSS depend on the machine, so they are only compared against a baseline
+saved on this host (benchmarks/.baselines/<hostname>.json, not committed),
+and a scale more than --tolerance slower or larger in memory than that fails
+too. --save-baseline records both. 100x takes several minutes and a few GB of
+disk, so it only runs when asked for. Run from the repository root:
+    python benchmarks/bench_pipeline.py                 # scales 1,10
+    python benchmarks/bench_pipeline.py --scales 1,10,100 --save-baseline
+"""
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from scaled_data import write_scaled_data
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BENCH_DIR, '..', 'src')
+BASELINE_PATH = os.path.join(BENCH_DIR, 'baseline.json')
+HOST_BASELINE_PATH = os.path.join(BENCH_DIR, '.baselines', f'{socket.gethostname()}.json')
+
+# Fixed by the seed and the code, so checked exactly against the committed baseline
+OUTPUT_KEYS = ("triples", "abox_bytes", "tbox_bytes")
+# Machine-dependent, so checked with a tolerance against this host's baseline
+PERFORMANCE_KEYS = ("abox_seconds", "peak_rss_mb")
+
+def run_script(script, workdir, args=()):
+    """Run a generator script in workdir and return its wall time"""
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, os.path.join(SRC_DIR, script), *args],
+                            cwd=workdir, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{script} failed:\n{result.stdout[-2000:]}{result.stderr[-2000:]}")
+    return time.perf_counter() - start
+
+def bench_scale(factor, workers):
+    """Build a corpus of `factor` copies, run both generators on it and return the measurements"""
+    with tempfile.TemporaryDirectory() as root:
+        start = time.perf_counter()
+        write_scaled_data(factor, os.path.join(root, 'data'))
+        corpus_seconds = time.perf_counter() - start
+        workdir = os.path.join(root, 'run')
+        os.makedirs(workdir)
+
+        tbox_seconds = run_script('generate_tbox.py', workdir, ["--formats", "nt"])
+        abox_seconds = run_script('generate_abox.py', workdir,
+                                  ["--seed", "7", "--stream", "nt", "--no-cache", "--workers", str(workers),
+                                   "--metrics", "metrics.json"])
+        with open(os.path.join(workdir, 'metrics.json')) as f:
+            metrics = json.load(f)
+        triples = metrics["run"]["total_triples"]
+        return {
+            "corpus_seconds": round(corpus_seconds, 2),
+            "tbox_seconds": round(tbox_seconds, 2),
+            "abox_seconds": round(abox_seconds, 2),
+            "triples": triples,
+            "triples_per_sec": round(triples / abox_seconds),
+            "peak_rss_mb": metrics["run"]["peak_rss_mb"],
+            "abox_bytes": os.path.getsize(os.path.join(workdir, 'abox.nt')),
+            "tbox_bytes": os.path.getsize(os.path.join(workdir, 'tbox.nt')),
+        }
+
+def regressions(result, baseline, host_baseline, tolerance):
+    """Ways `result` differs from its committed baseline entry or is worse than this host's (if any)"""
+    problems = []
+    for key in OUTPUT_KEYS:
+        if result[key] != baseline[key]:
+            problems.append(f"{key} {baseline[key]} -> {result[key]}")
+    for key in PERFORMANCE_KEYS if host_baseline else ():
+        if result[key] > host_baseline[key] * (1 + tolerance):
+            problems.append(f"{key} {host_baseline[key]} -> {result[key]} "
+                            f"(more than +{tolerance:.0%} on this host)")
+    return problems
+
+def read_baseline(path):
+    """{scale: entry} stored at path, empty when there is none"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def write_baseline(path, baseline):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+    print(f"Baseline saved to {path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end TBox/ABox benchmark on scaled corpora")
+    parser.add_argument("--scales", default="1,10",
+                        help="comma-separated scale factors, e.g. 1,10,100 (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=1, help="generate_abox.py --workers (default: %(default)s)")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed slowdown / memory growth against this host's baseline (default: %(default)s)")
+    parser.add_argument("--host-baseline", default=HOST_BASELINE_PATH,
+                        help="time and peak RSS baseline of this machine "
+                             "(default: benchmarks/.baselines/<hostname>.json)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="store the output sizes as the committed baseline and time/RSS as this host's baseline")
+    args = parser.parse_args()
+
+    baseline = read_baseline(BASELINE_PATH)
+    host_baseline = read_baseline(args.host_baseline)
+
+    results = {}
+    failed = False
+    print(f"{'scale':>6} {'abox s':>8} {'triples':>10} {'triples/s':>10} {'peak RSS':>9} {'abox bytes':>13} {'tbox s':>7}")
+    for factor in [int(f) for f in args.scales.split(",")]:
+        result = results[str(factor)] = bench_scale(factor, args.workers)
+        print(f"{factor:>5}x {result['abox_seconds']:8.1f} {result['triples']:>10} {result['triples_per_sec']:>10} "
+              f"{result['peak_rss_mb']:6.0f} MB {result['abox_bytes']:>13,} {result['tbox_seconds']:7.1f}")
+        if args.save_baseline:
+            continue
+        if str(factor) not in baseline:
+            print(f"       NO BASELINE for {factor}x (record one with --save-baseline)")
+            failed = True
+            continue
+        if str(factor) not in host_baseline:
+            print(f"       no time/RSS baseline for {factor}x on this host (record one with --save-baseline)")
+        for problem in regressions(result, baseline[str(factor)], host_baseline.get(str(factor)), args.tolerance):
+            print(f"       REGRESSION: {problem}")
+            failed = True
+
+    if args.save_baseline:
+        baseline.update({factor: {key: result[key] for key in OUTPUT_KEYS} for factor, result in results.items()})
+        write_baseline(BASELINE_PATH, baseline)
+        host_baseline.update(results)
+        write_baseline(args.host_baseline, host_baseline)
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,98 @@
+"""Serial vs concurrent Semantic Scholar fetching against the local stub, and a check of the fetcher
+
+Serves data/semantic_scholar_combined_results.json (with the reference lists of
+data/references.csv) from semantic_scholar_stub.py with a fixed delay per
+request standing in for the network, then fetches every paper and author:
+    serial      one request in flight
+    concurrent  --concurrency requests in flight, every --fail-every-th rejected
+    cached      the concurrent run again on its warm cache
+Every run must return the same records as the fixtures and stay within the
+token bucket's rate (exit code 1 otherwise), and the cached run must send no
+request. Run from the repository root:
+    python benchmarks/bench_semantic_scholar.py
+    python benchmarks/bench_semantic_scholar.py --latency 0.5 --batch-size 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+sys.path.insert(0, SRC_DIR)
+
+from semantic_scholar import AUTHOR_FIELDS, PAPER_FIELDS, SemanticScholarClient, fetch_corpus
+from semantic_scholar_stub import ID_FIELDS, SemanticScholarStub, load_fixtures, select_fields
+
+def max_requests_per_window(times, window=1.0):
+    """Most requests sent within any `window` seconds"""
+    most = 0
+    first = 0
+    for last in range(len(times)):
+        while times[last] - times[first] > window:
+            first += 1
+        most = max(most, last - first + 1)
+    return most
+
+def run(stub, cache_dir, paper_ids, batch_size, concurrency, rate, burst):
+    """Fetch every paper and author; return (seconds, requests, retried, papers, authors, busiest second)"""
+    stub.request_times.clear()
+    client = SemanticScholarClient(stub.url, rate=rate, burst=burst, concurrency=concurrency, backoff=0.05)
+    start = time.perf_counter()
+    try:
+        papers, authors, _ = asyncio.run(fetch_corpus(client, cache_dir, paper_ids, paper_batch=batch_size,
+                                                      author_batch=batch_size))
+    finally:
+        client.close()
+    seconds = time.perf_counter() - start
+    return (seconds, client.requests, client.retried, papers, authors,
+            max_requests_per_window(sorted(stub.request_times)))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serial vs concurrent fetching against the Semantic Scholar stub")
+    parser.add_argument("--latency", type=float, default=0.2, help="stub delay per request (default: %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=100, help="ids per request (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent requests (default: %(default)s)")
+    parser.add_argument("--rate", type=float, default=20.0, help="requests per second (default: %(default)s)")
+    parser.add_argument("--burst", type=int, default=4, help="token bucket capacity (default: %(default)s)")
+    parser.add_argument("--fail-every", type=int, default=7,
+                        help="stub rejects every n-th request of the concurrent run with a 429 (default: %(default)s)")
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(os.path.join(DATA_DIR, 'semantic_scholar_combined_results.json'),
+                             os.path.join(DATA_DIR, 'references.csv'))
+    paper_ids = list(dict.fromkeys(record["paperId"] for record in fixtures["paper"].values()))
+    expected_papers = [select_fields(fixtures["paper"][key], ID_FIELDS["paper"], PAPER_FIELDS) for key in paper_ids]
+
+    failed = False
+    results = {}
+    with tempfile.TemporaryDirectory() as root, SemanticScholarStub(fixtures, latency=args.latency) as stub:
+        results["serial"] = run(stub, os.path.join(root, 'serial'), paper_ids, args.batch_size, 1, args.rate,
+                                args.burst)
+        stub.fail_every = args.fail_every
+        results["concurrent"] = run(stub, os.path.join(root, 'concurrent'), paper_ids, args.batch_size,
+                                    args.concurrency, args.rate, args.burst)
+        results["cached"] = run(stub, os.path.join(root, 'concurrent'), paper_ids, args.batch_size,
+                                args.concurrency, args.rate, args.burst)
+
+    print(f"{'':>10} {'seconds':>8} {'requests':>9} {'retried':>8} {'papers':>7} {'authors':>8} {'max req/s':>10}")
+    for name, (seconds, requests, retried, papers, authors, busiest) in results.items():
+        print(f"{name:>10} {seconds:>8.2f} {requests:>9} {retried:>8} {len(papers):>7} {len(authors):>8} "
+              f"{busiest:>10}")
+        expected_authors = {key: select_fields(fixtures["author"][key], ID_FIELDS["author"], AUTHOR_FIELDS)
+                            for key in dict.fromkeys(author["authorId"] for paper in papers
+                                                     for author in paper["authors"] if author.get("authorId"))}
+        if papers != expected_papers or authors != list(expected_authors.values()):
+            print(f"{name}: the fetched records differ from the fixtures")
+            failed = True
+        if busiest > args.rate + args.burst:
+            print(f"{name}: {busiest} requests within one second, above --rate {args.rate} + --burst {args.burst}")
+            failed = True
+    if results["cached"][1]:
+        print(f"cached: {results['cached'][1]} requests sent despite a warm cache")
+        failed = True
+    print(f"\nconcurrent speedup: {results['serial'][0] / results['concurrent'][0]:.1f}x")
+    if failed:
+        sys.exit(1)
@@ -0,0 +1,54 @@
+"""Write an N-times larger copy of the input CSVs for benchmarks
+
+Every copy after the first gets its own DOIs, author ids, venue ids and edition
+ids, so the copies link up among themselves exactly like the original data.
+Fields of study are shared by all copies. Usage from the repository root:
+    python benchmarks/scaled_data.py 10 /tmp/scaled10/data
+"""
+import os
+import sys
+
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'data')
+
+SCALED_FILES = {
+    'author_paper_relationship_concat.csv': {'DOI': 'doi', 'Author_ID': 'int'},
+    'Author_nodes.csv': {'Author_ID': 'int'},
+    'Paper_nodes.csv': {'DOI': 'doi'},
+    'reviews.csv': {'Paper_DOI': 'doi', 'Reviewer_ID': 'int'},
+    'references.csv': {'Paper_DOI': 'doi', 'Reference_DOI': 'doi'},
+    'paper_field_relationship_concat.csv': {'DOI': 'doi'},
+    'Journal_papers.csv': {'DOI': 'doi', 'venue_id': 'id'},
+    'Conference_papers.csv': {'DOI': 'doi', 'Edition_id': 'id'},
+    'conferences.csv': {'ID': 'id'},
+    'conference_editions.csv': {'Edition_ID': 'id', 'Venue_ID': 'id'},
+    'journals.csv': {'ID': 'id'},
+}
+SHARED_FILES = ['fields_of_study.csv']
+
+ID_OFFSET = 10**11  # above every Semantic Scholar author id
+
+def relabel(column, kind, copy):
+    """Keys of one column for copy number `copy` (copy 0 is the original)"""
+    if copy == 0:
+        return column
+    if kind == 'int':
+        return pd.to_numeric(column, errors='coerce') + copy * ID_OFFSET
+    keep = column.isna() | (column == 'Unknown')
+    suffix = f"/copy{copy}" if kind == 'doi' else f"-copy{copy}"
+    return column.where(keep, column + suffix)
+
+def write_scaled_data(factor, out_dir, data_dir=DATA_DIR):
+    """Write `factor` relabelled copies of every input CSV into out_dir"""
+    os.makedirs(out_dir, exist_ok=True)
+    for name, keys in SCALED_FILES.items():
+        df = pd.read_csv(os.path.join(data_dir, name), dtype=str, keep_default_na=False, na_values=[''])
+        copies = [df.assign(**{column: relabel(df[column], kind, copy) for column, kind in keys.items()})
+                  for copy in range(factor)]
+        pd.concat(copies, ignore_index=True).to_csv(os.path.join(out_dir, name), index=False)
+    for name in SHARED_FILES:
+        pd.read_csv(os.path.join(data_dir, name), dtype=str).to_csv(os.path.join(out_dir, name), index=False)
+
+if __name__ == "__main__":
+    write_scaled_data(int(sys.argv[1]), sys.argv[2])
@@ -0,0 +1,211 @@
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import abox_stages
+from abox_stages import as_str
+from helpers import clean_series_for_uri, peak_rss_mb
+
+# --- ABOX ENGINE --- #
+# Every stage (and every row-shard of the two large stages) runs as a task. The
+# only coupling between stages is the *_instances sets, so the ones other stages
+# read are precomputed up front and tasks become independent. With more than one
+# worker the tasks run in forked processes that inherit their inputs from the
+# shared context; the parent merges results in stage/shard order for stable output.
+
+_context = {}  # inputs shared with forked workers
+
+# Most rows per shard of the authorship, review and citation stages when the triples are not kept in one graph
+# (--stream, --intern): each shard's triples are written before the next shard is built, so the triple
+# lists in flight stay the same size however large the input is
+CHUNK_ROWS = 20_000
+
+class Shared:
+    """Argument resolved from the shared context, optionally sliced to a row range"""
+
+    def __init__(self, key, rows=None):
+        self.key = key
+        self.rows = rows
+
+class Fresh:
+    """Empty set (or dict) created in the worker and returned to the parent"""
+
+    def __init__(self, key, factory=set):
+        self.key = key
+        self.factory = factory
+
+def precompute_instances(author_paper_df, author_index, paper_index, venues, conference_editions_df, synthetic):
+    """Compute the instance sets later stages check against, plus the sorted author pool for synthetic picks"""
+    rows = author_paper_df[author_paper_df['Author_ID'].notna()]
+    author_ids = rows['Author_ID'].astype('int64').drop_duplicates()
+    author_ids = author_ids[author_ids.isin(author_index.index)]
+    paper_keys = clean_series_for_uri(as_str(rows['DOI'])).drop_duplicates()
+    paper_keys = paper_keys[paper_keys.isin(paper_index.index)]
+
+    author_instances = set()
+    author_instances.update("author_" + author_ids.astype(str))
+    paper_instances = set()
+    paper_instances.update("paper_" + paper_keys)
+    workshop_conf_ids = abox_stages.workshop_conferences(venues, synthetic)
+    workshop_instances = {"workshop_" + conf_id for conf_id in workshop_conf_ids}
+    editions = conference_editions_df[as_str(conference_editions_df['Venue_ID']) != 'Unknown']
+    edition_instances = set("edition_" + editions['Edition_ID'].map(str))
+    return {
+        'author_instances': author_instances,
+        'author_pool': np.array(sorted(author_instances), dtype=object),
+        'paper_instances': paper_instances,
+        'workshop_instances': workshop_instances,
+        'edition_instances': edition_instances,
+    }
+
+def first_positions(keys):
+    """Position of the first occurrence of each row's key"""
+    codes, _ = keys.factorize()
+    first = np.full(codes.max() + 1 if len(codes) else 0, len(codes))
+    np.minimum.at(first, codes, np.arange(len(codes)))
+    return first[codes]
+
+def seen_before_shard(keys, bounds, prefix):
+    """For each row range, the keys in it whose first occurrence lies in an earlier range"""
+    keys = keys.reset_index(drop=True)
+    first = first_positions(keys)
+    return [set(prefix + keys[start:stop][first[start:stop] < start]) for start, stop in bounds]
+
+def shard_bounds(n_rows, shards):
+    """Split range(n_rows) into at most `shards` contiguous (start, stop) ranges"""
+    edges = np.linspace(0, n_rows, max(1, min(shards, n_rows)) + 1).astype(int)
+    return list(zip(edges[:-1], edges[1:]))
+
+def shard_count(n_rows, shards, chunk_rows=None):
+    """Shards for a table: `shards`, or more so that none has over chunk_rows rows"""
+    return max(shards, -(-n_rows // chunk_rows)) if chunk_rows else shards
+
+def build_tasks(shards, analytics=False, chunk_rows=None, stages=None):
+    """Stage tasks in output order: (stage name, shard number, stage function, args)"""
+    # Authorship shards skip entities whose first row is in an earlier shard,
+    # exactly as the serial stage skips entities already in its instance sets
+    authorship = _context['authorship_rows']
+    bounds = []
+    if stages is None or "authors/papers" in stages:
+        bounds = shard_bounds(len(authorship), shard_count(len(authorship), shards, chunk_rows))
+        seen_authors = seen_before_shard(authorship['Author_ID'].astype('int64').astype(str), bounds, "author_")
+        seen_papers = seen_before_shard(clean_series_for_uri(as_str(authorship['DOI'])), bounds, "paper_")
+
+    tasks = []
+    for shard, rows in enumerate(bounds):
+        _context[f'seen_authors_{shard}'] = seen_authors[shard]
+        _context[f'seen_papers_{shard}'] = seen_papers[shard]
+        tasks.append(("authors/papers", shard, abox_stages.authors_and_papers,
+                      (Shared('authorship_rows', rows), Shared('author_index'), Shared('paper_index'),
+                       Shared(f'seen_authors_{shard}'), Shared(f'seen_papers_{shard}'), Shared('synthetic'))))
+    reviews = len(_context['reviews_df'])
+    for shard, rows in enumerate(shard_bounds(reviews, shard_count(reviews, 1, chunk_rows))):
+        tasks.append(("reviews", shard, abox_stages.reviews,
+                      (Shared('reviews_df', rows), Shared('author_instances'), Shared('paper_instances'),
+                       Fresh('reviewer_instances'))))
+    references = len(_context['references_df'])
+    for shard, rows in enumerate(shard_bounds(references, shard_count(references, shards, chunk_rows))):
+        tasks.append(("citations", shard, abox_stages.citations, (Shared('references_df', rows),)))
+    tasks.append(("keywords", 0, abox_stages.keywords,
+                  (Shared('keywords_df'), Shared('paper_keywords_df'), Fresh('keyword_instances', dict))))
+    tasks.append(("journals", 0, abox_stages.journals, (Shared('venues'), Fresh('journal_instances'))))
+    tasks.append(("volumes", 0, abox_stages.volumes,
+                  (Shared('journal_papers_df'), Shared('author_pool'), Shared('venues'),
+                   Fresh('volume_instances'), Shared('synthetic'))))
+    tasks.append(("conferences", 0, abox_stages.conferences,
+                  (Shared('venues'), Fresh('conference_instances'))))
+    tasks.append(("workshops", 0, abox_stages.workshops,
+                  (Shared('venues'), Fresh('workshop_instances'), Shared('synthetic'))))
+    tasks.append(("editions", 0, abox_stages.editions,
+                  (Shared('conference_editions_df'), Shared('conference_papers_df'), Shared('author_pool'),
+                   Shared('venues'), Shared('workshop_instances'), Fresh('edition_instances'),
+                   Fresh('city_instances'), Fresh('proceeding_instances'), Shared('synthetic'))))
+    tasks.append(("conference papers", 0, abox_stages.conference_papers,
+                  (Shared('conference_papers_df'), Shared('edition_instances'))))
+    if analytics:
+        import citation_metrics  # needs scipy, so only imported when asked for
+        tasks.append(("citation metrics", 0, citation_metrics.citation_metrics,
+                      (Shared('references_df'), Shared('author_paper_df'))))
+    return tasks
+
+# Input whose rows each stage walks, for the rows processed in the stage metrics
+ROW_INPUTS = {
+    "authors/papers": "authorship_rows",
+    "reviews": "reviews_df",
+    "citations": "references_df",
+    "keywords": "paper_keywords_df",
+    "journals": "journal_rows",
+    "volumes": "journal_papers_df",
+    "conferences": "conference_rows",
+    "workshops": "conference_rows",
+    "editions": "conference_editions_df",
+    "conference papers": "conference_papers_df",
+    "citation metrics": "references_df",
+}
+
+def _task_rows(name, args):
+    """Rows of a task's row input, counting only its shard when the input is sharded"""
+    key = ROW_INPUTS[name]
+    for arg in args:
+        if isinstance(arg, Shared) and arg.key == key and arg.rows is not None:
+            return int(arg.rows[1] - arg.rows[0])
+    return len(_context[key])
+
+def _resolve(arg):
+    """Worker: turn a task argument into the object the stage receives"""
+    if isinstance(arg, Fresh):
+        return arg.factory()
+    value = _context[arg.key]
+    if arg.rows is not None:
+        start, stop = arg.rows
+        return value.iloc[start:stop]
+    return value
+
+def _run_task(index):
+    """Worker: run one task and return (index, seconds, rows, triples, count, {fresh key: filled set}, peak RSS)"""
+    name, shard, stage, args = _context['tasks'][index]
+    start = time.perf_counter()
+    values = [_resolve(arg) for arg in args]
+    result = stage(*values)
+    triples, count = result if isinstance(result, tuple) else (result, None)
+    fresh = {arg.key: value for arg, value in zip(args, values) if isinstance(arg, Fresh)}
+    seconds = time.perf_counter() - start
+    return index, seconds, _task_rows(name, args), triples, count, fresh, peak_rss_mb()
+
+def run_stages(inputs, instances, workers=1, shards=None, stages=None, analytics=False, chunk_rows=None):
+    """Run the ABox stages (all, or only those named in `stages`, plus citation metrics with analytics)
+    and yield (stage name, seconds, rows, triples, count, fresh sets, peak RSS in MB) in output order.
+    With chunk_rows, the authorship, review and citation stages are also split into shards of at most that many rows"""
+    if workers > 1 and "fork" not in multiprocessing.get_all_start_methods():
+        raise RuntimeError("Parallel ABox generation needs the fork start method")
+    _context.clear()
+    _context.update(inputs)
+    _context.update(instances)
+    _context['authorship_rows'] = inputs['author_paper_df'][inputs['author_paper_df']['Author_ID'].notna()]
+    _context['journal_rows'] = inputs['venues'].journal_rows
+    _context['conference_rows'] = inputs['venues'].conference_rows
+    _context['tasks'] = [task for task in build_tasks(shards or workers, analytics, chunk_rows, stages)
+                         if stages is None or task[0] in stages]
+    try:
+        if workers <= 1:
+            for index in range(len(_context['tasks'])):
+                index, *result = _run_task(index)
+                yield (_context['tasks'][index][0], *result)
+            return
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("fork")) as pool:
+            # Results are consumed in submission order, so the merged output is stable. At most two
+            # tasks per worker are in flight, so finished shards do not pile up waiting for an earlier one
+            pending = deque()
+            for index in range(len(_context['tasks'])):
+                pending.append(pool.submit(_run_task, index))
+                if len(pending) >= 2 * workers:
+                    index, *result = pending.popleft().result()
+                    yield (_context['tasks'][index][0], *result)
+            while pending:
+                index, *result = pending.popleft().result()
+                yield (_context['tasks'][index][0], *result)
+    finally:
+        _context.clear()
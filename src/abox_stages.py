@@ -0,0 +1,297 @@
+from rdflib import Namespace
+from rdflib.namespace import RDF, XSD
+import pandas as pd
+
+from helpers import clean_series_for_uri
+from terms import IriColumn, LiteralColumn, TripleColumns
+
+RES = Namespace("http://research.org/research#")
+
+# --- ABOX STAGES --- #
+# Each stage turns whole columns into (s, p, o) triples and returns them as
+# TripleColumns: blocks of a subject column, a predicate and an object column,
+# with IRIs kept as their cleaned keys and literals as plain values, so interned
+# and streamed output never builds rdflib terms. Stages register the entities
+# they mint in the shared *_instances sets, exactly like the original row loops did.
+# Synthetic values come from a SyntheticData instance (see synthetic.py).
+
+def as_str(series):
+    """str() every value of a column (NaN becomes 'nan') and strip whitespace"""
+    return series.map(str).str.strip()
+
+def uri_series(prefix, keys):
+    """Turn a column of cleaned keys into a list of RES URIs"""
+    return [RES[f"{prefix}_{key}"] for key in keys]
+
+def iris(prefix, keys):
+    """IriColumn of the RES URIs of a column of cleaned keys"""
+    return IriColumn(RES, [f"{prefix}_{key}" for key in keys])
+
+def res_iris(names):
+    """IriColumn of the RES URIs of a column of local names"""
+    return IriColumn(RES, names)
+
+def literals(values):
+    """Plain string LiteralColumn for a column of values"""
+    return LiteralColumn(values)
+
+def str_literals(values):
+    """Stripped string literals for a column of values"""
+    return LiteralColumn([str(v).strip() for v in values])
+
+def int_literals(values):
+    """xsd:integer literals for a column of values"""
+    return LiteralColumn([int(v) for v in values], XSD.integer)
+
+def authors_and_papers(author_paper_df, author_index, paper_index, author_instances, paper_instances, synthetic):
+    """author_paper_relationship_concat.csv -> author info, paper info and authorship triples"""
+    triples = TripleColumns()
+    rows = author_paper_df[author_paper_df['Author_ID'].notna()]
+    author_ids = rows['Author_ID'].astype('int64')
+    paper_dois = as_str(rows['DOI'])
+    paper_keys = clean_series_for_uri(paper_dois)
+
+    # Author info, once per author, in order of first appearance
+    first = ~author_ids.duplicated(keep='first')
+    new_ids = author_ids[first]
+    new_ids = new_ids[new_ids.isin(author_index.index)]
+    new_ids = new_ids[~("author_" + new_ids.astype(str)).isin(author_instances)]
+    names = as_str(author_index.loc[new_ids.values, 'Author_Name'])
+    emails = synthetic.emails(names, new_ids)
+    new_authors = iris("author", new_ids)
+    triples.add(new_authors, RES.name, str_literals(names))
+    triples.add(new_authors, RES.email, literals(emails))
+    triples.add(new_authors, RES.authorId, int_literals(new_ids))
+    author_instances.update("author_" + new_ids.astype(str))
+
+    # Paper info, once per paper, from the first authorship row that mentions it
+    first = ~paper_keys.duplicated(keep='first')
+    new_keys = paper_keys[first]
+    new_dois = paper_dois[first]
+    known = new_keys.isin(paper_index.index) & ~("paper_" + new_keys).isin(paper_instances)
+    new_keys = new_keys[known]
+    new_dois = new_dois[known]
+    info = paper_index.loc[new_keys.values].reset_index(drop=True)
+    new_papers = iris("paper", new_keys)
+    triples.add(new_papers, RES.title, str_literals(info['Title']))
+    triples.add(new_papers, RES.doi, literals(new_dois))
+    optional = [
+        ('Abstract', RES.abstract, str_literals),
+        ('Citations', RES.citationCount, int_literals),
+        ('References', RES.referenceCount, int_literals),
+        ('URL', RES.url, str_literals),
+        ('Year', RES.year, int_literals),
+    ]
+    for column, prop, make_literals in optional:
+        if column in info:
+            present = info[column].notna()
+            triples.add(new_papers.where(present), prop, make_literals(info[column][present]))
+    if 'publicationDate' in info:
+        present = info['publicationDate'].notna()
+        dates = info['publicationDate'][present].map(lambda d: str(d)[:10])  # YYYY-MM-DD
+        triples.add(new_papers.where(present), RES.publicationDate, LiteralColumn(dates, XSD.date))
+    paper_instances.update("paper_" + new_keys)
+
+    # Authorship relationships
+    corresponding = rows['Corresponding'].eq(True).fillna(False).tolist() if 'Corresponding' in rows else [False] * len(rows)
+    props = res_iris(["isCorrespondingAuthor" if c else "writes" for c in corresponding])
+    triples.add(iris("author", author_ids), props, iris("paper", paper_keys))
+    return triples
+
+def reviews(reviews_df, author_instances, paper_instances, reviewer_instances):
+    """reviews.csv -> reviews triples for reviewers and papers that exist in our data"""
+    rows = reviews_df[reviews_df['Reviewer_ID'].notna()]
+    reviewer_ids = "author_" + rows['Reviewer_ID'].astype('int64').astype(str)
+    paper_ids = "paper_" + clean_series_for_uri(rows['Paper_DOI'])
+    # Set lookups rather than isin, which converts the whole set on every call (once per shard)
+    known = (reviewer_ids.map(author_instances.__contains__).astype(bool)
+             & paper_ids.map(paper_instances.__contains__).astype(bool))
+    reviewer_ids = reviewer_ids[known]
+    reviewer_instances.update(reviewer_ids)
+    triples = TripleColumns()
+    triples.add(res_iris(reviewer_ids), RES.reviews, res_iris(paper_ids[known]))
+    return triples
+
+def citations(references_df):
+    """references.csv -> cites/citedBy triples (both directions for better querying)"""
+    citing = iris("paper", clean_series_for_uri(references_df['Paper_DOI']))
+    cited = iris("paper", clean_series_for_uri(references_df['Reference_DOI']))
+    triples = TripleColumns()
+    triples.add(citing, RES.cites, cited)
+    triples.add(cited, RES.citedBy, citing)
+    return triples
+
+def keywords(keywords_df, paper_keywords_df, keyword_instances):
+    """fields_of_study.csv + paper_field_relationship_concat.csv -> keyword triples and paper links"""
+    field_ids = keywords_df['Field_ID'].astype('int64')
+    keyword_names = as_str(keywords_df['Field_Name']).str.replace(" ", "_").tolist()
+    triples = TripleColumns()
+    triples.add(res_iris(keyword_names), RES.keywordId, int_literals(field_ids))
+    keyword_instances.update(zip(field_ids.tolist(), keyword_names))
+
+    link_ids = paper_keywords_df['Field_ID'].astype('int64')
+    known = link_ids.isin(list(keyword_instances))
+    papers = iris("paper", clean_series_for_uri(paper_keywords_df['DOI'][known]))
+    links = [keyword_instances[field_id] for field_id in link_ids[known]]
+    triples.add(papers, RES.hasKeyword, res_iris(links))
+    return triples, len(links)
+
+def journals(venues, journal_instances):
+    """journals.csv -> journal triples"""
+    journals_df = venues.journal_rows
+    journal_ids = journals_df['ID']
+    journal_uris = iris("journal", journal_ids)
+    triples = TripleColumns()
+    triples.add(journal_uris, RES.journalName, str_literals(journals_df['Name']))
+    triples.add(journal_uris, RES.eventId, literals(journal_ids))
+    for column, prop in (('issn', RES.issn), ('url', RES.journalUrl)):
+        if column in journals_df:
+            present = journals_df[column].notna()
+            triples.add(journal_uris.where(present), prop, str_literals(journals_df[column][present]))
+    journal_instances.update("journal_" + journal_ids)
+    return triples
+
+def volumes(journal_papers_df, author_pool, venues, volume_instances, synthetic):
+    """Journal_papers.csv -> volumes, synthetic journal editors and paper-volume-journal links"""
+    venue_ids = as_str(journal_papers_df['venue_id'])
+    journal_ids = "journal_" + venue_ids
+    keep = (venue_ids != 'Unknown') & journal_papers_df['venue_id'].notna()
+    keep &= venues.is_journal(venue_ids) & journal_papers_df['volume'].notna()
+    rows = journal_papers_df[keep]
+    venue_ids = venue_ids[keep]
+    volume_strs = as_str(rows['volume'])
+    volume_ids = "volume_" + clean_series_for_uri(volume_strs) + "_" + venue_ids
+    journal_uris = res_iris(journal_ids[keep])
+    volume_uris = res_iris(volume_ids)
+    triples = TripleColumns()
+
+    # Create each volume only once, from the first paper that mentions it
+    first = (~volume_ids.duplicated(keep='first') & ~volume_ids.isin(volume_instances)).tolist()
+    new_journals = journal_uris.where(first)
+    new_volumes = volume_uris.where(first)
+    new_rows = rows[first]
+    triples.add(new_journals, RES.hasVolume, new_volumes)
+    triples.add(new_volumes, RES.volumeOf, new_journals)
+    triples.add(new_volumes, RES.volumeNumber, literals(volume_strs[first]))
+    if 'Year' in new_rows:
+        present = new_rows['Year'].notna().tolist()
+        triples.add(new_volumes.where(present), RES.volumeYear, int_literals(new_rows['Year'][present]))
+
+    # Assign a synthetic journal editor per volume from the existing authors
+    editors = res_iris(synthetic.assign(author_pool, volume_ids[first], "editor"))
+    triples.add(editors, RES.headsJournal, new_journals)
+    volume_instances.update(volume_ids[first])
+
+    # Link paper to volume and journal
+    papers = iris("paper", clean_series_for_uri(rows['DOI']))
+    triples.add(papers, RES.publishedInVolume, volume_uris)
+    triples.add(papers, RES.publishedInJournal, journal_uris)
+    if 'pages' in rows:
+        present = rows['pages'].notna().tolist()
+        triples.add(papers.where(present), RES.pages, str_literals(rows['pages'][present]))
+    return triples, len(rows)
+
+def conferences(venues, conference_instances):
+    """conferences.csv -> conference triples"""
+    conferences_df = venues.conference_rows
+    conf_ids = conferences_df['ID']
+    conf_uris = iris("conference", conf_ids)
+    triples = TripleColumns()
+    triples.add(conf_uris, RES.eventName, str_literals(conferences_df['Name']))
+    triples.add(conf_uris, RES.eventId, literals(conf_ids))
+    if 'url' in conferences_df:
+        present = conferences_df['url'].notna()
+        triples.add(conf_uris.where(present), RES.eventUrl, str_literals(conferences_df['url'][present]))
+    triples.add(conf_uris, RDF.type, res_iris(["conference"] * len(conf_uris)))
+    conference_instances.update("conference_" + conf_ids)
+    return triples
+
+def workshop_conferences(venues, synthetic):
+    """IDs of the conferences duplicated as workshops (1/3 of them), in CSV order"""
+    conf_ids = venues.conference_ids()
+    chosen = synthetic.subset(conf_ids, len(conf_ids) // 3, "workshop")
+    return [conf_id for conf_id in conf_ids if conf_id in chosen]
+
+def workshops(venues, workshop_instances, synthetic):
+    """Synthetic workshops duplicating 1/3 of the conferences"""
+    conf_ids = workshop_conferences(venues, synthetic)
+    workshop_uris = iris("workshop", conf_ids)
+    triples = TripleColumns()
+    triples.add(workshop_uris, RES.eventName,
+                literals([f"{venues.conference_name(conf_id)} Workshop" for conf_id in conf_ids]))
+    triples.add(workshop_uris, RES.eventId, literals([str(conf_id) for conf_id in conf_ids]))
+    triples.add(workshop_uris, RDF.type, res_iris(["workshop"] * len(conf_ids)))
+    workshop_instances.update(workshop_uris.names)
+    return triples
+
+def workshop_editions(conference_papers_df, workshop_paper_dois):
+    """Map Edition_id -> whether any of the edition's papers is a workshop paper"""
+    papers = conference_papers_df[conference_papers_df['Edition_id'].notna()]
+    is_workshop_paper = papers['DOI'].isin(workshop_paper_dois)
+    return is_workshop_paper.groupby(papers['Edition_id'].map(str).values).any()
+
+def editions(conference_editions_df, conference_papers_df, author_pool, venues,
+             workshop_instances, edition_instances, city_instances, proceeding_instances, synthetic):
+    """conference_editions.csv -> editions, cities, chairs, proceedings and event links"""
+    conference_dois = conference_papers_df['DOI'].drop_duplicates()
+    # 1/3 of the conference papers are treated as workshop papers
+    workshop_paper_dois = synthetic.subset(conference_dois, len(conference_dois) // 3, "workshop_paper")
+
+    venue_ids = as_str(conference_editions_df['Venue_ID'])
+    rows = conference_editions_df[venue_ids != 'Unknown']  # Skip unknown venues
+    venue_ids = venue_ids[rows.index]
+    edition_ids = rows['Edition_ID'].map(str)
+    names = as_str(rows['Conference_Edition_Name'])
+    edition_uris = iris("edition", edition_ids)
+    proceeding_uris = iris("proceeding", edition_ids)
+    triples = TripleColumns()
+    triples.add(edition_uris, RES.editionId, literals(edition_ids))
+    triples.add(edition_uris, RES.editionName, literals(names))
+    if 'Year' in rows:
+        present = rows['Year'].notna().tolist()
+        triples.add(edition_uris.where(present), RES.heldInYear, int_literals(rows['Year'][present]))
+
+    # Synthetic city and conference chair per edition
+    cities = synthetic.cities(edition_ids)
+    chairs = res_iris(synthetic.assign(author_pool, edition_ids, "chair"))
+    city_ids = ["city_" + c for c in clean_series_for_uri(pd.Series(cities, dtype=object))]
+    city_instances.update(city_ids)
+    triples.add(edition_uris, RES.heldInCity, res_iris(city_ids))
+    triples.add(chairs, RES.headsEvent, edition_uris)
+
+    # Link each edition to its workshop if it has workshop papers, else to its conference
+    is_workshop = edition_ids.map(workshop_editions(conference_papers_df, workshop_paper_dois))
+    is_workshop = is_workshop.fillna(False).astype(bool)
+    workshop_ids = "workshop_" + venue_ids
+    conference_ids = "conference_" + venue_ids
+    to_workshop = is_workshop & workshop_ids.isin(workshop_instances)
+    to_conference = ~to_workshop & venues.is_conference(venue_ids)
+    events = res_iris([w if tw else c for w, c, tw in zip(workshop_ids, conference_ids, to_workshop)])
+    linked = (to_workshop | to_conference).tolist()
+    linked_events = events.where(linked)
+    linked_editions = edition_uris.where(linked)
+    triples.add(linked_events, RES.hasEdition, linked_editions)
+    triples.add(linked_editions, RES.editionOf, linked_events)
+
+    # Create proceedings
+    triples.add(edition_uris, RES.hasProceeding, proceeding_uris)
+    triples.add(proceeding_uris, RES.proceedingName, literals([f"Proceedings of {name}" for name in names]))
+    edition_instances.update("edition_" + edition_ids)
+    proceeding_instances.update("proceeding_" + edition_ids)
+    return triples
+
+def conference_papers(conference_papers_df, edition_instances):
+    """Conference_papers.csv -> presentedAt/publishedInProceeding links and pages"""
+    edition_ids = as_str(conference_papers_df['Edition_id'])
+    keep = (edition_ids != 'nan') & conference_papers_df['Edition_id'].notna()
+    keep &= ("edition_" + edition_ids).isin(edition_instances)
+    rows = conference_papers_df[keep]
+    edition_ids = edition_ids[keep]
+    papers = iris("paper", clean_series_for_uri(rows['DOI']))
+    triples = TripleColumns()
+    triples.add(papers, RES.presentedAt, iris("edition", edition_ids))
+    triples.add(papers, RES.publishedInProceeding, iris("proceeding", edition_ids))
+    if 'pages' in rows:
+        present = rows['pages'].notna().tolist()
+        triples.add(papers.where(present), RES.pages, str_literals(rows['pages'][present]))
+    return triples, len(rows)
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+from rdflib.namespace import XSD
+from scipy import sparse
+
+from abox_stages import RES, int_literals, iris
+from helpers import clean_series_for_uri
+from terms import IriColumn, LiteralColumn, TripleColumns
+
+# --- CITATION METRICS --- #
+# Influence metrics over the citation graph of references.csv, computed once
+# with sparse matrices and emitted as literals, so dashboards can read them
+# instead of running property paths or aggregations in the store. Degrees and
+# h-indexes count citations inside this graph, not the Semantic Scholar totals
+# (those are already on each paper as res:citationCount).
+
+def citation_matrix(citing_keys, cited_keys, paper_keys):
+    """CSR matrix C with C[i, j] = 1 when paper i cites paper j (duplicate rows count once)"""
+    n = len(paper_keys)
+    rows = paper_keys.get_indexer(citing_keys)
+    cols = paper_keys.get_indexer(cited_keys)
+    matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.int64), (rows, cols)), shape=(n, n))
+    matrix.data[:] = 1  # summed duplicates back to 1
+    return matrix
+
+def pagerank(matrix, damping=0.85, tol=1e-12, max_iter=200):
+    """PageRank by power iteration; dangling papers spread their rank uniformly"""
+    n = matrix.shape[0]
+    out_degree = np.asarray(matrix.sum(axis=1)).ravel()
+    inverse = np.divide(1.0, out_degree, out=np.zeros(n), where=out_degree > 0)
+    transition = sparse.diags(inverse) @ matrix  # row-stochastic except dangling rows
+    transposed = transition.T.tocsr()
+    dangling = out_degree == 0
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        new = damping * (transposed @ rank + rank[dangling].sum() / n) + (1 - damping) / n
+        if np.abs(new - rank).sum() < tol:
+            return new
+        rank = new
+    return rank
+
+def h_indexes(authorship, in_degree):
+    """h-index per author row of a (authors x papers) 0/1 matrix, given each paper's citation count"""
+    authorship = authorship.tocsr()
+    authorship.sort_indices()
+    counts = in_degree[authorship.indices]
+    starts = authorship.indptr[:-1]
+    lengths = np.diff(authorship.indptr)
+    author_of = np.repeat(np.arange(authorship.shape[0]), lengths)
+    # Sort every author's papers by citations, most cited first, then rank them 1..k
+    order = np.lexsort((-counts, author_of))
+    ranks = np.arange(len(order)) - np.repeat(starts, lengths) + 1
+    qualifies = counts[order] >= ranks
+    h = np.zeros(authorship.shape[0], dtype=np.int64)
+    np.maximum.at(h, author_of[qualifies], ranks[qualifies])
+    return h
+
+def cocitation_counts(matrix):
+    """(papers x papers) matrix of how many papers cite both, without the diagonal"""
+    cocited = (matrix.T @ matrix).tocsr()
+    cocited.setdiag(0)
+    cocited.eliminate_zeros()
+    return cocited
+
+def double_literals(values):
+    """xsd:double literals with a fixed number of significant digits"""
+    return LiteralColumn([float(f"{v:.6e}") for v in values], XSD.double)
+
+def citation_metrics(references_df, author_paper_df, min_cocitations=2):
+    """Citation graph metrics -> pageRank, inDegree, outDegree, coCitationCount and coCitedWith per paper,
+    hIndex per author"""
+    citing = clean_series_for_uri(references_df['Paper_DOI'])
+    cited = clean_series_for_uri(references_df['Reference_DOI'])
+    authorship = author_paper_df[author_paper_df['Author_ID'].notna()]
+    authorship_papers = clean_series_for_uri(authorship['DOI'])
+    paper_keys = pd.Index(pd.concat([citing, cited], ignore_index=True).unique())
+    matrix = citation_matrix(citing, cited, paper_keys)
+
+    rank = pagerank(matrix)
+    in_degree = np.asarray(matrix.sum(axis=0)).ravel()
+    out_degree = np.asarray(matrix.sum(axis=1)).ravel()
+    cocited = cocitation_counts(matrix)
+    cocitation_total = np.asarray(cocited.sum(axis=1)).ravel()
+
+    papers = iris("paper", paper_keys)
+    n = len(papers)
+    triples = TripleColumns()
+    triples.add(papers, RES.pageRank, double_literals(rank))
+    triples.add(papers, RES.inDegree, int_literals(in_degree))
+    triples.add(papers, RES.outDegree, int_literals(out_degree))
+    triples.add(papers, RES.coCitationCount, int_literals(cocitation_total))
+
+    # Strongly co-cited pairs as links, each pair once in both directions
+    pairs = sparse.triu(cocited, k=1).tocoo()
+    strong = pairs.data >= min_cocitations
+    first = np.column_stack([pairs.row[strong], pairs.col[strong]]).ravel().tolist()
+    second = np.column_stack([pairs.col[strong], pairs.row[strong]]).ravel().tolist()
+    triples.add(IriColumn(RES, [papers.names[a] for a in first]), RES.coCitedWith,
+                IriColumn(RES, [papers.names[b] for b in second]))
+
+    # h-index of every author, over the papers of theirs that are in the citation graph
+    author_ids = authorship['Author_ID'].astype('int64')
+    author_keys = pd.Index(author_ids.unique())
+    in_graph = authorship_papers.isin(paper_keys).to_numpy()
+    author_papers = sparse.csr_matrix(
+        (np.ones(int(in_graph.sum()), dtype=np.int64),
+         (author_keys.get_indexer(author_ids[in_graph]), paper_keys.get_indexer(authorship_papers[in_graph]))),
+        shape=(len(author_keys), n))
+    author_papers.data[:] = 1
+    h = h_indexes(author_papers, in_degree)
+    triples.add(iris("author", author_keys), RES.hIndex, int_literals(h))
+    return triples, n
@@ -0,0 +1,112 @@
+import argparse
+import asyncio
+import os
+import time
+
+from json_source import iter_records
+from semantic_scholar import (API_URL, AUTHOR_BATCH_LIMIT, PAPER_BATCH_LIMIT, FetchError, SemanticScholarClient,
+                              fetch_corpus, write_json_lines)
+from semantic_scholar_stub import SemanticScholarStub, load_fixtures
+
+def build_parser(prog=None):
+    """Command line options of the Semantic Scholar fetcher"""
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Fetch papers, their references and their authors from the Semantic Scholar Graph API "
+                    "as JSON Lines for ingest_json.py")
+    parser.add_argument("--ids", help="file with one paper id per line (paperId, DOI:<doi>, CorpusId:<id>, ...); "
+                                      "default: the paperIds of the records in --dump, to refresh it")
+    parser.add_argument("--dump", default="../data/semantic_scholar_combined_results.json",
+                        help="Semantic Scholar dump whose papers are fetched without --ids, and which --stub serves "
+                             "(default: %(default)s)")
+    parser.add_argument("--output", default="../data/semantic_scholar_papers.jsonl",
+                        help="JSON Lines file of the papers (default: %(default)s)")
+    parser.add_argument("--authors-output", default="../data/semantic_scholar_authors.jsonl",
+                        help="JSON Lines file of the authors (default: %(default)s)")
+    parser.add_argument("--no-authors", action="store_true", help="only fetch the papers")
+    parser.add_argument("--cache-dir", default="../data/.cache/semantic_scholar",
+                        help="where fetched records are cached between runs (default: %(default)s)")
+    parser.add_argument("--api-url", default=API_URL, help="Graph API base URL (default: %(default)s)")
+    parser.add_argument("--api-key", default=os.environ.get("S2_API_KEY"),
+                        help="API key sent as x-api-key (default: $S2_API_KEY)")
+    parser.add_argument("--rate", type=float, default=1.0, help="requests per second (default: %(default)s)")
+    parser.add_argument("--burst", type=int, default=1,
+                        help="requests allowed at once after idling (default: %(default)s)")
+    parser.add_argument("--concurrency", type=int, default=4, help="requests in flight (default: %(default)s)")
+    parser.add_argument("--retries", type=int, default=5, help="retries per failed request (default: %(default)s)")
+    parser.add_argument("--backoff", type=float, default=1.0,
+                        help="seconds before the first retry, doubled for each further one (default: %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=PAPER_BATCH_LIMIT,
+                        help=f"paper ids per request, at most {PAPER_BATCH_LIMIT} (default: %(default)s)")
+    parser.add_argument("--stub", action="store_true",
+                        help="fetch from a local stand-in serving --dump and ../data/references.csv instead of the API")
+    parser.add_argument("--fail-every", type=int, default=0, help="with --stub, answer every n-th request with a 429")
+    return parser
+
+def parse_args(argv=None, prog=None):
+    """Parse and check the command line"""
+    parser = build_parser(prog)
+    args = parser.parse_args(argv)
+    if not 0 < args.batch_size <= PAPER_BATCH_LIMIT:
+        parser.error(f"--batch-size must be between 1 and {PAPER_BATCH_LIMIT}")
+    return args
+
+async def fetch(args, api_url, paper_ids):
+    """Fetch the papers (and their authors) and return the client with fetch_corpus's results"""
+    client = SemanticScholarClient(api_url, args.api_key, args.rate, args.burst, args.concurrency, args.retries,
+                                   args.backoff)
+    try:
+        return client, await fetch_corpus(client, args.cache_dir, paper_ids, not args.no_authors, args.batch_size,
+                                          AUTHOR_BATCH_LIMIT)
+    finally:
+        client.close()
+
+def run(args):
+    """Fetch the records for parsed options and write them as JSON Lines"""
+    if args.ids:
+        with open(args.ids, encoding="utf-8") as f:
+            paper_ids = [line.strip() for line in f if line.strip()]
+    else:
+        paper_ids = [record["paperId"] for record in iter_records(args.dump) if record.get("paperId")]
+
+    stub = None
+    if args.stub:
+        references = os.path.join(os.path.dirname(args.dump), "references.csv")
+        stub = SemanticScholarStub(load_fixtures(args.dump, references if os.path.exists(references) else None),
+                                   fail_every=args.fail_every).start()
+    api_url = stub.url if stub else args.api_url
+
+    # --- FETCH RECORDS --- #
+    print(f"Fetching {len(paper_ids)} papers from {api_url}...")
+    start = time.perf_counter()
+    try:
+        client, (papers, authors, stats) = asyncio.run(fetch(args, api_url, paper_ids))
+    except FetchError as e:
+        print(f"Error fetching from Semantic Scholar: {e}")
+        exit(1)
+    finally:
+        if stub is not None:
+            stub.stop()
+    seconds = time.perf_counter() - start
+
+    for stage, (requested, fetched, not_found) in stats.items():
+        print(f"   {stage}: {requested} requested, {fetched} fetched, {requested - fetched} from the cache, "
+              f"{not_found} not found")
+    print(f"   {client.requests} requests ({client.retried} retried) in {seconds:.2f}s")
+
+    output_files = [args.output]
+    write_json_lines(args.output, papers)
+    if not args.no_authors:
+        write_json_lines(args.authors_output, authors)
+        output_files.append(args.authors_output)
+
+    print(f"\nFetch complete! Ingest the papers with: python ingest_json.py {args.output}")
+    print(f"\n FILES GENERATED:")
+    for output_file in output_files:
+        print(f"   - {output_file}")
+
+def main(argv=None):
+    run(parse_args(argv))
+
+if __name__ == "__main__":
+    main()
@@ -1,447 +1,424 @@
-from rdflib import Graph, Namespace, Literal, URIRef
-from rdflib.namespace import RDF, RDFS, XSD
+from rdflib import Graph
+import argparse
+import itertools
+import os
 import random
-from datetime import datetime, date
-import pandas as pd
-import string
-
-g = Graph()
-
-# Define namespaces
-RES = Namespace("http://research.org/research#")
-g.bind("res", RES)
-
-# --- HELPER FUNCTIONS --- #
-def generate_email(name):
-    """Generate a random email from a name"""
-    email_name = name.lower().split()[0]
-    random_num = random.randint(100, 999)
-    domains = ["gmail.com", "yahoo.com", "hotmail.com", "outlook.com", "university.edu"]
-    return f"{email_name}{random_num}@{random.choice(domains)}"
-
-def clean_string_for_uri(s):
-    """Clean a string to be URI-safe"""
-    return str(s).strip().replace(" ", "_").replace("-", "_").replace(".", "_").replace("/", "_").replace(":", "_")
-
-def generate_city_name():
-    """Generate a random city name"""
-    cities = ["New York", "London", "Paris", "Tokyo", "Berlin", "Sydney", "Toronto", 
-              "Barcelona", "Amsterdam", "Vienna", "Singapore", "Seoul", "Boston", 
-              "San Francisco", "Munich", "Stockholm", "Copenhagen", "Zurich"]
-    return random.choice(cities)
-
-# --- DATA LOADING --- #
-print("Loading data...")
-try:
-    author_paper_df = pd.read_csv('../data/author_paper_relationship_concat.csv')
-    authors_df = pd.read_csv('../data/Author_nodes.csv')
-    papers_df = pd.read_csv('../data/Paper_nodes.csv')
-    reviews_df = pd.read_csv('../data/reviews.csv')
-    references_df = pd.read_csv('../data/references.csv')
-    keywords_df = pd.read_csv('../data/fields_of_study.csv')
-    paper_keywords_df = pd.read_csv('../data/paper_field_relationship_concat.csv')
-    journal_papers_df = pd.read_csv('../data/Journal_papers.csv')
-    conference_papers_df = pd.read_csv('../data/Conference_papers.csv')
-    conferences_df = pd.read_csv('../data/conferences.csv')
-    conference_editions_df = pd.read_csv('../data/conference_editions.csv')
-    journals_df = pd.read_csv('../data/journals.csv')
-    print("All data files loaded successfully!")
-except FileNotFoundError as e:
-    print(f"Error loading data: {e}")
-    print("Please ensure all data files are in the '../data/' directory")
-    exit(1)
-
-# Global sets to track instances (prevent duplicates)
-author_instances = set()
-paper_instances = set()
-reviewer_instances = set()
-journal_instances = set()
-volume_instances = set()
-conference_instances = set()
-workshop_instances = set()
-edition_instances = set()
-city_instances = set()
-proceeding_instances = set()
-
-print("Creating authors and papers...")
-
-# --- CREATE AUTHORS AND PAPERS WITH RELATIONSHIPS --- #
-# author_paper_relationship_concat.csv
-for _, row in author_paper_df.iterrows():
-    paper_doi = str(row['DOI']).strip()
-    # author_id_num = int(row['Author_ID'])
-    if pd.notna(row['Author_ID']):
-        author_id_num = int(row['Author_ID'])
-        # continue with processing...
+import time
+
+from abox_engine import CHUNK_ROWS, ROW_INPUTS, precompute_instances, run_stages
+from abox_stages import RES
+from helpers import clean_series_for_uri, peak_rss_mb, report_uri_collisions
+from incremental import OPTIONAL_STAGES, ROW_LOCAL_FILES, STAGE_INPUTS, IncrementalState, parse_stages, stage_files
+from instrumentation import StageMetrics, finish_profile, start_profile
+from loader import DOI_COLUMNS, SchemaError, load_tables
+from lookups import build_author_index, build_paper_index
+from materialize import RdfsClosure, elide_inverses
+from ontology import build_tbox
+from resolution import resolve_entities
+from serialization import (DEFAULT_FORMATS, output_path, parse_formats, print_serialization_report,
+                           serialize_formats, serialize_interned)
+from synthetic import SyntheticData
+from terms import InternedTriples
+from venues import VenueCatalog
+from writers import STREAM_FORMATS, TripleStreamWriter, nt_lines, stream_output_path
+
+def build_parser(prog=None):
+    """Command line options of the ABox generator"""
+    parser = argparse.ArgumentParser(prog=prog, description="Generate the research ABox from the input CSV files")
+    parser.add_argument("--data-dir", default="../data", help="directory of the input CSV files (default: %(default)s)")
+    parser.add_argument("--output-dir", default=".",
+                        help="directory the ABox files are written to (default: the current directory)")
+    parser.add_argument("--stages", type=parse_stages,
+                        help=f"comma-separated stages to run, any of {','.join(STAGE_INPUTS)} (default: all); only "
+                             f"the CSV files they read are loaded, and naming an optional stage turns it on")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="load only the inputs of the selected stages, print their row counts and the files "
+                             "that would be written, and stop")
+    parser.add_argument("--stream", choices=list(STREAM_FORMATS),
+                        help="write triples straight to disk in this format instead of building an in-memory graph")
+    parser.add_argument("--gzip", action="store_true", help="gzip-compress the streamed output")
+    parser.add_argument("--formats", type=parse_formats, default=DEFAULT_FORMATS,
+                        help="comma-separated output formats for the in-memory graph, "
+                             "any of ttl,xml,nt,nq,jsonld (default: ttl,xml)")
+    parser.add_argument("--graph-iri", default="http://research.org/abox",
+                        help="named graph for N-Quads output (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="worker processes for the ABox stages (default: %(default)s, in process)")
+    parser.add_argument("--shards", type=int,
+                        help="row-shards for the authorship and citation stages (default: one per worker)")
+    parser.add_argument("--incremental", metavar="STATE_DIR",
+                        help="only rerun stages whose inputs changed since the last run recorded in STATE_DIR "
+                             "and write the added/removed triples as abox_delta_*.nt")
+    parser.add_argument("--sparql-update", action="store_true",
+                        help="with --incremental, also write the delta as a SPARQL UPDATE script (abox_delta.ru)")
+    parser.add_argument("--seed", type=int,
+                        help="seed for the synthetic emails, cities, editors, chairs and workshops "
+                             "(default: a fresh random seed, printed so the run can be reproduced)")
+    parser.add_argument("--intern", action="store_true",
+                        help="hold the ABox as integer-encoded triples over a term dictionary instead of an rdflib "
+                             "graph; nt/nq are written straight from it, other formats build the graph at the end")
+    parser.add_argument("--cache-dir",
+                        help="where parsed input tables are cached between runs (default: DATA_DIR/.cache)")
+    parser.add_argument("--no-cache", action="store_true", help="always parse the CSV files, bypassing the cache")
+    parser.add_argument("--materialize", action="store_true",
+                        help="add the RDFS entailments of the TBox (types from subclasses, domains and ranges, "
+                             "superproperties) to the ABox, for stores without a reasoning ruleset")
+    parser.add_argument("--elide-inverses", action="store_true",
+                        help="emit only cites, hasVolume and hasEdition, not their inverses citedBy, volumeOf and "
+                             "editionOf (pair with generate_tbox.py --declare-inverses, or load with "
+                             "load_store.py --materialize-inverses)")
+    parser.add_argument("--resolve", choices=["sameas", "canonical"],
+                        help="reconcile authors and papers known under several ids (author splits, year-prefixed "
+                             "DOIs): 'sameas' adds owl:sameAs links to the canonical IRI, 'canonical' mints only it")
+    parser.add_argument("--citation-metrics", action="store_true",
+                        help="add PageRank, in/out degree, co-citation counts and links per paper and an h-index per "
+                             "author, computed on the citation graph (needs scipy)")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="write per-stage wall time, rows, rows/s, triples and peak RSS to FILE as JSON")
+    parser.add_argument("--profile", metavar="FILE",
+                        help="profile the run with cProfile and dump the stats to FILE "
+                             "(with --workers, stage work in the worker processes is not included)")
+    return parser
+
+def parse_args(argv=None, prog=None):
+    """Parse and check the command line; naming an optional stage in --stages turns it on"""
+    parser = build_parser(prog)
+    args = parser.parse_args(argv)
+    if args.stages and args.incremental:
+        parser.error("--stages cannot be combined with --incremental, which picks the stages whose inputs changed")
+    if args.stages and 'citation metrics' in args.stages:
+        args.citation_metrics = True
+    if args.stages and 'entity resolution' in args.stages and args.resolve is None:
+        args.resolve = "sameas"
+    return args
+
+def run(args):
+    """Generate the ABox for parsed options"""
+    metrics = StageMetrics()
+    profiler = start_profile() if args.profile else None
+    basename = os.path.normpath(os.path.join(args.output_dir, "abox"))
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    # --- STAGE SELECTION --- #
+    # Only the CSV files read by the selected stages are loaded, the others stay empty
+    optional_stages = {'citation metrics': args.citation_metrics, 'entity resolution': args.resolve == "sameas"}
+    retired_stages = [stage for stage in OPTIONAL_STAGES if not optional_stages[stage]]
+    stages = [stage for stage in STAGE_INPUTS
+              if stage not in retired_stages and (args.stages is None or stage in args.stages)]
+    seed = args.seed
+    if args.incremental:
+        state = IncrementalState(args.incremental, args.data_dir)
+        try:
+            seed = state.seed(args.seed)  # reruns must mint the same synthetic entities as the first run
+        except ValueError as e:
+            print(f"Error: {e}")
+            exit(1)
+        settings = {"materialize": args.materialize, "elide_inverses": args.elide_inverses, "resolve": args.resolve}
+        if state.check_settings(settings) and state.previous_run:
+            print(f"Output options differ from the last run in {args.incremental}, regenerating every stage")
+        stages = [stage for stage in state.changed_stages() if stage in stages]
+    files = stage_files(stages + (['entity resolution'] if args.resolve else []))
+    if args.incremental:
+        files += [name for name in state.changed_files if name not in files]
+
+    if args.incremental:
+        output_files = [f"{basename}_delta_added.nt", f"{basename}_delta_removed.nt"]
+        if args.sparql_update:
+            output_files.append(f"{basename}_delta.ru")
+    elif args.stream:
+        output_files = [stream_output_path(basename, args.stream, args.gzip)]
     else:
-        continue  # skip this row
-
-    
-    paper_id = f"paper_{clean_string_for_uri(paper_doi)}"
-    author_id = f"author_{author_id_num}"
-    
-    paper = RES[paper_id]
-    author = RES[author_id]
-    
-    # Add Author Info (only once per author)
-    if author_id not in author_instances:
-        author_info = authors_df[authors_df['Author_ID'] == author_id_num]
-        if not author_info.empty:
-            author_row = author_info.iloc[0]
-            name = str(author_row['Author_Name']).strip()
-            email = generate_email(name)
-            
-            g.add((author, RES.name, Literal(name)))
-            g.add((author, RES.email, Literal(email)))
-            g.add((author, RES.authorId, Literal(author_id_num, datatype=XSD.integer)))
-            
-            author_instances.add(author_id)
-    
-    # Add Paper Info (only once per paper)
-    if paper_id not in paper_instances:
-        paper_info = papers_df[papers_df['DOI'] == paper_doi]
-        if not paper_info.empty:
-            paper_row = paper_info.iloc[0]
-            
-            g.add((paper, RES.title, Literal(str(paper_row['Title']).strip())))
-            g.add((paper, RES.doi, Literal(paper_doi)))
-            
-            if pd.notna(paper_row.get('Abstract')):
-                g.add((paper, RES.abstract, Literal(str(paper_row['Abstract']).strip())))
-            if pd.notna(paper_row.get('Citations')):
-                g.add((paper, RES.citationCount, Literal(int(paper_row['Citations']), datatype=XSD.integer)))
-            if pd.notna(paper_row.get('References')):
-                g.add((paper, RES.referenceCount, Literal(int(paper_row['References']), datatype=XSD.integer)))
-            if pd.notna(paper_row.get('URL')):
-                g.add((paper, RES.url, Literal(str(paper_row['URL']).strip())))
-            if pd.notna(paper_row.get('Year')):
-                g.add((paper, RES.year, Literal(int(paper_row['Year']), datatype=XSD.integer)))
-            if pd.notna(paper_row.get('publicationDate')):
-                pub_date_str = str(paper_row['publicationDate'])[:10]  # YYYY-MM-DD
-                g.add((paper, RES.publicationDate, Literal(pub_date_str, datatype=XSD.date)))
-            
-            paper_instances.add(paper_id)
-    
-    # Create authorship relationships 
-    corresponding = row.get('Corresponding', False)
-    if pd.notna(corresponding) and corresponding == True:
-        g.add((author, RES.isCorrespondingAuthor, paper))
+        output_files = [output_path(basename, format) for format in args.formats]
+
+    # --- DATA LOADING --- #
+    print("Loading data...")
+    try:
+        with metrics.stage("load") as load:
+            data_frames = load_tables(args.data_dir, cache_dir=None if args.no_cache else
+                                      args.cache_dir or os.path.join(args.data_dir, ".cache"), files=files)
+            load["rows"] = sum(len(df) for df in data_frames.values())
+    except SchemaError as e:
+        print("Error loading data:")
+        for problem in e.problems:
+            print(f"   {problem}")
+        print(f"Please ensure all data files are in the '{args.data_dir}' directory")
+        exit(1)
+    if len(files) < len(data_frames):
+        print(f"Loaded {len(files)} of {len(data_frames)} data files for the selected stages "
+              f"({metrics.stages['load']['seconds']:.2f}s)")
     else:
-        g.add((author, RES.writes, paper))
-
-print(f"Created {len(author_instances)} authors and {len(paper_instances)} papers")
-
-# --- CREATE REVIEW RELATIONSHIPS --- #
-print("Creating review relationships...")
-for _, row in reviews_df.iterrows():
-    # reviewer_id_num = int(row['Reviewer_ID'])
-    if pd.notna(row['Reviewer_ID']):
-        reviewer_id_num = int(row['Reviewer_ID'])
-        # continue with processing...
+        print(f"All data files loaded successfully! ({metrics.stages['load']['seconds']:.2f}s)")
+
+    author_paper_df = data_frames['author_paper_relationship_concat.csv']
+    authors_df = data_frames['Author_nodes.csv']
+    papers_df = data_frames['Paper_nodes.csv']
+    reviews_df = data_frames['reviews.csv']
+    references_df = data_frames['references.csv']
+    keywords_df = data_frames['fields_of_study.csv']
+    paper_keywords_df = data_frames['paper_field_relationship_concat.csv']
+    journal_papers_df = data_frames['Journal_papers.csv']
+    conference_papers_df = data_frames['Conference_papers.csv']
+    conferences_df = data_frames['conferences.csv']
+    conference_editions_df = data_frames['conference_editions.csv']
+    journals_df = data_frames['journals.csv']
+
+    keyed_stages = {}
+    if args.incremental:
+        print(f"Changed input files: {state.changed_files or 'none'}")
+        state.report_key_changes(data_frames)
+        keyed_stages = state.row_key_stages(stages)
+        print(f"Stages to regenerate: {stages or 'none'}")
+        if keyed_stages:
+            print(f"   only the rows of changed keys for: {', '.join(keyed_stages)}")
+        stage_lines = {stage: [] for stage in stages}
+        retracted_lines = {stage: [] for stage in keyed_stages}
+
+    if args.dry_run:
+        print(f"\nDRY RUN:")
+        print(f"   Stages: {', '.join(stages) or 'none'}")
+        for name in files:
+            print(f"   {name:<40} {len(data_frames[name]):>10} rows")
+        print(f"   {'Total':<40} {sum(len(data_frames[name]) for name in files):>10} rows")
+        print(f"\n FILES THAT WOULD BE GENERATED:")
+        for output_file in output_files:
+            print(f"   - {output_file}")
+        return
+
+    # Mint every DOI's URI key once up front: the stages (and forked workers) reuse the memo,
+    # and DOIs that would be merged into one paper URI are reported here
+    with metrics.stage("mint uris") as minting:
+        for name, column in DOI_COLUMNS:
+            minted = clean_series_for_uri(data_frames[name][column].dropna())
+            minting["rows"] = (minting["rows"] or 0) + len(minted)
+    report_uri_collisions()
+
+    if args.incremental:
+        g = None
+        writer = None
+        table = None
+    elif args.stream:
+        g = None
+        writer = TripleStreamWriter(output_files[0], args.stream, args.graph_iri, args.gzip)
+        table = None
     else:
-        continue  # skip this row
-    
-    paper_doi = str(row['Paper_DOI']).strip()
-    
-    reviewer_id = f"author_{reviewer_id_num}"
-    paper_id = f"paper_{clean_string_for_uri(paper_doi)}"
-    
-    # Only create review if both reviewer and paper exist in our data
-    if reviewer_id in author_instances and paper_id in paper_instances:
-        reviewer = RES[reviewer_id]
-        paper = RES[paper_id]
-        
-        g.add((reviewer, RES.reviews, paper))
-        reviewer_instances.add(reviewer_id)
-
-print(f"Created review relationships for {len(reviewer_instances)} reviewers")
-
-# --- CREATE CITATION RELATIONSHIPS --- #
-print("Creating citation relationships...")
-citation_count = 0
-for _, row in references_df.iterrows():
-    citing_doi = str(row['Paper_DOI']).strip()
-    cited_doi = str(row['Reference_DOI']).strip()
-    
-    citing_paper_id = f"paper_{clean_string_for_uri(citing_doi)}"
-    cited_paper_id = f"paper_{clean_string_for_uri(cited_doi)}"
-    
-    citing_paper = RES[citing_paper_id]
-    cited_paper = RES[cited_paper_id]
-    
-    # Add citation relationships (both directions for better querying)
-    g.add((citing_paper, RES.cites, cited_paper))
-    g.add((cited_paper, RES.citedBy, citing_paper))
-    citation_count += 1
-
-print(f"Created {citation_count} citation relationships")
-
-# --- CREATE KEYWORDS --- #
-print("Creating keywords...")
-keyword_instances = {}
-for _, row in keywords_df.iterrows():
-    field_id = int(row['Field_ID'])
-    field_name = str(row['Field_Name']).strip().replace(" ", "_")
-    keyword = RES[field_name]
-    
-    g.add((keyword, RES.keywordId, Literal(field_id, datatype=XSD.integer)))
-    
-    keyword_instances[field_id] = keyword
-
-# Link papers to keywords
-keyword_links = 0
-for _, row in paper_keywords_df.iterrows():
-    field_id = int(row['Field_ID'])
-    paper_doi = str(row['DOI']).strip()
-    
-    if field_id in keyword_instances:
-        keyword = keyword_instances[field_id]
-        paper_id = f"paper_{clean_string_for_uri(paper_doi)}"
-        paper = RES[paper_id]
-        
-        g.add((paper, RES.hasKeyword, keyword))
-        keyword_links += 1
-
-print(f"Created {len(keyword_instances)} keywords with {keyword_links} paper-keyword links")
-
-# --- CREATE JOURNALS FROM journals.csv --- #
-print("Creating journals...")
-for _, row in journals_df.iterrows():
-    journal_id_num = str(row['ID'])
-    journal_id = f"journal_{journal_id_num}"
-    journal = RES[journal_id]
-    
-    g.add((journal, RES.journalName, Literal(str(row['Name']).strip())))
-    g.add((journal, RES.eventId, Literal(journal_id_num)))
-    
-    if pd.notna(row.get('issn')):
-        g.add((journal, RES.issn, Literal(str(row['issn']).strip())))
-    if pd.notna(row.get('url')):
-        g.add((journal, RES.journalUrl, Literal(str(row['url']).strip())))
-    
-    journal_instances.add(journal_id)
-
-print(f"Created {len(journal_instances)} journals")
-
-# --- CREATE VOLUMES AND LINK JOURNAL PAPERS --- #
-print("Creating volumes and linking journal papers...")
-journal_paper_count = 0
-for _, row in journal_papers_df.iterrows():
-    paper_doi = str(row['DOI']).strip()
-    venue_id = str(row['venue_id']).strip()
-    
-    # Skip papers with unknown venues
-    if venue_id == 'Unknown' or pd.isna(row.get('venue_id')):
-        continue
-    
-    journal_id = f"journal_{venue_id}"
-    
-    # Only process if journal exists
-    if journal_id in journal_instances and pd.notna(row.get('volume')):
-        journal = RES[journal_id]
-        volume_str = str(row['volume']).strip()
-        
-        # Create unique volume ID
-        volume_id = f"volume_{clean_string_for_uri(volume_str)}_{venue_id}"
-        volume = RES[volume_id]
-        
-        # Create volume only once
-        if volume_id not in volume_instances:
-            g.add((journal, RES.hasVolume, volume))
-            g.add((volume, RES.volumeOf, journal))
-            g.add((volume, RES.volumeNumber, Literal(volume_str)))
-            
-            if pd.notna(row.get('Year')):
-                g.add((volume, RES.volumeYear, Literal(int(row['Year']), datatype=XSD.integer)))
-            
-            # Assign random journal editor from existing authors
-            if author_instances:
-                editor_id = random.choice(list(author_instances))
-                editor = RES[editor_id]
-                g.add((editor, RES.headsJournal, journal))
-            
-            volume_instances.add(volume_id)
-        
-        # Link paper to volume and journal
-        paper_id = f"paper_{clean_string_for_uri(paper_doi)}"
-        paper = RES[paper_id]
-        
-        g.add((paper, RES.publishedInVolume, volume))
-        g.add((paper, RES.publishedInJournal, journal))
-        
-        # Add pages if available
-        if pd.notna(row.get('pages')):
-            g.add((paper, RES.pages, Literal(str(row['pages']).strip())))
-        
-        journal_paper_count += 1
-
-print(f"Created {len(volume_instances)} volumes and linked {journal_paper_count} journal papers")
-
-# --- CREATE CONFERENCES FROM conferences.csv --- #
-print("Creating conferences...")
-for _, row in conferences_df.iterrows():
-    conf_id_num = str(row['ID'])
-    conference_id = f"conference_{conf_id_num}"
-    conference = RES[conference_id]
-    
-    # Use exact property names from TBox
-    g.add((conference, RES.eventName, Literal(str(row['Name']).strip())))
-    g.add((conference, RES.eventId, Literal(conf_id_num)))
-    
-    if pd.notna(row.get('url')):
-        g.add((conference, RES.eventUrl, Literal(str(row['url']).strip())))
-    
-    g.add((conference, RDF.type, RES["conference"]))
-    conference_instances.add(conference_id)
-
-print(f"Created {len(conference_instances)} conferences")
-
-# --- CREATE WORKSHOPS (synthetic data) --- #
-print("Creating workshops (synthetic data)...")
-# Create workshops by duplicating some conferences
-conference_list = list(conference_instances)
-workshop_count = len(conference_list) // 3  # Create workshops for 1/3 of conferences
-
-for i in range(workshop_count):
-    original_conf_id = conference_list[i]
-    conf_id_num = original_conf_id.split('_')[1]
-    
-    workshop_id = f"workshop_{conf_id_num}"
-    workshop = RES[workshop_id]
-    
-    # Get original conference name and modify for workshop
-    original_conf = RES[original_conf_id]
-    for s, p, o in g.triples((original_conf, RES.eventName, None)):
-        workshop_name = f"{str(o)} Workshop"
-        g.add((workshop, RES.eventName, Literal(workshop_name)))
-        break
-    
-    g.add((workshop, RES.eventId, Literal(str(conf_id_num))))
-    g.add((workshop, RDF.type, RES["workshop"]))
-    workshop_instances.add(workshop_id)
-
-print(f"Created {len(workshop_instances)} workshops")
-
-# --- CREATE EDITIONS FROM conference_editions.csv --- #
-print("Creating editions...")
-conference_papers_list = conference_papers_df['DOI'].tolist()
-random.shuffle(conference_papers_list)
-workshop_paper_dois = set(conference_papers_list[:len(conference_papers_list)//3])  # 1/3 for workshops
-
-for _, row in conference_editions_df.iterrows():
-    venue_id = str(row['Venue_ID']).strip()
-    edition_id_num = str(row['Edition_ID'])
-    
-    # Skip unknown venues
-    if venue_id == 'Unknown':
-        continue
-    
-    edition_id = f"edition_{edition_id_num}"
-    edition = RES[edition_id]
-    
-    # Use exact property names from TBox
-    g.add((edition, RES.editionId, Literal(edition_id_num)))
-    g.add((edition, RES.editionName, Literal(str(row['Conference_Edition_Name']).strip())))
-    
-    if pd.notna(row.get('Year')):
-        g.add((edition, RES.heldInYear, Literal(int(row['Year']), datatype=XSD.integer)))
-    
-    # Create city
-    city_name = generate_city_name()
-    city_id = f"city_{clean_string_for_uri(city_name)}"
-    city = RES[city_id]
-    
-    if city_id not in city_instances:
-        city_instances.add(city_id)
-    
-    g.add((edition, RES.heldInCity, city))
-    
-    # Determine if this edition belongs to conference or workshop
-    edition_papers = conference_papers_df[conference_papers_df['Edition_id'] == str(edition_id_num)]
-    has_workshop_papers = any(doi in workshop_paper_dois for doi in edition_papers['DOI'])
-    
-    if has_workshop_papers and f"workshop_{venue_id}" in workshop_instances:
-        # Link to workshop
-        workshop = RES[f"workshop_{venue_id}"]
-        g.add((workshop, RES.hasEdition, edition))
-        g.add((edition, RES.editionOf, workshop))
+        g = Graph()
+        writer = None
+        table = InternedTriples() if args.intern else None
+
+        # Define namespaces
+        g.bind("res", RES)
+
+    # Index the entity tables once so the stages below resolve rows in O(1)
+    with metrics.stage("indexes", rows=len(authors_df) + len(papers_df) + len(journals_df) + len(conferences_df)):
+        author_index = build_author_index(authors_df)
+        paper_index = build_paper_index(papers_df)
+        venues = VenueCatalog(journals_df, conferences_df)
+
+    # --- RUN ABOX STAGES --- #
+    if seed is None:
+        seed = random.SystemRandom().randrange(2**32)
+    print(f"Synthetic data seed: {seed}")
+    synthetic = SyntheticData(seed)
+
+    # Instance sets read across stages are precomputed, which makes the stages independent
+    with metrics.stage("precompute", rows=len(author_paper_df) + len(conference_editions_df)):
+        instances = precompute_instances(author_paper_df, author_index, paper_index, venues, conference_editions_df,
+                                         synthetic)
+
+    # Duplicate authors/papers are resolved up front, so canonical mode can rewrite every stage's output
+    resolution = None
+    if args.resolve:
+        with metrics.stage("resolve", rows=len(authors_df) + len(papers_df)) as resolve:
+            resolution = resolve_entities(authors_df, papers_df, author_paper_df)
+            resolve["triples"] = len(resolution.iris)
+        print(f"Entity resolution: {len(resolution.author_links)} duplicate authors, "
+              f"{len(resolution.paper_links)} duplicate papers")
+
+    def same_as_stage():
+        """The owl:sameAs links, as one more stage result"""
+        start = time.perf_counter()
+        triples = resolution.same_as_triples()
+        yield ("entity resolution", time.perf_counter() - start, len(authors_df) + len(papers_df), triples,
+               len(triples), {}, peak_rss_mb())
+
+    # Global sets to track instances (prevent duplicates)
+    author_instances = instances['author_instances']
+    paper_instances = instances['paper_instances']
+    reviewer_instances = set()
+    journal_instances = set()
+    volume_instances = set()
+    conference_instances = set()
+    workshop_instances = set()
+    edition_instances = set()
+    city_instances = set()
+    proceeding_instances = set()
+    keyword_instances = {}
+    stage_outputs = {
+        'reviewer_instances': reviewer_instances,
+        'journal_instances': journal_instances,
+        'volume_instances': volume_instances,
+        'conference_instances': conference_instances,
+        'workshop_instances': workshop_instances,
+        'edition_instances': edition_instances,
+        'city_instances': city_instances,
+        'proceeding_instances': proceeding_instances,
+        'keyword_instances': keyword_instances,
+    }
+
+    inputs = {
+        'author_paper_df': author_paper_df,
+        'author_index': author_index,
+        'paper_index': paper_index,
+        'reviews_df': reviews_df,
+        'references_df': references_df,
+        'keywords_df': keywords_df,
+        'paper_keywords_df': paper_keywords_df,
+        'journal_papers_df': journal_papers_df,
+        'conference_editions_df': conference_editions_df,
+        'conference_papers_df': conference_papers_df,
+        'venues': venues,
+        'synthetic': synthetic,
+    }
+
+    if args.workers > 1:
+        print(f"Running ABox stages on {args.workers} worker processes...")
+    closure = RdfsClosure(build_tbox()) if args.materialize else None
+    stage_counts = {}
+    stage_typed = {}
+    elided_triples = 0
+    # Without a graph to hold them, triples are written chunk by chunk as the row shards finish
+    chunk_rows = CHUNK_ROWS if writer is not None or table is not None else None
+    previous_tables = {}
+
+    def key_rows(stage, previous):
+        """A row-local stage's inputs with its row table cut down to the rows of changed keys, either the
+        current rows of changed/added keys or the previous rows of changed/removed keys"""
+        name = keyed_stages[stage]
+        if name not in previous_tables:
+            previous_tables[name] = load_tables(state.inputs_dir, files=[name])[name]
+        current_rows, previous_rows = state.key_rows(name, data_frames[name], previous_tables[name])
+        return {**inputs, ROW_INPUTS[stage]: previous_rows if previous else current_rows}
+
+    def finish(name, triples):
+        """Apply --resolve canonical, --elide-inverses and --materialize to a stage's triples"""
+        nonlocal elided_triples
+        if args.resolve == "canonical":
+            triples = resolution.canonicalize(triples)
+        if args.elide_inverses:
+            asserted = len(triples)
+            triples = elide_inverses(triples)
+            elided_triples += asserted - len(triples)
+        if closure is not None:
+            with metrics.stage("materialize", rows=len(triples)) as materialize:
+                asserted = len(triples)
+                if args.incremental and name in ROW_LOCAL_FILES:
+                    # Entailments per row, so the snapshot's row counts stay exact when only some rows rerun
+                    triples = closure.materialize_each(triples)
+                else:
+                    # Per stage when incremental: a type must be in the snapshot of every stage that entails it
+                    triples = closure.materialize(triples, stage_typed.setdefault(name, set()) if args.incremental
+                                                  else None)
+                materialize["triples"] = len(triples) - asserted
+        return triples
+
+    stage_results = run_stages(inputs, instances, args.workers, args.shards,
+                               [stage for stage in stages if stage not in keyed_stages], args.citation_metrics,
+                               chunk_rows)
+    for stage in keyed_stages:
+        stage_results = itertools.chain(stage_results, run_stages(key_rows(stage, False), instances, stages=[stage]))
+    if args.resolve == "sameas" and 'entity resolution' in stages:
+        stage_results = itertools.chain(stage_results, same_as_stage())
+    for name, seconds, rows, triples, count, fresh, peak_rss in stage_results:
+        if name not in metrics.stages:
+            print(f"Creating {name}...")
+        metrics.record(name, seconds, rows, len(triples), peak_rss)
+        triples = finish(name, triples)
+        with metrics.stage("emit", rows=len(triples)):
+            if args.incremental:
+                stage_lines[name] += nt_lines(triples)
+            elif writer is not None:
+                writer.write(triples)
+            elif table is not None:
+                table.add(triples)
+            else:
+                g.addN((s, p, o, g) for s, p, o in triples)
+        stage_counts[name] = stage_counts.get(name, 0) + (count or 0)
+        for key, value in fresh.items():
+            stage_outputs[key].update(value)
+
+    # The previous version of the changed rows, whose lines come out of the snapshots
+    for stage in keyed_stages:
+        for _, _, _, triples, _, _, _ in run_stages(key_rows(stage, True), instances, stages=[stage]):
+            retracted_lines[stage] += nt_lines(finish(stage, triples))
+
+    citation_count = len(references_df)
+    keyword_links = stage_counts.get('keywords', 0)
+    journal_paper_count = stage_counts.get('volumes', 0)
+    conference_paper_count = stage_counts.get('conference papers', 0)
+
+    # --- GENERATE ONTOLOGY --- #
+    if args.incremental:
+        output_files = state.write_delta(stage_lines, f"{basename}_delta", args.sparql_update, retired_stages,
+                                         retracted_lines)
+        state.save()
+        total_triples = sum(len(lines) for lines in stage_lines.values())
+    elif writer is not None:
+        writer.close()
+        total_triples = writer.count  # may include duplicates, the store dedups on load
+    elif table is not None:
+        print(f"Serializing interned triples ({len(table.terms)} distinct terms)...")
+        with metrics.stage("serialize", rows=len(table)) as serialize:
+            rows = table.unique_rows()
+            serialization_results = serialize_interned(table, rows, basename, args.formats, args.graph_iri, g)
+            total_triples = serialize["triples"] = len(rows)
+        print_serialization_report(serialization_results)
     else:
-        # Link to conference
-        conference_id = f"conference_{venue_id}"
-        if conference_id in conference_instances:
-            conference = RES[conference_id]
-            g.add((conference, RES.hasEdition, edition))
-            g.add((edition, RES.editionOf, conference))
-    
-    # Assign conference chair
-    if author_instances:
-        chair_id = random.choice(list(author_instances))
-        chair = RES[chair_id]
-        g.add((chair, RES.headsEvent, edition))
-    
-    # Create proceeding
-    proceeding_id = f"proceeding_{edition_id_num}"
-    proceeding = RES[proceeding_id]
-    
-    g.add((edition, RES.hasProceeding, proceeding))
-    g.add((proceeding, RES.proceedingName, Literal(f"Proceedings of {str(row['Conference_Edition_Name']).strip()}")))
-    
-    edition_instances.add(edition_id)
-    proceeding_instances.add(proceeding_id)
-
-print(f"Created {len(edition_instances)} editions and {len(proceeding_instances)} proceedings")
-
-# --- LINK CONFERENCE PAPERS TO EDITIONS --- #
-print("Linking conference papers to editions...")
-conference_paper_count = 0
-for _, row in conference_papers_df.iterrows():
-    paper_doi = str(row['DOI']).strip()
-    edition_id_str = str(row['Edition_id']).strip()
-    
-    if edition_id_str != 'nan' and pd.notna(row.get('Edition_id')):
-        paper_id = f"paper_{clean_string_for_uri(paper_doi)}"
-        edition_id = f"edition_{edition_id_str}"
-        proceeding_id = f"proceeding_{edition_id_str}"
-        
-        if edition_id in edition_instances:
-            paper = RES[paper_id]
-            edition = RES[edition_id]
-            proceeding = RES[proceeding_id]
-            
-            g.add((paper, RES.presentedAt, edition))
-            g.add((paper, RES.publishedInProceeding, proceeding))
-            
-            # Add pages if available
-            if pd.notna(row.get('pages')):
-                g.add((paper, RES.pages, Literal(str(row['pages']).strip())))
-            
-            conference_paper_count += 1
-
-print(f"Linked {conference_paper_count} conference papers to editions")
-
-# --- GENERATE ONTOLOGY --- #
-print("Serializing graph...")
-g.serialize(destination="abox.ttl", format="turtle")
-g.serialize(destination="abox.rdfs", format="xml")
-
-print(f"\nABox generation complete!")
-print(f"STATISTICS:")
-print(f"   Total triples: {len(g)}")
-print(f"   Authors: {len(author_instances)}")
-print(f"   Papers: {len(paper_instances)}")
-print(f"   Reviewers: {len(reviewer_instances)}")
-print(f"   Keywords: {len(keyword_instances)}")
-print(f"   Journals: {len(journal_instances)}")
-print(f"   Volumes: {len(volume_instances)}")
-print(f"   Conferences: {len(conference_instances)}")
-print(f"   Workshops: {len(workshop_instances)}")
-print(f"   Editions: {len(edition_instances)}")
-print(f"   Cities: {len(city_instances)}")
-print(f"   Proceedings: {len(proceeding_instances)}")
-print(f"   Citations: {citation_count}")
-print(f"   Journal papers: {journal_paper_count}")
-print(f"   Conference papers: {conference_paper_count}")
-
-print(f"\n FILES GENERATED:")
-print(f"   - abox.ttl")
-print(f"   - abox.rdfs")
+        print("Serializing graph...")
+        with metrics.stage("serialize") as serialize:
+            serialization_results = serialize_formats(g, basename, args.formats, args.graph_iri)
+            total_triples = serialize["rows"] = serialize["triples"] = len(g)
+        print_serialization_report(serialization_results)
+
+    print(f"\nABox generation complete!")
+    print(f"STATISTICS:")
+    print(f"   Total triples: {total_triples}")
+    if args.elide_inverses:
+        print(f"   Elided inverse triples: {elided_triples}")
+    print(f"   Authors: {len(author_instances)}")
+    print(f"   Papers: {len(paper_instances)}")
+    print(f"   Reviewers: {len(reviewer_instances)}")
+    print(f"   Keywords: {len(keyword_instances)}")
+    print(f"   Journals: {len(journal_instances)}")
+    print(f"   Volumes: {len(volume_instances)}")
+    print(f"   Conferences: {len(conference_instances)}")
+    print(f"   Workshops: {len(workshop_instances)}")
+    print(f"   Editions: {len(edition_instances)}")
+    print(f"   Cities: {len(city_instances)}")
+    print(f"   Proceedings: {len(proceeding_instances)}")
+    print(f"   Citations: {citation_count}")
+    print(f"   Journal papers: {journal_paper_count}")
+    print(f"   Conference papers: {conference_paper_count}")
+    if peak_rss_mb() is not None:
+        print(f"   Peak RSS: {peak_rss_mb():.0f} MB")
+
+    print(f"\nSTAGE TIMINGS:")
+    metrics.print_report()
+    if args.metrics:
+        metrics.write_json(args.metrics, seed=seed, workers=args.workers, shards=args.shards,
+                           mode="incremental" if args.incremental else "stream" if writer is not None
+                           else "interned" if table is not None else "graph",
+                           total_triples=total_triples, elided_inverse_triples=elided_triples)
+        output_files.append(args.metrics)
+    if profiler is not None:
+        finish_profile(profiler, args.profile)
+        output_files.append(args.profile)
+
+    print(f"\n FILES GENERATED:")
+    for output_file in output_files:
+        print(f"   - {output_file}")
+
+def main(argv=None):
+    run(parse_args(argv))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import gzip
+import http.client
+import itertools
+import queue
+import threading
+import time
+import urllib.parse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from rdflib import Graph
+
+from writers import nt_lines
+
+# --- TRIPLE STORE LOADING --- #
+# Push generated N-Triples to any SPARQL 1.1 Graph Store HTTP Protocol endpoint
+# (GraphDB: /repositories/<repo>/rdf-graphs/service, Fuseki: /<dataset>/data) in
+# batches, several at a time over keep-alive connections, retrying failed
+# batches. With a SPARQL Update endpoint a graph is replaced atomically: the
+# batches go into a staging graph which one MOVE request then swaps in.
+
+NT_CONTENT_TYPE = "application/n-triples"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# File extension -> rdflib parser, for inputs that are not N-Triples
+RDF_PARSERS = {".ttl": "turtle", ".rdfs": "xml", ".rdf": "xml", ".xml": "xml", ".jsonld": "json-ld",
+               ".nq": "nquads"}
+
+class StoreError(Exception):
+    """Raised when the store rejects a request or a batch keeps failing after its retries"""
+
+def iter_nt_lines(path):
+    """N-Triples lines of an RDF file: .nt/.nt.gz are streamed, other formats are parsed with rdflib"""
+    if path.endswith(".nt") or path.endswith(".nt.gz"):
+        opener = gzip.open if path.endswith(".gz") else open
+        with opener(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip() and not line.startswith("#"):
+                    yield line
+        return
+    extension = "." + path.rsplit(".", 1)[-1]
+    if extension not in RDF_PARSERS:
+        raise ValueError(f"Cannot load {path}: expected one of .nt, .nt.gz, {', '.join(RDF_PARSERS)}")
+    g = Graph()
+    g.parse(path, format=RDF_PARSERS[extension])
+    yield from nt_lines(g)
+
+def batches(lines, batch_size):
+    """Group lines into lists of at most batch_size"""
+    lines = iter(lines)
+    while True:
+        batch = list(itertools.islice(lines, batch_size))
+        if not batch:
+            return
+        yield batch
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections to one host, each used by one request at a time"""
+
+    def __init__(self, url, size, timeout):
+        parts = urllib.parse.urlsplit(url)
+        self.connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self.netloc = parts.netloc
+        self.timeout = timeout
+        self.idle = queue.LifoQueue()
+        for _ in range(size):
+            self.idle.put(None)  # opened on first use
+
+    def request(self, method, path, body=None, headers=None):
+        """Send one request and return (status, response body)"""
+        connection = self.idle.get()
+        try:
+            if connection is None:
+                connection = self.connection_class(self.netloc, timeout=self.timeout)
+            connection.request(method, path, body=body, headers=headers or {})
+            response = connection.getresponse()
+            return response.status, response.read()
+        except (http.client.HTTPException, OSError):
+            connection.close()
+            connection = None  # reconnect on next use
+            raise
+        finally:
+            self.idle.put(connection)
+
+    def close(self):
+        while not self.idle.empty():
+            connection = self.idle.get()
+            if connection is not None:
+                connection.close()
+
+class GraphStoreClient:
+    """Batched, concurrent uploads of N-Triples into the named graphs of a Graph Store endpoint"""
+
+    def __init__(self, store_url, update_url=None, batch_size=50_000, workers=4, retries=3, backoff=0.5,
+                 timeout=120):
+        self.store_url = store_url
+        self.update_url = update_url
+        self.batch_size = batch_size
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.pool = ConnectionPool(store_url, workers, timeout)
+        self.update_pool = ConnectionPool(update_url, 1, timeout) if update_url else None
+        self.retried = 0
+        self._retried_lock = threading.Lock()
+
+    def _send(self, pool, method, url, body=None, content_type=None, allow_missing=False):
+        """Send a request, retrying connection errors and 429/5xx responses with exponential backoff"""
+        parts = urllib.parse.urlsplit(url)
+        path = parts.path + (f"?{parts.query}" if parts.query else "")
+        headers = {"Content-Type": content_type} if content_type else {}
+        for attempt in range(self.retries + 1):
+            try:
+                status, text = pool.request(method, path, body, headers)
+                if status < 300 or (allow_missing and status == 404):
+                    return status
+                if status not in RETRY_STATUSES:
+                    raise StoreError(f"{method} {url} failed with {status}: {text[:500].decode(errors='replace')}")
+                failure = f"status {status}"
+            except (http.client.HTTPException, OSError) as e:
+                failure = repr(e)
+            if attempt == self.retries:
+                raise StoreError(f"{method} {url} still failing after {self.retries} retries ({failure})")
+            with self._retried_lock:
+                self.retried += 1
+            time.sleep(self.backoff * 2 ** attempt)
+
+    def graph_url(self, graph):
+        separator = "&" if "?" in self.store_url else "?"
+        return f"{self.store_url}{separator}graph={urllib.parse.quote(graph, safe='')}"
+
+    def update(self, sparql):
+        """Run a SPARQL Update request"""
+        if self.update_pool is None:
+            raise StoreError("No SPARQL Update endpoint configured")
+        self._send(self.update_pool, "POST", self.update_url, sparql.encode("utf-8"), "application/sparql-update")
+
+    def post_batch(self, graph, lines):
+        """Append one batch of N-Triples lines to a graph and return how many were sent"""
+        self._send(self.pool, "POST", self.graph_url(graph), "".join(lines).encode("utf-8"), NT_CONTENT_TYPE)
+        return len(lines)
+
+    def upload(self, lines, graph):
+        """Append all lines to a graph, keeping at most two batches per worker in flight; return the triple count"""
+        sent = 0
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = set()
+            for batch in batches(lines, self.batch_size):
+                if len(pending) >= 2 * self.workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    sent += sum(future.result() for future in done)
+                pending.add(executor.submit(self.post_batch, graph, batch))
+            sent += sum(future.result() for future in pending)
+        return sent
+
+    def load(self, lines, graph, replace=True):
+        """Load lines into a named graph, replacing its contents unless replace=False; return the triple count"""
+        if not replace:
+            return self.upload(lines, graph)
+        if self.update_pool is None:
+            # Without SPARQL Update the old contents are dropped first, so readers can see a partial graph
+            self._send(self.pool, "DELETE", self.graph_url(graph), allow_missing=True)
+            return self.upload(lines, graph)
+        staging = f"{graph}/loading"
+        self.update(f"DROP SILENT GRAPH <{staging}>")
+        count = self.upload(lines, staging)
+        if count:
+            self.update(f"MOVE GRAPH <{staging}> TO GRAPH <{graph}>")
+        else:
+            self.update(f"DROP SILENT GRAPH <{graph}>")  # MOVE from a graph that was never created is an error
+        return count
+
+    def close(self):
+        self.pool.close()
+        if self.update_pool is not None:
+            self.update_pool.close()
@@ -0,0 +1,55 @@
+import sys
+
+import pandas as pd
+
+# --- HELPER FUNCTIONS --- #
+URI_UNSAFE_CHARS = str.maketrans({c: "_" for c in " -./:"})
+
+# Raw key -> cleaned key, shared by every stage of the run (forked workers inherit it)
+_clean_keys = {}
+# Cleaned key -> the first raw key that produced it
+_key_owners = {}
+# Cleaned keys produced by more than one distinct raw key -> those raw keys
+uri_collisions = {}
+
+def _remember(raw, cleaned):
+    """Memoize raw -> cleaned and record a collision if another raw key already owns cleaned"""
+    _clean_keys[raw] = cleaned
+    owner = _key_owners.setdefault(cleaned, raw)
+    if owner.strip() != raw.strip():
+        uri_collisions.setdefault(cleaned, {owner}).add(raw)
+    return cleaned
+
+def clean_string_for_uri(s):
+    """Clean a string to be URI-safe"""
+    raw = str(s)
+    cleaned = _clean_keys.get(raw)
+    if cleaned is None:
+        cleaned = _remember(raw, raw.strip().translate(URI_UNSAFE_CHARS))
+    return cleaned
+
+def clean_series_for_uri(series):
+    """Vectorized clean_string_for_uri for a whole column; each distinct value is cleaned once"""
+    codes, uniques = pd.factorize(series, use_na_sentinel=False)
+    uniques = pd.Series(uniques, dtype=object).map(str)
+    new = pd.Series([raw for raw in uniques if raw not in _clean_keys], dtype=object)
+    for raw, cleaned in zip(new, new.str.strip().str.translate(URI_UNSAFE_CHARS)):
+        _remember(raw, cleaned)
+    return pd.Series(uniques.map(_clean_keys).to_numpy()[codes], index=series.index, dtype=object)
+
+def report_uri_collisions(limit=5):
+    """Print the distinct keys that were cleaned into the same URI, if any"""
+    if not uri_collisions:
+        return
+    print(f"Warning: {len(uri_collisions)} URI(s) minted from more than one distinct key:")
+    for cleaned, raws in list(uri_collisions.items())[:limit]:
+        print(f"   {cleaned} <- {sorted(raws)}")
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB, or None where the resource module is unavailable"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10  # bytes on macOS, KB on Linux
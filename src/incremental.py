@@ -0,0 +1,314 @@
+import hashlib
+import json
+import os
+import random
+import shutil
+from collections import Counter
+
+import pandas as pd
+
+# --- INCREMENTAL REGENERATION --- #
+# A manifest next to the output records a fingerprint per input file and per
+# primary key, plus an N-Triples snapshot of every stage's output. On the next
+# run only the stages whose input files changed are regenerated, and their
+# output is diffed against the snapshots into added/removed delta files.
+# The manifest also keeps the synthetic data seed of the first run: a stage
+# rerun with another seed would mint workshops, cities, chairs and editors the
+# snapshots of the other stages never saw. It keeps the options that shape every
+# stage's output too (--materialize, --elide-inverses, --resolve), and a run
+# with other options regenerates every stage instead of diffing against
+# snapshots written under the old ones.
+# Row-local stages (ROW_LOCAL_FILES) are regenerated per key when only their
+# row file changed: the rows of changed and added keys are run, the rows of
+# changed and removed keys are run again from the previous copy of the file kept
+# in the state, and the difference is merged into the stage's snapshot. Rows can
+# share triples, so the snapshot counts the rows behind each line and a line is
+# only retracted when none is left.
+
+# Input files each stage reads, directly or through the instance sets it checks
+AUTHORSHIP_FILES = ['author_paper_relationship_concat.csv', 'Author_nodes.csv', 'Paper_nodes.csv']
+STAGE_INPUTS = {
+    'authors/papers': AUTHORSHIP_FILES,
+    'reviews': ['reviews.csv'] + AUTHORSHIP_FILES,
+    'citations': ['references.csv'],
+    'keywords': ['fields_of_study.csv', 'paper_field_relationship_concat.csv'],
+    'journals': ['journals.csv'],
+    'volumes': ['Journal_papers.csv', 'journals.csv'] + AUTHORSHIP_FILES,
+    'conferences': ['conferences.csv'],
+    'workshops': ['conferences.csv'],
+    'editions': ['conference_editions.csv', 'Conference_papers.csv', 'conferences.csv'] + AUTHORSHIP_FILES,
+    'conference papers': ['Conference_papers.csv', 'conference_editions.csv'],
+    'citation metrics': ['references.csv', 'author_paper_relationship_concat.csv'],
+    'entity resolution': ['Author_nodes.csv', 'Paper_nodes.csv', 'author_paper_relationship_concat.csv'],
+}
+
+# Stages whose triples each come from one row of a file (checked against instance sets built from their other
+# inputs), with that file: {stage: row file}
+ROW_LOCAL_FILES = {
+    'reviews': 'reviews.csv',
+    'citations': 'references.csv',
+    'keywords': 'paper_field_relationship_concat.csv',
+    'conference papers': 'Conference_papers.csv',
+}
+
+# Stages that only run when asked for (--citation-metrics, --resolve sameas)
+OPTIONAL_STAGES = ['citation metrics', 'entity resolution']
+
+def parse_stages(value):
+    """Parse a comma-separated --stages value, e.g. 'citations,keywords'"""
+    stages = [s.strip() for s in value.split(",") if s.strip()]
+    unknown = [s for s in stages if s not in STAGE_INPUTS]
+    if unknown:
+        raise ValueError(f"Unknown stage(s) {unknown}, expected any of {list(STAGE_INPUTS)}")
+    return stages
+
+def stage_files(stages):
+    """Input files read by any of the stages, in STAGE_INPUTS order"""
+    files = {}
+    for stage in stages:
+        files.update(dict.fromkeys(STAGE_INPUTS[stage]))
+    return list(files)
+
+# Primary key columns per input file (rows sharing a key are fingerprinted together)
+PRIMARY_KEYS = {
+    'author_paper_relationship_concat.csv': ['DOI', 'Author_ID'],
+    'Author_nodes.csv': ['Author_ID'],
+    'Paper_nodes.csv': ['DOI'],
+    'reviews.csv': ['Paper_DOI', 'Reviewer_ID'],
+    'references.csv': ['Paper_DOI', 'Reference_DOI'],
+    'fields_of_study.csv': ['Field_ID'],
+    'paper_field_relationship_concat.csv': ['DOI', 'Field_ID'],
+    'Journal_papers.csv': ['DOI'],
+    'Conference_papers.csv': ['DOI'],
+    'conferences.csv': ['ID'],
+    'conference_editions.csv': ['Edition_ID'],
+    'journals.csv': ['ID'],
+}
+
+MANIFEST_NAME = "manifest.json"
+
+def file_fingerprint(path):
+    """sha256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def row_keys(df, key_columns):
+    """The primary key of each row, its key columns joined with '|'"""
+    keys = df[key_columns[0]].map(str)
+    for column in key_columns[1:]:
+        keys = keys + "|" + df[column].map(str)
+    return keys
+
+def key_fingerprints(df, key_columns):
+    """Map each primary key (joined with '|') to a hash of all rows carrying it"""
+    row_hashes = pd.util.hash_pandas_object(df, index=False).map("{:016x}".format)
+    keys = row_keys(df, key_columns)
+    return row_hashes.groupby(keys.values, sort=False).agg("".join).map(
+        lambda h: hashlib.blake2b(h.encode(), digest_size=8).hexdigest()).to_dict()
+
+def diff_keys(old, new):
+    """(added, removed, changed) key counts between two key fingerprint maps"""
+    added = sum(1 for key in new if key not in old)
+    removed = sum(1 for key in old if key not in new)
+    changed = sum(1 for key, h in new.items() if key in old and old[key] != h)
+    return added, removed, changed
+
+def snapshot_path(state_dir, stage):
+    """Snapshot file of one stage's output, e.g. stage_authors_papers.nt"""
+    return os.path.join(state_dir, "stage_" + stage.replace("/", "_").replace(" ", "_") + ".nt")
+
+def counts_path(state_dir, stage):
+    """Rows behind the snapshot lines of a row-local stage that more than one row produces"""
+    return snapshot_path(state_dir, stage)[:-len(".nt")] + ".counts.json"
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return set(f)
+
+class IncrementalState:
+    """Manifest and per-stage snapshots kept in a state directory between runs"""
+
+    def __init__(self, state_dir, data_dir):
+        self.state_dir = state_dir
+        self.data_dir = data_dir
+        os.makedirs(state_dir, exist_ok=True)
+        path = os.path.join(state_dir, MANIFEST_NAME)
+        self.manifest = {"files": {}, "keys": {}}
+        self.previous_run = os.path.exists(path)
+        if self.previous_run:
+            with open(path) as f:
+                self.manifest = json.load(f)
+        self.seed_known = "seed" in self.manifest
+        self.settings_changed = False
+        self.inputs_dir = os.path.join(state_dir, "inputs")  # the row files of ROW_LOCAL_FILES as last run
+        # A missing file counts as changed, so the loader reports it with the other schema problems
+        self.files = {name: file_fingerprint(os.path.join(data_dir, name))
+                      if os.path.exists(os.path.join(data_dir, name)) else None for name in PRIMARY_KEYS}
+        self.changed_files = [name for name, h in self.files.items() if self.manifest["files"].get(name) != h]
+        self.keys = {}
+
+    def seed(self, requested=None):
+        """The synthetic data seed of this state: the stored one, or `requested` (else a fresh one) for a new state.
+        Raises ValueError when `requested` differs from the stored seed"""
+        stored = self.manifest.get("seed")
+        if stored is None:
+            self.manifest["seed"] = requested if requested is not None else random.SystemRandom().randrange(2**32)
+        elif requested is not None and requested != stored:
+            raise ValueError(f"--seed {requested} differs from the seed {stored} the state in {self.state_dir} was "
+                             f"generated with; drop --seed or start a new state directory")
+        return self.manifest["seed"]
+
+    def check_settings(self, settings):
+        """Record the output options of this run; returns whether they differ from those of the stored snapshots"""
+        self.settings_changed = self.manifest.get("settings") != settings
+        self.manifest["settings"] = settings
+        return self.settings_changed
+
+    def stage_inputs(self, stage):
+        """Input files a stage's output depends on; with --resolve canonical every stage's IRIs also depend on
+        the inputs of entity resolution"""
+        files = STAGE_INPUTS[stage]
+        if (self.manifest.get("settings") or {}).get("resolve") == "canonical":
+            files = files + STAGE_INPUTS['entity resolution']
+        return files
+
+    def changed_stages(self):
+        """Stages with a changed input file or no snapshot from a previous run (every stage for a state saved
+        without its seed, whose synthetic values cannot be reproduced, or under other output options)"""
+        return [stage for stage in STAGE_INPUTS
+                if not self.seed_known or self.settings_changed
+                or any(name in self.changed_files for name in self.stage_inputs(stage))
+                or not os.path.exists(snapshot_path(self.state_dir, stage))]
+
+    def row_key_stages(self, stages):
+        """{stage: row file} of the stages among `stages` that only need the rows of changed keys: row-local
+        stages whose row file is the only changed input, with a snapshot, row counts and the previous file"""
+        if not self.previous_run or not self.seed_known or self.settings_changed:
+            return {}
+        keyed = {}
+        for stage in stages:
+            name = ROW_LOCAL_FILES.get(stage)
+            if (name in self.changed_files and name in self.manifest["keys"]
+                    and not any(other in self.changed_files for other in self.stage_inputs(stage) if other != name)
+                    and os.path.exists(counts_path(self.state_dir, stage))
+                    and os.path.exists(os.path.join(self.inputs_dir, name))):
+                keyed[stage] = name
+        return keyed
+
+    def key_rows(self, name, frame, previous):
+        """(rows of `frame` with changed or added keys, rows of `previous`, the table as last run, with changed or
+        removed keys); needs the key fingerprints of report_key_changes"""
+        old = self.manifest["keys"][name]
+        new = self.keys[name]
+        current = {key for key, h in new.items() if old.get(key) != h}
+        retracted = {key for key, h in old.items() if new.get(key) != h}
+        columns = PRIMARY_KEYS[name]
+        return (frame[row_keys(frame, columns).isin(current).to_numpy()],
+                previous[row_keys(previous, columns).isin(retracted).to_numpy()])
+
+    def report_key_changes(self, frames):
+        """Fingerprint the primary keys of changed files and print what moved"""
+        for name in self.changed_files:
+            self.keys[name] = key_fingerprints(frames[name], PRIMARY_KEYS[name])
+            old = self.manifest["keys"].get(name, {})
+            added, removed, changed = diff_keys(old, self.keys[name])
+            print(f"   {name}: +{added} -{removed} ~{changed} keys")
+
+    def merge_rows(self, stage, lines, retracted):
+        """A row-local stage's snapshot lines and row counts after adding the lines of its changed rows and
+        taking out those their previous version produced"""
+        snapshot = read_lines(snapshot_path(self.state_dir, stage))
+        with open(counts_path(self.state_dir, stage)) as f:
+            counts = json.load(f)
+        net = Counter(lines)
+        net.subtract(retracted)
+        for line, change in net.items():
+            count = counts.get(line, 1 if line in snapshot else 0) + change
+            counts.pop(line, None)
+            if count > 0:
+                snapshot.add(line)
+                if count > 1:
+                    counts[line] = count
+            else:
+                snapshot.discard(line)
+        return snapshot, counts
+
+    def write_delta(self, stage_lines, basename, sparql=False, retired=(), retracted_lines=None):
+        """Diff regenerated stages against their snapshots, write the delta files and return their paths.
+        Stages in `retracted_lines` only reran some rows: their lines are merged into the snapshot, less the
+        lines those rows produced last time. Stages in `retired` (optional stages not run this time) have their
+        snapshot retracted and removed"""
+        retracted_lines = retracted_lines or {}
+        old = set()
+        new = set()
+        retired = [stage for stage in retired if os.path.exists(snapshot_path(self.state_dir, stage))]
+        for stage in retired:
+            old.update(read_lines(snapshot_path(self.state_dir, stage)))
+        snapshots = {}
+        counts = {}
+        for stage, lines in stage_lines.items():
+            path = snapshot_path(self.state_dir, stage)
+            if os.path.exists(path):
+                old.update(read_lines(path))
+            if stage in retracted_lines:
+                snapshots[stage], counts[stage] = self.merge_rows(stage, lines, retracted_lines[stage])
+            else:
+                snapshots[stage] = set(lines)
+                if stage in ROW_LOCAL_FILES:
+                    counts[stage] = {line: count for line, count in Counter(lines).items() if count > 1}
+            new.update(snapshots[stage])
+        added = new - old
+        removed = old - new
+        # A triple can also come from a stage that was not rerun; it must survive
+        for stage in STAGE_INPUTS:
+            if stage not in stage_lines and stage not in retired and os.path.exists(snapshot_path(self.state_dir, stage)):
+                with open(snapshot_path(self.state_dir, stage), encoding="utf-8") as f:
+                    for line in f:
+                        added.discard(line)
+                        removed.discard(line)
+
+        paths = [f"{basename}_added.nt", f"{basename}_removed.nt"]
+        for path, lines in zip(paths, (added, removed)):
+            with open(path, "w", encoding="utf-8") as f:
+                f.writelines(sorted(lines))
+        if sparql:
+            paths.append(f"{basename}.ru")
+            write_sparql_update(paths[-1], added, removed)
+        for stage, lines in snapshots.items():
+            with open(snapshot_path(self.state_dir, stage), "w", encoding="utf-8") as f:
+                f.writelines(sorted(lines))
+        for stage, stage_counts in counts.items():
+            with open(counts_path(self.state_dir, stage), "w", encoding="utf-8") as f:
+                json.dump(stage_counts, f)
+        for stage in retired:
+            os.remove(snapshot_path(self.state_dir, stage))
+        print(f"   Delta: +{len(added)} -{len(removed)} triples")
+        return paths
+
+    def save(self):
+        """Persist the file and key fingerprints of this run, and the row files of the row-local stages"""
+        os.makedirs(self.inputs_dir, exist_ok=True)
+        for name in ROW_LOCAL_FILES.values():
+            if name in self.changed_files or not os.path.exists(os.path.join(self.inputs_dir, name)):
+                shutil.copyfile(os.path.join(self.data_dir, name), os.path.join(self.inputs_dir, name))
+        self.manifest["files"] = self.files
+        self.manifest["keys"].update(self.keys)
+        with open(os.path.join(self.state_dir, MANIFEST_NAME), "w") as f:
+            json.dump(self.manifest, f)
+
+def write_sparql_update(path, added, removed):
+    """Write the delta as one SPARQL UPDATE request: DELETE DATA then INSERT DATA"""
+    with open(path, "w", encoding="utf-8") as f:
+        if removed:
+            f.write("DELETE DATA {\n")
+            f.writelines("  " + line for line in sorted(removed))
+            f.write("}")
+        if removed and added:
+            f.write(" ;\n")
+        if added:
+            f.write("INSERT DATA {\n")
+            f.writelines("  " + line for line in sorted(added))
+            f.write("}\n")
@@ -0,0 +1,91 @@
+from rdflib import Graph
+import argparse
+import random
+import time
+
+from abox_stages import RES
+from json_source import JsonIngest, iter_batches, iter_records, load_keyword_ids
+from serialization import output_path, parse_formats, print_serialization_report, serialize_formats
+from synthetic import SyntheticData
+from writers import STREAM_FORMATS, TripleStreamWriter, stream_output_path
+
+def build_parser(prog=None):
+    """Command line options of the JSON ingester"""
+    parser = argparse.ArgumentParser(
+        prog=prog,
+        description="Generate the research ABox directly from a Semantic Scholar JSON dump (array or JSON Lines)")
+    parser.add_argument("source", nargs="?", default="../data/semantic_scholar_combined_results.json",
+                        help="JSON file to ingest (default: %(default)s)")
+    parser.add_argument("--keywords", default="../data/fields_of_study.csv",
+                        help="fields of study whose Field_IDs become the keywordIds, as in generate_abox.py "
+                             "(default: %(default)s)")
+    parser.add_argument("--stream", choices=list(STREAM_FORMATS), default="nt",
+                        help="format of the streamed output (default: %(default)s)")
+    parser.add_argument("--gzip", action="store_true", help="gzip-compress the streamed output")
+    parser.add_argument("--formats", type=parse_formats,
+                        help="build an in-memory graph and serialize it in these formats instead of streaming")
+    parser.add_argument("--graph-iri", default="http://research.org/abox",
+                        help="named graph for N-Quads output (default: %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="records per batch (default: %(default)s)")
+    parser.add_argument("--seed", type=int,
+                        help="seed for the synthetic emails and cities (default: a fresh random seed, printed)")
+    return parser
+
+def run(args):
+    """Generate the ABox from the JSON dump for parsed options"""
+    seed = args.seed if args.seed is not None else random.SystemRandom().randrange(2**32)
+    print(f"Synthetic data seed: {seed}")
+    ingest = JsonIngest(SyntheticData(seed), load_keyword_ids(args.keywords))
+
+    if args.formats:
+        output_files = [output_path("abox_json", format) for format in args.formats]
+        g = Graph()
+        g.bind("res", RES)
+        writer = None
+    else:
+        output_files = [stream_output_path("abox_json", args.stream, args.gzip)]
+        g = None
+        writer = TripleStreamWriter(output_files[0], args.stream, args.graph_iri, args.gzip)
+
+    # --- INGEST RECORDS --- #
+    print(f"Ingesting {args.source}...")
+    start = time.perf_counter()
+    record_count = 0
+    for batch in iter_batches(iter_records(args.source), args.batch_size):
+        triples = ingest.batch_triples(batch)
+        if writer is not None:
+            writer.write(triples)
+        else:
+            g.addN((s, p, o, g) for s, p, o in triples)
+        record_count += len(batch)
+    print(f"   {record_count} records in {time.perf_counter() - start:.2f}s")
+
+    if writer is not None:
+        writer.close()
+        total_triples = writer.count
+    else:
+        print("Serializing graph...")
+        print_serialization_report(serialize_formats(g, "abox_json", args.formats, args.graph_iri))
+        total_triples = len(g)
+
+    print(f"\nABox generation complete!")
+    print(f"STATISTICS:")
+    print(f"   Total triples: {total_triples}")
+    print(f"   Records without a DOI (skipped): {ingest.skipped}")
+    print(f"   Papers: {len(ingest.paper_instances)}")
+    print(f"   Authors: {len(ingest.author_instances)}")
+    print(f"   Keywords: {len(ingest.keyword_instances)}")
+    print(f"   Journals: {len(ingest.journal_instances)}")
+    print(f"   Volumes: {len(ingest.volume_instances)}")
+    print(f"   Conferences: {len(ingest.conference_instances)}")
+    print(f"   Editions: {len(ingest.edition_instances)}")
+
+    print(f"\n FILES GENERATED:")
+    for output_file in output_files:
+        print(f"   - {output_file}")
+
+def main(argv=None):
+    run(build_parser().parse_args(argv))
+
+if __name__ == "__main__":
+    main()
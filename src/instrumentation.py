@@ -0,0 +1,79 @@
+import cProfile
+import io
+import json
+import platform
+import pstats
+import time
+from contextlib import contextmanager
+
+from helpers import peak_rss_mb
+
+# --- STAGE METRICS --- #
+# Wall time, rows processed, triples emitted and memory per pipeline stage, so
+# a run can be compared against an earlier one. Sharded stages add up into one
+# entry. Memory is the high-water mark (peak RSS) of the process that ran the
+# stage, taken when it finished: in a serial run the jump between consecutive
+# stages is what that stage allocated; with --workers it is the worker's peak.
+
+class StageMetrics:
+    """Per-stage wall time, rows, triples and peak RSS, printable and dumpable as JSON"""
+
+    def __init__(self):
+        self.stages = {}
+
+    def record(self, name, seconds, rows=None, triples=None, peak_rss=None):
+        """Add one measurement to a stage (shards of a stage are summed)"""
+        stage = self.stages.setdefault(name, {"seconds": 0.0, "rows": None, "triples": None, "peak_rss_mb": None})
+        stage["seconds"] += seconds
+        if rows is not None:
+            stage["rows"] = (stage["rows"] or 0) + rows
+        if triples is not None:
+            stage["triples"] = (stage["triples"] or 0) + triples
+        if peak_rss is not None:
+            stage["peak_rss_mb"] = max(stage["peak_rss_mb"] or 0.0, round(peak_rss, 1))
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """Time a block as a stage; set 'rows'/'triples' on the yielded dict to record them"""
+        counts = {"rows": rows, "triples": None}
+        start = time.perf_counter()
+        yield counts
+        self.record(name, time.perf_counter() - start, counts["rows"], counts["triples"], peak_rss_mb())
+
+    def as_dict(self, **run_info):
+        """{'run': run_info, 'stages': {name: metrics with rows_per_sec}}"""
+        stages = {}
+        for name, stage in self.stages.items():
+            rows_per_sec = round(stage["rows"] / stage["seconds"]) if stage["rows"] and stage["seconds"] else None
+            stages[name] = dict(stage, seconds=round(stage["seconds"], 4), rows_per_sec=rows_per_sec)
+        peak_rss = peak_rss_mb()
+        run = dict(run_info, python=platform.python_version(),
+                   peak_rss_mb=round(peak_rss, 1) if peak_rss is not None else None)
+        return {"run": run, "stages": stages}
+
+    def write_json(self, path, **run_info):
+        with open(path, "w") as f:
+            json.dump(self.as_dict(**run_info), f, indent=2)
+
+    def print_report(self):
+        print(f"   {'stage':<18} {'seconds':>9} {'rows':>9} {'rows/s':>10} {'triples':>9} {'peak RSS':>10}")
+        for name, stage in self.as_dict()["stages"].items():
+            fields = [f"{stage['seconds']:8.3f}s"]
+            for key, width in (("rows", 9), ("rows_per_sec", 10), ("triples", 9)):
+                fields.append(f"{stage[key]:>{width}}" if stage[key] is not None else " " * (width - 1) + "-")
+            rss = f"{stage['peak_rss_mb']:7.0f} MB" if stage["peak_rss_mb"] is not None else " " * 9 + "-"
+            print(f"   {name:<18} " + " ".join(fields) + f" {rss}")
+
+def start_profile():
+    """Start a cProfile profiler for the rest of the run"""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    return profiler
+
+def finish_profile(profiler, path, top=15):
+    """Stop the profiler, dump its stats to path (load with pstats or snakeviz) and print the top entries"""
+    profiler.disable()
+    profiler.dump_stats(path)
+    out = io.StringIO()
+    pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(top)
+    print(out.getvalue())
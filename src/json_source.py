@@ -0,0 +1,252 @@
+import csv
+import json
+
+from rdflib import Literal
+from rdflib.namespace import RDF, XSD
+
+from abox_stages import RES
+from helpers import clean_string_for_uri
+
+try:
+    import ijson
+    HAVE_IJSON = True
+except ImportError:
+    HAVE_IJSON = False
+
+# --- SEMANTIC SCHOLAR JSON INGESTION --- #
+# Map the raw Semantic Scholar dump straight to ABox triples, one batch of
+# records at a time, instead of going through the flattened CSVs. The dump is
+# read incrementally (a JSON array or JSON Lines), so memory stays flat in the
+# file size; only the sets of entities already emitted grow, with the number of
+# distinct authors, venues, volumes, editions and keywords.
+# URIs and properties are the same as the CSV stages in abox_stages.py.
+
+READ_SIZE = 1 << 16
+
+def _iter_array(f, decoder):
+    """Decode the elements of a top-level JSON array one by one with raw_decode"""
+    buffer = f.read(READ_SIZE).lstrip()
+    if not buffer.startswith("["):
+        raise ValueError("expected a JSON array")
+    pos = 1
+    read_size = READ_SIZE
+    count = 0
+    while True:
+        # Skip the whitespace and comma between two elements
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        try:
+            record, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError as error:
+            record, end = error, len(buffer)
+        if end == len(buffer) or buffer[end] not in " \t\r\n,]":
+            # The element is cut off at the end of the buffer, or is a number that may go on past it
+            # (1|2 or 1.5e|3 split by the read): read more of it and decode it again
+            chunk = f.read(read_size)
+            if chunk:
+                buffer = buffer[pos:] + chunk
+                pos = 0
+                read_size *= 2
+                continue
+        if isinstance(record, json.JSONDecodeError):
+            raise record
+        if not isinstance(record, dict):
+            raise ValueError(f"expected a JSON array of objects, found {json.dumps(record)[:40]} at element {count}")
+        read_size = READ_SIZE
+        count += 1
+        yield record
+        pos = end
+
+def iter_records(path):
+    """Yield the records of a JSON array or JSON Lines file without loading the whole file"""
+    with open(path, encoding="utf-8") as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+        f.seek(0)
+        if first != "[":
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif HAVE_IJSON:
+            yield from ijson.items(f, "item", use_float=True)
+        else:
+            yield from _iter_array(f, json.JSONDecoder())
+
+def load_keyword_ids(path):
+    """{field name: Field_ID} of fields_of_study.csv, so the JSON path reuses the CSV pipeline's keywordIds"""
+    with open(path, newline="", encoding="utf-8") as f:
+        return {row['Field_Name'].strip(): int(row['Field_ID']) for row in csv.DictReader(f)}
+
+def iter_batches(records, batch_size):
+    """Group an iterator of records into lists of at most batch_size"""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+class JsonIngest:
+    """Turn batches of Semantic Scholar records into ABox triples, emitting each entity once"""
+
+    def __init__(self, synthetic, keyword_ids=None):
+        self.synthetic = synthetic
+        self.paper_instances = set()
+        self.author_instances = set()
+        self.journal_instances = set()
+        self.volume_instances = set()
+        self.conference_instances = set()
+        self.edition_instances = set()
+        self.city_instances = set()
+        # field name -> keywordId: the Field_IDs of fields_of_study.csv, then fields it lacks numbered after them
+        self.keyword_ids = dict(keyword_ids or {})
+        self.keyword_instances = set()
+        self.skipped = 0  # records without a DOI, which the CSV pipeline cannot key either
+
+    def batch_triples(self, records):
+        """ABox triples for one batch of records"""
+        triples = []
+        new_authors = {}
+        for record in records:
+            doi = (record.get("externalIds") or {}).get("DOI")
+            if not doi:
+                self.skipped += 1
+                continue
+            paper_key = "paper_" + clean_string_for_uri(doi)
+            paper = RES[paper_key]
+            if paper_key not in self.paper_instances:
+                self.paper_instances.add(paper_key)
+                triples += self.paper_triples(paper, doi, record)
+            triples += self.authorship_triples(paper, record.get("authors") or [], new_authors)
+            triples += self.keyword_triples(paper, record.get("s2FieldsOfStudy") or [])
+            triples += self.venue_triples(paper, record)
+            for reference in record.get("references") or []:
+                cited_doi = (reference.get("externalIds") or {}).get("DOI")
+                if cited_doi:
+                    cited = RES["paper_" + clean_string_for_uri(cited_doi)]
+                    triples += [(paper, RES.cites, cited), (cited, RES.citedBy, paper)]
+
+        # Author info for the authors first seen in this batch, with their synthetic emails
+        if new_authors:
+            ids = list(new_authors)
+            names = [new_authors[author_id] for author_id in ids]
+            for author_id, name, email in zip(ids, names, self.synthetic.emails(names, ids)):
+                author = RES[f"author_{author_id}"]
+                triples += [(author, RES.name, Literal(name)), (author, RES.email, Literal(email)),
+                            (author, RES.authorId, Literal(author_id, datatype=XSD.integer))]
+        return triples
+
+    def paper_triples(self, paper, doi, record):
+        triples = [(paper, RES.title, Literal(str(record.get("title")).strip())), (paper, RES.doi, Literal(doi))]
+        for key, prop in (("abstract", RES.abstract), ("url", RES.url)):
+            if record.get(key) is not None:
+                triples.append((paper, prop, Literal(str(record[key]).strip())))
+        for key, prop in (("citationCount", RES.citationCount), ("referenceCount", RES.referenceCount),
+                          ("year", RES.year)):
+            if record.get(key) is not None:
+                triples.append((paper, prop, Literal(int(record[key]), datatype=XSD.integer)))
+        if record.get("publicationDate"):
+            triples.append((paper, RES.publicationDate, Literal(record["publicationDate"][:10], datatype=XSD.date)))
+        return triples
+
+    def authorship_triples(self, paper, authors, new_authors):
+        """writes links; the first listed author is the corresponding author, as in the CSVs"""
+        triples = []
+        for position, author in enumerate(authors):
+            if not author.get("authorId"):
+                continue
+            author_id = int(author["authorId"])
+            key = f"author_{author_id}"
+            if key not in self.author_instances:
+                self.author_instances.add(key)
+                new_authors[author_id] = str(author.get("name")).strip()
+            prop = RES.isCorrespondingAuthor if position == 0 else RES.writes
+            triples.append((RES[key], prop, paper))
+        return triples
+
+    def keyword_triples(self, paper, fields):
+        triples = []
+        for name in dict.fromkeys(field["category"] for field in fields if field.get("category")):
+            name = name.strip()
+            keyword = RES[name.replace(" ", "_")]
+            if name not in self.keyword_instances:
+                self.keyword_instances.add(name)
+                if name not in self.keyword_ids:
+                    self.keyword_ids[name] = max(self.keyword_ids.values(), default=0) + 1
+                triples.append((keyword, RES.keywordId, Literal(self.keyword_ids[name], datatype=XSD.integer)))
+            triples.append((paper, RES.hasKeyword, keyword))
+        return triples
+
+    def venue_triples(self, paper, record):
+        """Journal/volume or conference/edition triples and the paper's links to them"""
+        venue = record.get("publicationVenue") or {}
+        venue_id = venue.get("id")
+        journal = record.get("journal") or {}
+        if not venue_id:
+            return []
+        triples = []
+        if venue.get("type") == "journal":
+            key = f"journal_{venue_id}"
+            if key not in self.journal_instances:
+                self.journal_instances.add(key)
+                triples += [(RES[key], RES.journalName, Literal(str(venue.get("name")).strip())),
+                            (RES[key], RES.eventId, Literal(venue_id))]
+                for field, prop in (("issn", RES.issn), ("url", RES.journalUrl)):
+                    if venue.get(field):
+                        triples.append((RES[key], prop, Literal(str(venue[field]).strip())))
+            triples.append((paper, RES.publishedInJournal, RES[key]))
+            volume = journal.get("volume")
+            if volume:
+                volume = str(volume).strip()
+                volume_key = f"volume_{clean_string_for_uri(volume)}_{venue_id}"
+                if volume_key not in self.volume_instances:
+                    self.volume_instances.add(volume_key)
+                    triples += [(RES[key], RES.hasVolume, RES[volume_key]),
+                                (RES[volume_key], RES.volumeOf, RES[key]),
+                                (RES[volume_key], RES.volumeNumber, Literal(volume))]
+                    if record.get("year") is not None:
+                        triples.append((RES[volume_key], RES.volumeYear,
+                                        Literal(int(record["year"]), datatype=XSD.integer)))
+                triples.append((paper, RES.publishedInVolume, RES[volume_key]))
+        elif venue.get("type") == "conference":
+            key = f"conference_{venue_id}"
+            name = str(venue.get("name")).strip()
+            if key not in self.conference_instances:
+                self.conference_instances.add(key)
+                triples += [(RES[key], RES.eventName, Literal(name)), (RES[key], RES.eventId, Literal(venue_id)),
+                            (RES[key], RDF.type, RES["conference"])]
+                if venue.get("url"):
+                    triples.append((RES[key], RES.eventUrl, Literal(str(venue["url"]).strip())))
+            if record.get("year") is not None:
+                triples += self.edition_triples(paper, RES[key], venue_id, name, int(record["year"]))
+        else:
+            return triples
+        if journal.get("pages"):
+            triples.append((paper, RES.pages, Literal(str(journal["pages"]).strip())))
+        return triples
+
+    def edition_triples(self, paper, conference, venue_id, name, year):
+        """The yearly edition of a conference (Edition_ID is '<year><venue id>') and its proceedings"""
+        edition_id = f"{year}{venue_id}"
+        edition = RES[f"edition_{edition_id}"]
+        proceeding = RES[f"proceeding_{edition_id}"]
+        triples = []
+        if f"edition_{edition_id}" not in self.edition_instances:
+            self.edition_instances.add(f"edition_{edition_id}")
+            edition_name = f"{year} {name}"
+            city = "city_" + clean_string_for_uri(self.synthetic.cities([edition_id])[0])
+            self.city_instances.add(city)
+            triples += [(edition, RES.editionId, Literal(edition_id)),
+                        (edition, RES.editionName, Literal(edition_name)),
+                        (edition, RES.heldInYear, Literal(year, datatype=XSD.integer)),
+                        (edition, RES.heldInCity, RES[city]),
+                        (conference, RES.hasEdition, edition), (edition, RES.editionOf, conference),
+                        (edition, RES.hasProceeding, proceeding),
+                        (proceeding, RES.proceedingName, Literal(f"Proceedings of {edition_name}"))]
+        triples += [(paper, RES.presentedAt, edition), (paper, RES.publishedInProceeding, proceeding)]
+        return triples
@@ -0,0 +1,97 @@
+import argparse
+import os
+import time
+
+from graph_store import GraphStoreClient, StoreError, iter_nt_lines
+from materialize import with_inverse_lines
+from store_stub import StubStore
+
+# Generated files tried in order when --tbox/--abox is not given
+DEFAULT_INPUTS = {
+    "tbox": ["tbox.nt", "tbox.ttl", "tbox.rdfs"],
+    "abox": ["abox.nt", "abox.nt.gz", "abox.ttl", "abox.rdfs"],
+}
+
+def build_parser(prog=None):
+    """Command line options of the store loader"""
+    parser = argparse.ArgumentParser(prog=prog,
+                                     description="Load the generated TBox and ABox into a SPARQL 1.1 Graph Store")
+    parser.add_argument("--endpoint",
+                        help="Graph Store protocol URL, e.g. "
+                             "http://localhost:7200/repositories/research/rdf-graphs/service "
+                             "or http://localhost:3030/research/data")
+    parser.add_argument("--update-endpoint",
+                        help="SPARQL Update URL (e.g. .../repositories/research/statements or .../research/update); "
+                             "with it each graph is replaced atomically")
+    parser.add_argument("--tbox", help="TBox file (default: the first of tbox.nt, tbox.ttl, tbox.rdfs that exists)")
+    parser.add_argument("--abox", help="ABox file (default: the first of abox.nt, abox.nt.gz, abox.ttl, abox.rdfs)")
+    parser.add_argument("--tbox-graph", default="http://research.org/tbox",
+                        help="named graph for the TBox (default: %(default)s)")
+    parser.add_argument("--abox-graph", default="http://research.org/abox",
+                        help="named graph for the ABox (default: %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=50_000, help="triples per upload (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=4, help="concurrent uploads (default: %(default)s)")
+    parser.add_argument("--retries", type=int, default=3, help="retries per failed upload (default: %(default)s)")
+    parser.add_argument("--append", action="store_true", help="add to the named graphs instead of replacing them")
+    parser.add_argument("--materialize-inverses", action="store_true",
+                        help="add citedBy, volumeOf and editionOf for an ABox generated with --elide-inverses, "
+                             "for stores without OWL reasoning")
+    parser.add_argument("--stub", action="store_true",
+                        help="load into a local in-memory stand-in store instead of --endpoint, to try the load")
+    parser.add_argument("--fail-every", type=int, default=0, help="with --stub, fail every n-th upload with a 503")
+    return parser
+
+def parse_args(argv=None, prog=None):
+    """Parse and check the command line"""
+    parser = build_parser(prog)
+    args = parser.parse_args(argv)
+    if not args.endpoint and not args.stub:
+        parser.error("either --endpoint or --stub is required")
+    return args
+
+def run(args):
+    """Load the TBox and ABox files for parsed options into the store"""
+    inputs = []
+    for name, graph in (("tbox", args.tbox_graph), ("abox", args.abox_graph)):
+        path = getattr(args, name) or next((p for p in DEFAULT_INPUTS[name] if os.path.exists(p)), None)
+        if path is None:
+            print(f"No {name.upper()} file found (tried {', '.join(DEFAULT_INPUTS[name])}), skipping")
+            continue
+        inputs.append((path, graph))
+
+    stub = StubStore(fail_every=args.fail_every).start() if args.stub else None
+    endpoint = stub.data_url if stub else args.endpoint
+    update_endpoint = stub.update_url if stub else args.update_endpoint
+    if not update_endpoint and not args.append:
+        print("Warning: no --update-endpoint, graphs are cleared before loading and are partial until it finishes")
+
+    # --- LOAD GRAPHS --- #
+    client = GraphStoreClient(endpoint, update_endpoint, args.batch_size, args.workers, args.retries)
+    try:
+        for path, graph in inputs:
+            print(f"Loading {path} into <{graph}>...")
+            start = time.perf_counter()
+            lines = iter_nt_lines(path)
+            if args.materialize_inverses and graph == args.abox_graph:
+                lines = with_inverse_lines(lines)
+            count = client.load(lines, graph, replace=not args.append)
+            seconds = time.perf_counter() - start
+            print(f"   {count} triples in {seconds:.2f}s ({count / seconds if seconds else 0:,.0f} triples/s)")
+    except StoreError as e:
+        print(f"Error loading into the store: {e}")
+        exit(1)
+    finally:
+        client.close()
+
+    print(f"\nStore load complete!")
+    print(f"   Retried uploads: {client.retried}")
+    if stub is not None:
+        for _, graph in inputs:
+            print(f"   <{graph}> now holds {stub.graph_size(graph)} triples")
+        stub.stop()
+
+def main(argv=None):
+    run(parse_args(argv))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+import hashlib
+import json
+import os
+
+import pandas as pd
+
+from incremental import file_fingerprint
+
+try:
+    import pyarrow  # noqa: F401
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+# --- DATA LOADING --- #
+# Every input CSV has an explicit schema: the columns the stages read and their
+# dtypes. Files are validated up front, parsed with only those columns (with the
+# pyarrow engine when it is installed), and cached in a binary format keyed by
+# the source's mtime/size and content hash, so repeat runs skip CSV parsing.
+
+SCHEMAS = {
+    'author_paper_relationship_concat.csv': {'DOI': 'str', 'Author_ID': 'Int64', 'Corresponding': 'boolean'},
+    'Author_nodes.csv': {'Author_Name': 'str', 'Author_ID': 'Int64'},
+    'Paper_nodes.csv': {'DOI': 'str', 'Title': 'str', 'Abstract': 'str', 'Year': 'Int64',
+                        'publicationDate': 'str', 'Citations': 'Int64', 'References': 'Int64', 'URL': 'str'},
+    'reviews.csv': {'Paper_DOI': 'str', 'Reviewer_ID': 'Int64'},
+    'references.csv': {'Paper_DOI': 'str', 'Reference_DOI': 'str'},
+    'fields_of_study.csv': {'Field_Name': 'str', 'Field_ID': 'Int64'},
+    'paper_field_relationship_concat.csv': {'DOI': 'str', 'Field_ID': 'Int64'},
+    'Journal_papers.csv': {'DOI': 'str', 'venue_id': 'category', 'volume': 'str', 'pages': 'str', 'Year': 'Int64'},
+    'Conference_papers.csv': {'DOI': 'str', 'Edition_id': 'category', 'pages': 'str'},
+    'conferences.csv': {'ID': 'str', 'Name': 'str', 'url': 'str'},
+    'conference_editions.csv': {'Edition_ID': 'str', 'Venue_ID': 'category', 'Conference_Edition_Name': 'str',
+                                'Year': 'Int64'},
+    'journals.csv': {'ID': 'str', 'Name': 'str', 'issn': 'str', 'url': 'str'},
+}
+
+# Columns holding DOIs, which become paper URIs
+DOI_COLUMNS = [
+    ('Paper_nodes.csv', 'DOI'),
+    ('author_paper_relationship_concat.csv', 'DOI'),
+    ('reviews.csv', 'Paper_DOI'),
+    ('references.csv', 'Paper_DOI'),
+    ('references.csv', 'Reference_DOI'),
+    ('paper_field_relationship_concat.csv', 'DOI'),
+    ('Journal_papers.csv', 'DOI'),
+    ('Conference_papers.csv', 'DOI'),
+]
+
+# Files with free text that can contain quoted newlines. pyarrow's CSV reader splits
+# its parallel blocks on raw newlines, so these go through the C engine instead.
+MULTILINE_FILES = {'Paper_nodes.csv'}
+
+CACHE_FORMAT_VERSION = 2
+
+class SchemaError(Exception):
+    """Raised when input files are missing or lack required columns"""
+
+    def __init__(self, problems):
+        super().__init__("\n".join(problems))
+        self.problems = problems
+
+def validate_sources(data_dir, schemas=SCHEMAS):
+    """Check every input file exists and its header has the schema's columns; return a list of problems"""
+    problems = []
+    for name, schema in schemas.items():
+        path = os.path.join(data_dir, name)
+        if not os.path.exists(path):
+            problems.append(f"{name}: file not found in {data_dir}")
+            continue
+        header = pd.read_csv(path, nrows=0).columns
+        missing = [column for column in schema if column not in header]
+        if missing:
+            problems.append(f"{name}: missing column(s) {missing}")
+    return problems
+
+def csv_engine(name):
+    """read_csv engine for an input file"""
+    return "pyarrow" if HAVE_PYARROW and name not in MULTILINE_FILES else "c"
+
+def schema_key(name, schema):
+    """Short digest of a file's schema and parser, so changing either invalidates the cache"""
+    text = json.dumps([CACHE_FORMAT_VERSION, csv_engine(name), sorted(schema.items())])
+    return hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+
+def parse_csv(path, schema, engine):
+    """Parse only the schema's columns with their declared dtypes"""
+    return pd.read_csv(path, usecols=list(schema), dtype=schema, engine=engine)[list(schema)]
+
+class TableCache:
+    """Parsed frames stored as Feather (or pickle without pyarrow), keyed by source stat and content hash"""
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.extension = "feather" if HAVE_PYARROW else "pkl"
+
+    def _paths(self, name):
+        base = os.path.join(self.cache_dir, name)
+        return f"{base}.{self.extension}", f"{base}.json"
+
+    def load(self, name, path, schema):
+        """Return the cached frame for a source file, or None when the cache is stale"""
+        data_path, meta_path = self._paths(name)
+        if not (os.path.exists(data_path) and os.path.exists(meta_path)):
+            return None
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("schema") != schema_key(name, schema):
+            return None
+        stat = os.stat(path)
+        if (meta.get("mtime_ns"), meta.get("size")) != (stat.st_mtime_ns, stat.st_size):
+            # Touched or copied: still valid if the content is the same
+            if meta.get("sha256") != file_fingerprint(path):
+                return None
+            meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            with open(meta_path, "w") as f:
+                json.dump(meta, f)
+        if self.extension == "feather":
+            return pd.read_feather(data_path)
+        return pd.read_pickle(data_path)
+
+    def store(self, name, path, schema, df):
+        data_path, meta_path = self._paths(name)
+        if self.extension == "feather":
+            df.to_feather(data_path)
+        else:
+            df.to_pickle(data_path)
+        stat = os.stat(path)
+        with open(meta_path, "w") as f:
+            json.dump({"schema": schema_key(name, schema), "mtime_ns": stat.st_mtime_ns, "size": stat.st_size,
+                       "sha256": file_fingerprint(path)}, f)
+
+def empty_table(schema):
+    """Frame with the schema's columns and dtypes and no rows"""
+    return pd.DataFrame({column: pd.Series(dtype=dtype) for column, dtype in schema.items()})
+
+def load_tables(data_dir, cache_dir=None, schemas=SCHEMAS, files=None):
+    """Validate and load every input file (or only those in `files`, the others as empty frames);
+    return {file name: DataFrame}"""
+    wanted = {name: schema for name, schema in schemas.items() if files is None or name in files}
+    problems = validate_sources(data_dir, wanted)
+    if problems:
+        raise SchemaError(problems)
+    cache = TableCache(cache_dir) if cache_dir else None
+    tables = {}
+    for name, schema in schemas.items():
+        if name not in wanted:
+            tables[name] = empty_table(schema)
+            continue
+        path = os.path.join(data_dir, name)
+        df = cache.load(name, path, schema) if cache else None
+        if df is None:
+            df = parse_csv(path, schema, csv_engine(name))
+            if cache:
+                cache.store(name, path, schema, df)
+        tables[name] = df
+    return tables
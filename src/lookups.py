@@ -0,0 +1,17 @@
+from helpers import clean_series_for_uri
+
+# --- LOOKUP INDEXES --- #
+# Built once at load time so every stage resolves entities through a hash index
+# (single .loc lookups or bulk .reindex) instead of a boolean mask over the whole DataFrame.
+
+def build_author_index(authors_df):
+    """Index the author table by Author_ID (int), keeping the first occurrence"""
+    authors = authors_df[authors_df['Author_ID'].notna()]
+    authors = authors.drop_duplicates(subset='Author_ID', keep='first')
+    return authors.set_index(authors['Author_ID'].astype('int64'))
+
+def build_paper_index(papers_df):
+    """Index the paper table by cleaned DOI, keeping the first occurrence"""
+    keys = clean_series_for_uri(papers_df['DOI'])
+    papers = papers_df[~keys.duplicated(keep='first')]
+    return papers.set_index(keys[papers.index])
@@ -0,0 +1,116 @@
+from rdflib import Literal, RDF, RDFS
+
+from ontology import INVERSES, RES
+from terms import TripleColumns
+
+# --- RDFS MATERIALIZATION --- #
+# Forward-chain the RDFS rules the TBox uses (rdfs2 domain, rdfs3 range, rdfs7
+# subPropertyOf, rdfs9 subClassOf) into the ABox at generation time, so it can
+# be loaded into a store without a reasoning ruleset. Everything an ABox triple
+# entails depends only on its predicate (and, for rdf:type, its class), so the
+# TBox is compiled once into per-predicate tables and the ABox is closed in a
+# single pass. The entailed triples are in the closure already: superproperty
+# domains/ranges and superclasses are folded into the tables.
+
+def transitive_closure(pairs):
+    """{node: set of node and everything reachable from it} for (sub, super) pairs"""
+    parents = {}
+    for sub, sup in pairs:
+        parents.setdefault(sub, set()).add(sup)
+        parents.setdefault(sup, set())
+    closure = {}
+    for node in parents:
+        seen = {node}
+        stack = [node]
+        while stack:
+            for parent in parents[stack.pop()]:
+                if parent not in seen:
+                    seen.add(parent)
+                    stack.append(parent)
+        closure[node] = seen
+    return closure
+
+class RdfsClosure:
+    """Per-predicate entailment tables compiled from a TBox graph"""
+
+    def __init__(self, tbox):
+        classes = set(tbox.subjects(RDF.type, RDFS.Class))
+        self.superclasses = transitive_closure(tbox.subject_objects(RDFS.subClassOf))
+        superproperties = transitive_closure(tbox.subject_objects(RDFS.subPropertyOf))
+        properties = set(tbox.subjects(RDF.type, RDF.Property)) | set(superproperties)
+
+        # Only class domains/ranges type resources; datatype ranges (xsd:*) describe literals
+        def types(prop, constraint):
+            found = set()
+            for sup in superproperties.get(prop, {prop}):
+                for cls in tbox.objects(sup, constraint):
+                    if cls in classes or cls in self.superclasses:
+                        found |= self.superclasses.get(cls, {cls})
+            return found
+
+        self.superproperties = {p: superproperties.get(p, {p}) - {p} for p in properties}
+        self.domain_types = {p: types(p, RDFS.domain) for p in properties}
+        self.range_types = {p: types(p, RDFS.range) for p in properties}
+        self.typed = set()  # (resource, class) pairs already emitted
+
+    def _type(self, resource, classes, out, typed):
+        for cls in classes:
+            if (resource, cls) not in typed:
+                typed.add((resource, cls))
+                out.append((resource, RDF.type, cls))
+
+    def materialize(self, triples, typed=None):
+        """The triples followed by everything they entail that was not emitted before.
+        `typed` holds the (resource, class) pairs already emitted (default: those of every earlier call)"""
+        typed = self.typed if typed is None else typed
+        triples = list(triples)  # builds the terms of a TripleColumns once
+        out = list(triples)
+        for s, p, o in triples:
+            if p == RDF.type:
+                typed.add((s, o))  # asserted, so not repeated as entailed
+                self._type(s, self.superclasses.get(o, {o}), out, typed)
+                continue
+            for sup in self.superproperties.get(p, ()):
+                out.append((s, sup, o))
+            self._type(s, self.domain_types.get(p, ()), out, typed)
+            if not isinstance(o, Literal):
+                self._type(o, self.range_types.get(p, ()), out, typed)
+        return out
+
+    def materialize_each(self, triples):
+        """The triples followed by everything each one entails, repeated for every triple entailing it, so the
+        output for any split of the triples adds up to the output for all of them (for per-row snapshot counts)"""
+        triples = list(triples)
+        out = list(triples)
+        for s, p, o in triples:
+            if p == RDF.type:
+                out += [(s, RDF.type, cls) for cls in self.superclasses.get(o, {o}) if cls != o]
+                continue
+            out += [(s, sup, o) for sup in self.superproperties.get(p, ())]
+            out += [(s, RDF.type, cls) for cls in self.domain_types.get(p, ())]
+            if not isinstance(o, Literal):
+                out += [(o, RDF.type, cls) for cls in self.range_types.get(p, ())]
+        return out
+
+# --- INVERSE PROPERTIES --- #
+# For each pair in ontology.INVERSES, --elide-inverses keeps only the first
+# property in the ABox; the TBox (--declare-inverses) declares owl:inverseOf, so
+# a store with OWL reasoning infers the other direction. For a store without
+# reasoning, the loader writes the inverses back line by line as it streams.
+
+def elide_inverses(triples, inverses=INVERSES):
+    """The triples without those of the second (inferable) property of each inverse pair"""
+    elided = {RES[inverse] for _, inverse in inverses}
+    if isinstance(triples, TripleColumns):
+        return triples.without(elided)
+    return [t for t in triples if t[1] not in elided]
+
+def with_inverse_lines(lines, inverses=INVERSES):
+    """N-Triples lines, each one of a kept property followed by its inverse triple"""
+    inverse_of = {f"<{RES[prop]}>": f"<{RES[inverse]}>" for prop, inverse in inverses}
+    for line in lines:
+        yield line
+        subject, predicate, rest = line.split(" ", 2)
+        if predicate in inverse_of:
+            obj = rest.rstrip()[:-1].rstrip()  # drop the closing " ."
+            yield f"{obj} {inverse_of[predicate]} {subject} .\n"
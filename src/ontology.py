@@ -0,0 +1,153 @@
+from rdflib import Graph, Namespace, OWL, RDF, RDFS
+from rdflib.namespace import XSD
+
+# --- TBOX DEFINITIONS --- #
+# The research ontology, shared by generate_tbox.py (which writes it) and the
+# ABox passes that reason over it (RDFS materialization).
+
+RES = Namespace("http://research.org/research#")
+
+CLASSES = [
+    "person", "author", "reviewer", "journalEditor", "conferenceChair", 
+    "paper", "keyword", "volume", "journal", "edition", "proceeding", 
+    "event", "workshop", "conference", "city"
+]
+
+SUBCLASSES = [
+    ("author", "person"),
+    ("reviewer", "author"),  # Reviewers are relevant authors
+    ("journalEditor", "person"),
+    ("conferenceChair", "person"),
+    ("workshop", "event"),
+    ("conference", "event"),
+]
+
+PROPERTIES = [
+    # Person properties 
+    ("name", "person", XSD.string),
+    ("email", "person", XSD.string),
+    ("authorId", "author", XSD.integer),
+    
+    # Editorial roles
+    ("headsJournal", "journalEditor", "journal"),
+    ("headsEvent", "conferenceChair", "edition"),
+    
+    # Authorship (matching your exact usage)
+    ("writes", "author", "paper"),
+    ("isCorrespondingAuthor", "author", "paper"),
+    ("reviews", "reviewer", "paper"), 
+    
+    # Paper properties 
+    ("title", "paper", XSD.string),
+    ("abstract", "paper", XSD.string),
+    ("doi", "paper", XSD.string),
+    ("url", "paper", XSD.string),
+    ("publicationDate", "paper", XSD.date),
+    ("year", "paper", XSD.integer),
+    ("citationCount", "paper", XSD.integer),
+    ("referenceCount", "paper", XSD.integer),
+    ("pages", "paper", XSD.string),
+    
+    # Paper relationships
+    ("hasKeyword", "paper", "keyword"),
+    ("cites", "paper", "paper"),
+    ("citedBy", "paper", "paper"),  
+    
+    # Keyword properties 
+    ("keywordId", "keyword", XSD.integer),
+    
+    # Journal publication 
+    ("publishedInJournal", "paper", "journal"),
+    ("publishedInVolume", "paper", "volume"),
+    ("hasVolume", "journal", "volume"),
+    ("volumeOf", "volume", "journal"),
+    ("journalName", "journal", XSD.string),
+    ("issn", "journal", XSD.string),
+    ("journalUrl", "journal", XSD.string),
+    ("volumeNumber", "volume", XSD.string),
+    ("volumeYear", "volume", XSD.integer),
+    
+    # Conference/Workshop publication 
+    ("presentedAt", "paper", "edition"),  # Used in ABox
+    ("publishedInProceeding", "paper", "proceeding"),  # Used in ABox
+    ("hasEdition", "event", "edition"),
+    ("editionOf", "edition", "event"),  # Inverse relationship used in ABox
+    ("hasProceeding", "edition", "proceeding"),
+    
+    # Event properties 
+    ("eventName", "event", XSD.string),
+    ("eventUrl", "event", XSD.string),
+    ("eventId", "event", XSD.string),  # From conferences.csv ID
+    
+    # Edition properties (conference_editions.csv)
+    ("editionId", "edition", XSD.string),
+    ("editionName", "edition", XSD.string),
+    ("heldInYear", "edition", XSD.integer),
+    ("heldInCity", "edition", "city"),
+    ("venueId", "edition", XSD.string),  
+    
+    # Proceeding properties
+    ("proceedingName", "proceeding", XSD.string),
+
+    # Citation metrics (generate_abox.py --citation-metrics)
+    ("pageRank", "paper", XSD.double),
+    ("inDegree", "paper", XSD.integer),
+    ("outDegree", "paper", XSD.integer),
+    ("coCitationCount", "paper", XSD.integer),
+    ("coCitedWith", "paper", "paper"),
+    ("hIndex", "author", XSD.integer),
+]
+
+SUBPROPERTIES = [
+    ("isCorrespondingAuthor", "writes"),
+]
+
+# Inverse pairs (kept, elided): generate_tbox.py --declare-inverses states them as
+# owl:inverseOf and generate_abox.py --elide-inverses emits only the first property
+INVERSES = [
+    ("cites", "citedBy"),
+    ("hasVolume", "volumeOf"),
+    ("hasEdition", "editionOf"),
+]
+
+def build_tbox(declare_inverses=False):
+    """The TBox as an rdflib Graph, optionally with the owl:inverseOf pairs"""
+    g = Graph()
+    g.bind("res", RES)
+    g.bind("rdfs", RDFS)
+    g.bind("xsd", XSD)
+
+    # --- CLASSES --- #
+    for c in CLASSES:
+        g.add((RES[c], RDF.type, RDFS.Class))
+
+    # --- SUBCLASSES --- #
+    for sub, sup in SUBCLASSES:
+        g.add((RES[sub], RDFS.subClassOf, RES[sup]))
+
+    # --- SUBPROPERTIES --- #
+    for sub, sup in SUBPROPERTIES:
+        g.add((RES[sub], RDFS.subPropertyOf, RES[sup]))
+
+    # --- INVERSE PROPERTIES --- #
+    if declare_inverses:
+        g.bind("owl", OWL)
+        for prop, inverse in INVERSES:
+            g.add((RES[prop], OWL.inverseOf, RES[inverse]))
+
+    # Add all properties with proper domains and ranges
+    for prop, domain, range_ in PROPERTIES:
+        g.add((RES[prop], RDF.type, RDF.Property))
+
+        # Handle domain
+        if isinstance(domain, str) and not str(domain).startswith("http://www.w3.org/2001/XMLSchema"):
+            g.add((RES[prop], RDFS.domain, RES[domain]))
+        else:
+            g.add((RES[prop], RDFS.domain, domain))
+
+        # Handle range
+        if isinstance(range_, str) and not str(range_).startswith("http://www.w3.org/2001/XMLSchema"):
+            g.add((RES[prop], RDFS.range, RES[range_]))
+        else:
+            g.add((RES[prop], RDFS.range, range_))
+    return g
@@ -0,0 +1,53 @@
+import argparse
+
+# --- RESEARCH-KG CLI --- #
+# One entry point for both generators: `research_kg.py tbox|abox|all [options]`.
+# The options after the command are those of generate_tbox.py / generate_abox.py.
+# Only argparse is imported up front. Each command imports its generator when it
+# runs, so `tbox` never loads pandas and `abox --stages ...` only reads the CSVs
+# of the stages it runs.
+
+COMMANDS = {
+    "tbox": "generate the TBox (options of generate_tbox.py)",
+    "abox": "generate the ABox (options of generate_abox.py)",
+    "all": "generate the TBox, then the ABox (options of generate_abox.py); --output-dir, --formats or --stream "
+           "and --dry-run also apply to the TBox, and --elide-inverses declares the inverses in it",
+}
+
+def tbox_options(abox_args):
+    """generate_tbox.py options matching an `all` run's ABox options"""
+    options = ["--output-dir", abox_args.output_dir,
+               "--formats", abox_args.stream or ",".join(abox_args.formats)]
+    if abox_args.elide_inverses:
+        options.append("--declare-inverses")
+    if abox_args.dry_run:
+        options.append("--dry-run")
+    return options
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="research-kg", description="Generate the research knowledge graph",
+                                     epilog="Run `research-kg <command> --help` for the options of a command.")
+    commands = parser.add_subparsers(dest="command", required=True, metavar="command")
+    for name, text in COMMANDS.items():
+        # No -h of its own, so --help is left to the generator's parser with the other options
+        commands.add_parser(name, help=text, add_help=False)
+    args, options = parser.parse_known_args(argv)
+    prog = f"research-kg {args.command}"
+
+    if args.command == "tbox":
+        import generate_tbox
+        generate_tbox.run(generate_tbox.build_parser(prog).parse_args(options))
+    elif args.command == "abox":
+        import generate_abox
+        generate_abox.run(generate_abox.parse_args(options, prog))
+    else:
+        import generate_abox
+        import generate_tbox
+        abox_args = generate_abox.parse_args(options, prog)
+        print("=== TBOX ===")
+        generate_tbox.run(generate_tbox.build_parser(prog).parse_args(tbox_options(abox_args)))
+        print("\n=== ABOX ===")
+        generate_abox.run(abox_args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+import re
+import unicodedata
+import zlib
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+from rdflib import OWL
+
+from abox_stages import as_str, uri_series
+from helpers import clean_series_for_uri
+
+# --- ENTITY RESOLUTION --- #
+# Reconcile authors and papers that entered the data under several identifiers
+# (Semantic Scholar author splits, the year-prefixed synthetic DOIs such as
+# 202310.3390/... next to 10.3390/...). Records are only compared within a
+# block: authors sharing a surname and first initial, papers sharing a DOI stem
+# or an LSH bucket of their title's MinHash signature. The cost is linear in the
+# records plus the (small) candidate pairs, never all pairs. Matches are merged
+# with union-find; each cluster keeps one canonical IRI.
+
+SYNTHETIC_DOI_PREFIX = r'^(?:19|20)\d{2}(?=10\.)'  # year glued in front of a real DOI
+MERSENNE_PRIME = (1 << 61) - 1
+
+def ascii_tokens(text):
+    """Lowercase ASCII word tokens of a string, accents folded"""
+    folded = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
+    return re.findall(r"[a-z0-9]+", folded.lower())
+
+def names_compatible(a, b):
+    """Name token lists that can denote one person: same surname, given names equal or initial-compatible"""
+    if a[-1] != b[-1]:
+        return False
+    for x, y in zip(a[:-1], b[:-1]):
+        if x != y and not (len(x) == 1 and y.startswith(x)) and not (len(y) == 1 and x.startswith(y)):
+            return False
+    return True
+
+class UnionFind:
+    """Disjoint sets over hashable keys"""
+
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, key):
+        root = key
+        while self.parent.get(root, root) != root:
+            root = self.parent[root]
+        while key != root:  # path compression
+            self.parent[key], key = root, self.parent.get(key, key)
+        return root
+
+    def union(self, a, b):
+        self.parent.setdefault(a, a)
+        self.parent.setdefault(b, b)
+        self.parent[self.find(a)] = self.find(b)
+
+    def clusters(self):
+        """{root: [members]} of every set with more than one member"""
+        groups = {}
+        for key in list(self.parent):
+            groups.setdefault(self.find(key), []).append(key)
+        return {root: members for root, members in groups.items() if len(members) > 1}
+
+def blocks(keys):
+    """Groups of row positions sharing a blocking key (only groups of two or more)"""
+    codes, _ = pd.factorize(pd.Series(keys, dtype=object))
+    order = np.argsort(codes, kind="stable")
+    starts = np.flatnonzero(np.diff(codes[order], prepend=-2))
+    return [group for group in np.split(order, starts[1:]) if len(group) > 1 and codes[group[0]] >= 0]
+
+# --- MINHASH / LSH --- #
+
+def shingle_hashes(text, k=4):
+    """crc32 of every character k-gram of the normalized text"""
+    normalized = " ".join(ascii_tokens(text))
+    return {zlib.crc32(normalized[i:i + k].encode("ascii")) for i in range(len(normalized) - k + 1)}
+
+def minhash_signatures(shingle_sets, num_perm=64, seed=1):
+    """(records x num_perm) MinHash signatures of non-empty shingle sets, hashing (a*x + b) mod a Mersenne prime"""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 31, num_perm, dtype=np.uint64)
+    b = rng.integers(0, 1 << 31, num_perm, dtype=np.uint64)
+    lengths = np.array([len(s) for s in shingle_sets])
+    values = np.fromiter((h for s in shingle_sets for h in s), dtype=np.uint64, count=int(lengths.sum()))
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    signatures = np.empty((len(shingle_sets), num_perm), dtype=np.uint64)
+    for i in range(num_perm):  # 32-bit values times 31-bit a stay below 2**63
+        signatures[:, i] = np.minimum.reduceat((a[i] * values + b[i]) % MERSENNE_PRIME, starts)
+    return signatures
+
+def lsh_candidates(signatures, bands=16):
+    """Pairs of rows whose signatures agree on every row of at least one band"""
+    pairs = set()
+    for band in np.split(signatures, bands, axis=1):
+        bucket = np.zeros(len(band), dtype=np.uint64)
+        for column in band.T:  # polynomial hash of the band's values, wrapping mod 2**64
+            bucket = bucket * np.uint64(1_000_003) + column
+        for group in blocks(bucket):
+            pairs.update(combinations(group.tolist(), 2))
+    return pairs
+
+# --- RESOLVERS --- #
+
+def resolve_papers(papers_df, threshold=0.9, min_shingles=20, max_block=50):
+    """{duplicate DOI key: canonical DOI key} for papers sharing a DOI stem, or a near-identical title and year"""
+    papers = papers_df[papers_df['DOI'].notna()].drop_duplicates('DOI')
+    keys = clean_series_for_uri(as_str(papers['DOI'])).tolist()
+    stems = as_str(papers['DOI']).str.strip().str.lower().str.replace(SYNTHETIC_DOI_PREFIX, "", regex=True)
+    titles = papers['Title'].fillna("").map(str).tolist()
+    years = papers['Year'].tolist()
+    shingles = [shingle_hashes(title) for title in titles]
+
+    merged = UnionFind()
+    for group in blocks(stems.tolist()):
+        if len(group) <= max_block:
+            for i in group[1:]:
+                merged.union(keys[i], keys[group[0]])
+
+    # Titles too short to tell papers apart ("Editorial", "Preface") never match on title alone, and
+    # a different year means a different work (a retraction notice, next year's system description)
+    rows = [i for i, s in enumerate(shingles) if len(s) >= min_shingles]
+    signatures = minhash_signatures([shingles[i] for i in rows])
+    for x, y in lsh_candidates(signatures):
+        i, j = rows[x], rows[y]
+        if pd.isna(years[i]) or pd.isna(years[j]) or years[i] != years[j]:
+            continue
+        if len(shingles[i] & shingles[j]) >= threshold * len(shingles[i] | shingles[j]):
+            merged.union(keys[i], keys[j])
+
+    # The canonical paper is the one whose DOI is its own stem (not a synthetic copy), then the shortest key
+    own_stem = {key for key, doi, stem in zip(keys, as_str(papers['DOI']).str.strip().str.lower(), stems)
+                if doi == stem}
+    links = {}
+    for members in merged.clusters().values():
+        canonical = min(members, key=lambda key: (key not in own_stem, len(key), key))
+        links.update({key: canonical for key in members if key != canonical})
+    return links
+
+def resolve_authors(authors_df, author_paper_df, min_shared=1, max_block=200):
+    """{duplicate author id: canonical author id} for compatible names with shared co-authors and no shared paper.
+    Identical full names need min_shared co-authors in common, initials one more"""
+    authors = authors_df[authors_df['Author_ID'].notna() & authors_df['Author_Name'].notna()]
+    authors = authors.drop_duplicates('Author_ID')
+    ids = authors['Author_ID'].astype('int64').tolist()
+    tokens = [ascii_tokens(name) for name in authors['Author_Name'].map(str)]
+    keys = [(t[-1], t[0][0]) if len(t) > 1 else (t[-1],) if t else None for t in tokens]
+    groups = [group for group in blocks(keys) if len(group) <= max_block]
+
+    # Papers and co-authors, only for authors in a block
+    candidates = {ids[i] for group in groups for i in group}
+    links = author_paper_df[author_paper_df['Author_ID'].notna()][['DOI', 'Author_ID']].drop_duplicates()
+    links = links.assign(Author_ID=links['Author_ID'].astype('int64'))
+    own = links[links['Author_ID'].isin(candidates)]
+    papers_of = own.groupby('Author_ID')['DOI'].agg(set).to_dict()
+    pairs = own.merge(links, on='DOI', suffixes=('', '_co'))
+    pairs = pairs[pairs['Author_ID'] != pairs['Author_ID_co']]
+    coauthors_of = pairs.groupby('Author_ID')['Author_ID_co'].agg(set).to_dict()
+
+    merged = UnionFind()
+    names = {}  # cluster root -> name tokens of its members
+    for group in groups:
+        for i, j in combinations(group.tolist(), 2):
+            a, b = ids[i], ids[j]
+            if not names_compatible(tokens[i], tokens[j]):
+                continue
+            if papers_of.get(a, set()) & papers_of.get(b, set()):
+                continue  # two people named alike on one paper
+            required = min_shared if tokens[i] == tokens[j] and len(tokens[i][0]) > 1 else min_shared + 1
+            if len((coauthors_of.get(a, set()) & coauthors_of.get(b, set())) - {a, b}) < required:
+                continue
+            # Every member must stay compatible with every other, so "J. Kim" cannot chain Jinsook to Jiyoung
+            root_a, root_b = merged.find(a), merged.find(b)
+            if root_a == root_b:
+                continue
+            names_a, names_b = names.pop(root_a, [tokens[i]]), names.pop(root_b, [tokens[j]])
+            if all(names_compatible(x, y) for x in names_a for y in names_b):
+                merged.union(a, b)
+                names[merged.find(a)] = names_a + names_b
+            else:
+                names[root_a], names[root_b] = names_a, names_b
+
+    # The canonical author is the one with the most papers, then the lowest id
+    result = {}
+    for members in merged.clusters().values():
+        canonical = min(members, key=lambda author: (-len(papers_of.get(author, ())), author))
+        result.update({author: canonical for author in members if author != canonical})
+    return result
+
+class EntityResolution:
+    """Duplicate -> canonical IRIs, as owl:sameAs links or as a rewrite of the ABox"""
+
+    def __init__(self, author_links, paper_links):
+        self.author_links = author_links
+        self.paper_links = paper_links
+        self.iris = dict(zip(uri_series("author", author_links), uri_series("author", author_links.values())))
+        self.iris.update(zip(uri_series("paper", paper_links), uri_series("paper", paper_links.values())))
+
+    def same_as_triples(self):
+        """owl:sameAs from every duplicate to its canonical IRI"""
+        return [(duplicate, OWL.sameAs, canonical) for duplicate, canonical in self.iris.items()]
+
+    def canonicalize(self, triples):
+        """The triples with every duplicate subject/object replaced by its canonical IRI"""
+        iris = self.iris
+        return [(iris.get(s, s), p, iris.get(o, o)) for s, p, o in triples]
+
+def resolve_entities(authors_df, papers_df, author_paper_df):
+    """EntityResolution of the author and paper tables"""
+    return EntityResolution(resolve_authors(authors_df, author_paper_df), resolve_papers(papers_df))
@@ -0,0 +1,166 @@
+import asyncio
+import hashlib
+import http.client
+import json
+import os
+import time
+import urllib.parse
+
+from graph_store import RETRY_STATUSES, ConnectionPool
+
+# --- SEMANTIC SCHOLAR FETCHER --- #
+# Pull papers (with their reference lists) and their authors from the Semantic
+# Scholar Graph API through the POST /paper/batch and /author/batch endpoints.
+# Batches run concurrently on an asyncio loop, bounded by a semaphore and a
+# token bucket, and 429/5xx answers are retried with exponential backoff. Every
+# record is cached on disk under the id it was requested with, so a rerun only
+# requests the ids that are not cached yet. The blocking http.client requests
+# of graph_store.ConnectionPool run in threads, so no async HTTP library is needed.
+
+API_URL = "https://api.semanticscholar.org/graph/v1"
+
+# The fields of semantic_scholar_combined_results.json, plus the reference lists json_source.JsonIngest links
+PAPER_FIELDS = [
+    "paperId", "externalIds", "corpusId", "publicationVenue", "url", "title", "abstract", "venue", "year",
+    "referenceCount", "citationCount", "influentialCitationCount", "isOpenAccess", "openAccessPdf",
+    "fieldsOfStudy", "s2FieldsOfStudy", "publicationTypes", "publicationDate", "journal", "authors",
+    "references.paperId", "references.externalIds",
+]
+AUTHOR_FIELDS = ["authorId", "externalIds", "name", "affiliations", "paperCount", "citationCount", "hIndex"]
+
+# Most ids the API accepts in one batch request
+PAPER_BATCH_LIMIT = 500
+AUTHOR_BATCH_LIMIT = 1000
+
+class FetchError(Exception):
+    """Raised when the API rejects a request or a batch keeps failing after its retries"""
+
+class TokenBucket:
+    """Allow `rate` requests per second on average, in bursts of at most `capacity`"""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait for a token and take it"""
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class ResponseCache:
+    """One JSON file per record under cache_dir/<kind>-<fields digest>/, keyed by the id it was requested with.
+    Ids the API does not know are cached as null, so they are not requested again either"""
+
+    def __init__(self, cache_dir, kind, fields):
+        digest = hashlib.blake2b(",".join(sorted(fields)).encode(), digest_size=4).hexdigest()
+        self.directory = os.path.join(cache_dir, f"{kind}-{digest}")
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, urllib.parse.quote(key, safe="") + ".json")
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def get(self, key):
+        with open(self._path(key), encoding="utf-8") as f:
+            return json.load(f)
+
+    def put(self, key, record):
+        path = self._path(key)
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(record, f, ensure_ascii=False)
+        os.replace(path + ".tmp", path)  # a crash never leaves a truncated entry
+
+class SemanticScholarClient:
+    """Batch requests to the Graph API with bounded concurrency, a token-bucket rate limit and retries"""
+
+    def __init__(self, api_url=API_URL, api_key=None, rate=1.0, burst=1, concurrency=4, retries=5, backoff=1.0,
+                 timeout=60):
+        self.api_path = urllib.parse.urlsplit(api_url).path.rstrip("/")
+        self.headers = {"Content-Type": "application/json"}
+        if api_key:
+            self.headers["x-api-key"] = api_key
+        self.pool = ConnectionPool(api_url, concurrency, timeout)
+        self.slots = asyncio.Semaphore(concurrency)  # one per pooled connection, so no thread waits for one
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.requests = 0
+        self.retried = 0
+
+    async def post_batch(self, endpoint, ids, fields):
+        """POST ids to /<endpoint>/batch and return the records in the same order (None for unknown ids)"""
+        path = f"{self.api_path}/{endpoint}/batch?fields={','.join(fields)}"
+        body = json.dumps({"ids": ids}).encode("utf-8")
+        for attempt in range(self.retries + 1):
+            async with self.slots:
+                await self.bucket.acquire()
+                self.requests += 1
+                try:
+                    status, text = await asyncio.to_thread(self.pool.request, "POST", path, body, self.headers)
+                    if status < 300:
+                        return json.loads(text)
+                    if status not in RETRY_STATUSES:
+                        raise FetchError(f"POST {path} failed with {status}: {text[:500].decode(errors='replace')}")
+                    failure = f"status {status}"
+                except (http.client.HTTPException, OSError) as e:
+                    failure = repr(e)
+            if attempt == self.retries:
+                raise FetchError(f"POST {path} still failing after {self.retries} retries ({failure})")
+            self.retried += 1
+            await asyncio.sleep(self.backoff * 2 ** attempt)
+
+    def close(self):
+        self.pool.close()
+
+async def fetch_records(client, cache, endpoint, ids, fields, batch_size):
+    """{id: record or None} for every id, requesting only the ids missing from the cache.
+    Returns the records and how many ids were fetched"""
+    missing = [key for key in dict.fromkeys(ids) if key not in cache]
+
+    async def fetch(batch):
+        records = await client.post_batch(endpoint, batch, fields)
+        if len(records) != len(batch):
+            raise FetchError(f"/{endpoint}/batch answered {len(records)} records for {len(batch)} ids")
+        for key, record in zip(batch, records):
+            cache.put(key, record)
+
+    await asyncio.gather(*(fetch(missing[i:i + batch_size]) for i in range(0, len(missing), batch_size)))
+    return {key: cache.get(key) for key in ids}, len(missing)
+
+async def fetch_corpus(client, cache_dir, paper_ids, authors=True, paper_batch=PAPER_BATCH_LIMIT,
+                       author_batch=AUTHOR_BATCH_LIMIT):
+    """Papers (in the order of paper_ids, unknown ids left out), then the authors they list.
+    Returns (papers, authors, {stage: (requested, fetched, not found)})"""
+    stats = {}
+    cache = ResponseCache(cache_dir, "papers", PAPER_FIELDS)
+    records, fetched = await fetch_records(client, cache, "paper", paper_ids, PAPER_FIELDS, paper_batch)
+    papers = [records[key] for key in dict.fromkeys(paper_ids) if records[key] is not None]
+    stats["papers"] = (len(records), fetched, len(records) - len(papers))
+
+    author_records = []
+    if authors:
+        author_ids = [author["authorId"] for paper in papers for author in paper.get("authors") or []
+                      if author.get("authorId")]
+        cache = ResponseCache(cache_dir, "authors", AUTHOR_FIELDS)
+        records, fetched = await fetch_records(client, cache, "author", author_ids, AUTHOR_FIELDS, author_batch)
+        author_records = [record for record in records.values() if record is not None]
+        stats["authors"] = (len(records), fetched, len(records) - len(author_records))
+    return papers, author_records, stats
+
+def write_json_lines(path, records):
+    """One JSON record per line, readable by json_source.iter_records"""
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
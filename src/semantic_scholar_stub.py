@@ -0,0 +1,157 @@
+import argparse
+import csv
+import json
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from json_source import iter_records
+from semantic_scholar import AUTHOR_BATCH_LIMIT, PAPER_BATCH_LIMIT
+
+# --- LOCAL SEMANTIC SCHOLAR STUB --- #
+# A stand-in for the Graph API batch endpoints (POST /graph/v1/paper/batch and
+# /graph/v1/author/batch), for trying the fetcher without the network or an API
+# key. The fixtures are the records of a Semantic Scholar dump, addressable by
+# paperId or DOI:<doi>. They carry the reference lists of references.csv, which
+# the dump was flattened into, and authors are collected from the papers'
+# author lists. Answers keep only the requested fields, like the API. Every
+# n-th request can be rejected with a 429 to exercise the fetcher's retries,
+# and a fixed delay per request stands in for the network round trip.
+
+ID_FIELDS = {"paper": "paperId", "author": "authorId"}
+BATCH_LIMITS = {"paper": PAPER_BATCH_LIMIT, "author": AUTHOR_BATCH_LIMIT}
+
+def load_fixtures(dump_path, references_path=None):
+    """{"paper": {id: record}, "author": {id: record}} from a dump (JSON array or JSON Lines) and references.csv"""
+    papers = {}
+    authors = {}
+    for record in iter_records(dump_path):
+        record.setdefault("references", [])
+        papers[record["paperId"]] = record
+        doi = (record.get("externalIds") or {}).get("DOI")
+        if doi:
+            papers[f"DOI:{doi}"] = record
+        for author in record.get("authors") or []:
+            if author.get("authorId"):
+                entry = authors.setdefault(author["authorId"], {"authorId": author["authorId"],
+                                                                "name": author.get("name"), "paperCount": 0})
+                entry["paperCount"] += 1
+    if references_path:
+        with open(references_path, newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                citing = papers.get(f"DOI:{row['Paper_DOI']}")
+                if citing is not None and row['Reference_DOI']:
+                    cited = papers.get(f"DOI:{row['Reference_DOI']}") or {}
+                    citing["references"].append({"paperId": cited.get("paperId"),
+                                                 "externalIds": {"DOI": row['Reference_DOI']}})
+    return {"paper": papers, "author": authors}
+
+def select_fields(record, id_field, fields):
+    """The record with only the requested fields (and its id); 'references.x' selects fields of each reference"""
+    if record is None:
+        return None
+    nested = {}
+    for field in fields:
+        parent, _, child = field.partition(".")
+        nested.setdefault(parent, []).extend([child] if child else [])
+    selected = {id_field: record.get(id_field)}
+    for field, children in nested.items():
+        value = record.get(field)
+        if children and isinstance(value, list):
+            value = [{child: item.get(child) for child in children} for item in value]
+        selected[field] = value
+    return selected
+
+class SemanticScholarStub:
+    """The fixtures behind a threaded HTTP server on localhost"""
+
+    def __init__(self, fixtures, port=0, fail_every=0, latency=0.0):
+        self.fixtures = fixtures
+        self.lock = threading.Lock()
+        self.fail_every = fail_every
+        self.latency = latency
+        self.requests = 0
+        self.failures = 0
+        self.ids_served = 0
+        self.request_times = []
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}/graph/v1"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                parts = urllib.parse.urlsplit(self.path)
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                kind = parts.path.removeprefix("/graph/v1/").removesuffix("/batch")
+                if kind not in ID_FIELDS or not parts.path.endswith("/batch"):
+                    return self._reply(404, {"error": f"Unknown path {parts.path}"})
+                try:
+                    ids = json.loads(body)["ids"]
+                except (ValueError, KeyError, TypeError):
+                    return self._reply(400, {"error": "Body must be a JSON object with an 'ids' list"})
+                if len(ids) > BATCH_LIMITS[kind]:
+                    return self._reply(400, {"error": f"At most {BATCH_LIMITS[kind]} ids per request"})
+                query = urllib.parse.parse_qs(parts.query)
+                fields = query["fields"][0].split(",") if "fields" in query else []
+                with stub.lock:
+                    stub.requests += 1
+                    stub.request_times.append(time.monotonic())
+                    if stub.fail_every and stub.requests % stub.fail_every == 0:
+                        stub.failures += 1
+                        return self._reply(429, {"message": "Too Many Requests"})
+                    stub.ids_served += len(ids)
+                time.sleep(stub.latency)
+                records = stub.fixtures[kind]
+                self._reply(200, [select_fields(records.get(key), ID_FIELDS[kind], fields) for key in ids])
+
+        return Handler
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the Semantic Scholar batch endpoints from a local dump")
+    parser.add_argument("--dump", default="../data/semantic_scholar_combined_results.json",
+                        help="Semantic Scholar records to serve (default: %(default)s)")
+    parser.add_argument("--references", default="../data/references.csv",
+                        help="reference lists of the dump's papers (default: %(default)s)")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--fail-every", type=int, default=0, help="answer every n-th request with a 429")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before each answer")
+    args = parser.parse_args()
+    stub = SemanticScholarStub(load_fixtures(args.dump, args.references), args.port, args.fail_every, args.latency)
+    print(f"Graph API: {stub.url}")
+    stub.server.serve_forever()
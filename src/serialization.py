@@ -0,0 +1,87 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from writers import TripleStreamWriter
+
+# --- PARALLEL SERIALIZATION --- #
+# Each requested format is written by its own worker process from one snapshot
+# of the graph: the workers are forked after the graph is built, so they share
+# it copy-on-write instead of pickling it. Spawn-only platforms, where workers
+# would start without the snapshot, fall back to writing the formats one after
+# another.
+
+# format -> (file extension, rdflib serializer or None for our own line writer)
+OUTPUT_FORMATS = {
+    "ttl": ("ttl", "turtle"),
+    "xml": ("rdfs", "xml"),
+    "nt": ("nt", None),
+    "nq": ("nq", None),
+    "jsonld": ("jsonld", "json-ld"),
+}
+DEFAULT_FORMATS = ["ttl", "xml"]
+
+_snapshot = None  # graph shared with forked workers
+
+def parse_formats(value):
+    """Parse a comma-separated --formats value, e.g. 'ttl,nt'"""
+    formats = [f.strip() for f in value.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in OUTPUT_FORMATS]
+    if unknown:
+        raise ValueError(f"Unknown output format(s) {unknown}, expected any of {list(OUTPUT_FORMATS)}")
+    return formats
+
+def output_path(basename, format):
+    """Output file name for a format, e.g. abox.rdfs for xml"""
+    return f"{basename}.{OUTPUT_FORMATS[format][0]}"
+
+def _serialize_one(format, path, graph_iri):
+    """Worker: write the snapshot graph in one format and return (format, path, seconds, bytes)"""
+    start = time.perf_counter()
+    g = _snapshot
+    rdflib_format = OUTPUT_FORMATS[format][1]
+    if rdflib_format is None:
+        with TripleStreamWriter(path, format, graph_iri) as writer:
+            writer.write(g)
+    else:
+        g.serialize(destination=path, format=rdflib_format)
+    return format, path, time.perf_counter() - start, os.path.getsize(path)
+
+def serialize_formats(g, basename, formats, graph_iri="http://research.org/graph", workers=None):
+    """Serialize g to every requested format concurrently and return one (format, path, seconds, bytes) per format"""
+    global _snapshot
+    jobs = [(format, output_path(basename, format)) for format in formats]
+    _snapshot = g
+    try:
+        if len(jobs) < 2 or "fork" not in multiprocessing.get_all_start_methods():
+            return [_serialize_one(format, path, graph_iri) for format, path in jobs]
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(max_workers=workers or len(jobs), mp_context=context) as pool:
+            futures = [pool.submit(_serialize_one, format, path, graph_iri) for format, path in jobs]
+            return [future.result() for future in futures]
+    finally:
+        _snapshot = None
+
+def print_serialization_report(results):
+    """Print time and size for each written format"""
+    for format, path, seconds, size in results:
+        print(f"   {format:<7} {path:<14} {seconds:8.3f}s  {size:>12,} bytes")
+
+def serialize_interned(table, rows, basename, formats, graph_iri="http://research.org/graph", graph=None):
+    """Write rows of an InternedTriples table: N-Triples/N-Quads straight from the term dictionary,
+    the other formats through one Graph materialized into `graph`"""
+    results = {}
+    for format in formats:
+        if OUTPUT_FORMATS[format][1] is None:
+            start = time.perf_counter()
+            path = output_path(basename, format)
+            with open(path, "w", encoding="utf-8") as f:
+                f.writelines(table.lines(rows, graph_iri if format == "nq" else None))
+            results[format] = (format, path, time.perf_counter() - start, os.path.getsize(path))
+    graph_formats = [format for format in formats if OUTPUT_FORMATS[format][1] is not None]
+    if graph_formats:
+        g = table.to_graph(rows, graph)
+        for result in serialize_formats(g, basename, graph_formats, graph_iri):
+            results[result[0]] = result
+    return [results[format] for format in formats]
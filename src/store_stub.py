@@ -0,0 +1,140 @@
+import argparse
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from rdflib import Dataset, URIRef
+
+# --- LOCAL TRIPLE STORE STUB --- #
+# A small rdflib-backed stand-in for a Fuseki/GraphDB endpoint, for trying the
+# loader without a real store: the SPARQL 1.1 Graph Store protocol (GET, PUT,
+# POST, DELETE on /data?graph=<iri>) and SPARQL Update (POST /update). It can
+# fail every n-th upload with a 503 to exercise the loader's retries.
+
+class StubStore:
+    """An rdflib Dataset behind a threaded HTTP server on localhost"""
+
+    def __init__(self, port=0, fail_every=0):
+        self.dataset = Dataset()
+        self.lock = threading.Lock()
+        self.fail_every = fail_every
+        self.uploads = 0
+        self.failures = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    @property
+    def data_url(self):
+        return f"{self.url}/data"
+
+    @property
+    def update_url(self):
+        return f"{self.url}/update"
+
+    def graph_size(self, graph):
+        with self.lock:
+            return len(self.dataset.graph(URIRef(graph)))
+
+    def graph_names(self):
+        with self.lock:
+            return sorted(str(g.identifier) for g in self.dataset.graphs() if len(g))
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _handler(self):
+        store = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body=b"", content_type="text/plain"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self):
+                return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+            def _graph(self):
+                query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+                return URIRef(query["graph"][0]) if "graph" in query else None
+
+            def do_GET(self):
+                graph = self._graph()
+                with store.lock:
+                    if graph is None or graph not in {g.identifier for g in store.dataset.graphs()}:
+                        return self._reply(404)
+                    body = store.dataset.graph(graph).serialize(format="nt").encode("utf-8")
+                self._reply(200, body, "application/n-triples")
+
+            def do_PUT(self):
+                self._store(replace=True)
+
+            def do_POST(self):
+                if urllib.parse.urlsplit(self.path).path == "/update":
+                    sparql = self._body().decode("utf-8")
+                    with store.lock:
+                        try:
+                            store.dataset.update(sparql)
+                        except Exception as e:  # report bad updates to the client, like a real store
+                            return self._reply(400, str(e).encode("utf-8"))
+                    return self._reply(204)
+                self._store(replace=False)
+
+            def do_DELETE(self):
+                graph = self._graph()
+                with store.lock:
+                    if graph is None or not len(store.dataset.graph(graph)):
+                        return self._reply(404)
+                    store.dataset.remove_graph(graph)
+                self._reply(204)
+
+            def _store(self, replace):
+                body = self._body()
+                graph = self._graph()
+                if graph is None:
+                    return self._reply(400, b"graph parameter required")
+                with store.lock:
+                    store.uploads += 1
+                    if store.fail_every and store.uploads % store.fail_every == 0:
+                        store.failures += 1
+                        return self._reply(503, b"injected failure")
+                    target = store.dataset.graph(graph)
+                    if replace:
+                        target.remove((None, None, None))
+                    target.parse(data=body.decode("utf-8"), format="nt")
+                self._reply(204)
+
+        return Handler
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve an in-memory stand-in for a SPARQL Graph Store endpoint")
+    parser.add_argument("--port", type=int, default=3030)
+    parser.add_argument("--fail-every", type=int, default=0, help="answer every n-th upload with a 503")
+    args = parser.parse_args()
+    stub = StubStore(args.port, args.fail_every)
+    print(f"Graph Store: {stub.data_url}   SPARQL Update: {stub.update_url}")
+    stub.server.serve_forever()
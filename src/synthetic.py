@@ -0,0 +1,65 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# --- SYNTHETIC ENRICHMENT --- #
+# Emails, cities, journal editors, conference chairs and workshop papers are not
+# in the source data and are made up. Every value is drawn from a seeded hash of
+# the entity it belongs to, so a draw costs O(1) whatever the pool size, whole
+# columns are drawn at once, and the output does not depend on stage order,
+# sharding or which stages an incremental run reruns. Editors and chairs are
+# picked from the author pool by consistent hashing, so a changed pool only
+# moves the picks of the authors that left or the arcs the new ones land on.
+
+EMAIL_DOMAINS = np.array(["gmail.com", "yahoo.com", "hotmail.com", "outlook.com", "university.edu"])
+CITIES = np.array(["New York", "London", "Paris", "Tokyo", "Berlin", "Sydney", "Toronto",
+                   "Barcelona", "Amsterdam", "Vienna", "Singapore", "Seoul", "Boston",
+                   "San Francisco", "Munich", "Stockholm", "Copenhagen", "Zurich"])
+
+class SyntheticData:
+    """Seeded synthetic values keyed by entity"""
+
+    def __init__(self, seed):
+        self.seed = seed
+
+    def draws(self, keys, purpose):
+        """One uniform uint64 per key, fixed for (seed, purpose, key)"""
+        hash_key = hashlib.blake2b(f"{self.seed}:{purpose}".encode(), digest_size=8).hexdigest()
+        keys = pd.Series(keys, dtype=object).map(str)
+        return pd.util.hash_pandas_object(keys, index=False, hash_key=hash_key).to_numpy()
+
+    def choose(self, options, keys, purpose):
+        """Pick one of `options` (a numpy array) per key"""
+        if len(options) == 0:
+            return options[:0]
+        return options[self.draws(keys, purpose) % np.uint64(len(options))]
+
+    def assign(self, members, keys, purpose):
+        """Pick one of `members` (a numpy array) per key by consistent hashing: members and keys are hashed onto
+        a ring and each key takes the first member at or after its point. Unlike choose, whose picks all move when
+        the number of options changes, a pick only moves when its member leaves or a new one lands before it"""
+        if len(members) == 0:
+            return members[:0]
+        points = self.draws(members, f"{purpose}:member")
+        order = np.argsort(points, kind="stable")
+        slots = np.searchsorted(points[order], self.draws(keys, purpose)) % len(members)
+        return members[order[slots]]
+
+    def emails(self, names, keys):
+        """'<first name><100-999>@<domain>' for each name, keyed by its author"""
+        draws = self.draws(keys, "email")
+        first_names = pd.Series(names, dtype=object).str.lower().str.split().str[0].to_numpy(dtype=object)
+        numbers = (100 + draws % np.uint64(900)).astype(str)
+        domains = EMAIL_DOMAINS[(draws // np.uint64(900)) % np.uint64(len(EMAIL_DOMAINS))]
+        return [f"{name}{number}@{domain}" for name, number, domain in zip(first_names, numbers, domains)]
+
+    def cities(self, keys):
+        """A city name per key"""
+        return self.choose(CITIES, keys, "city")
+
+    def subset(self, keys, count, purpose):
+        """`count` distinct keys picked from `keys`, as a set"""
+        keys = pd.Series(keys, dtype=object).drop_duplicates()
+        order = np.argsort(self.draws(keys, purpose), kind="stable")
+        return set(keys.to_numpy()[order[:count]])
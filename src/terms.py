@@ -0,0 +1,214 @@
+from array import array
+
+import numpy as np
+from rdflib import Graph, Literal, URIRef
+from rdflib.util import from_n3
+
+# --- INTERNED TRIPLES --- #
+# Instead of keeping every stage's rdflib terms alive in a Graph, each distinct
+# term is stored once as its N-Triples text and given a dense integer ID, and
+# triples are kept as three int64 columns. Text lines (or a Graph, for the
+# formats that need one) are only materialized when the output is written.
+# Stages return their triples as TripleColumns, whose IRIs are a namespace plus
+# the cleaned keys and whose literals are plain values, so the table interns
+# their text without building an rdflib term per triple.
+
+# N-Triples escapes of a literal's lexical form. Literal.n3() is not used for literals because it writes
+# multi-line strings as Turtle's """...""", which N-Triples does not have
+LITERAL_ESCAPES = str.maketrans({"\\": "\\\\", "\n": "\\n", '"': '\\"', "\r": "\\r"})
+
+def literal_text(literal):
+    """N-Triples form of a Literal, e.g. "42"^^<...#integer> or "title"@en"""
+    text = f'"{str(literal).translate(LITERAL_ESCAPES)}"'
+    if literal.language:
+        return f"{text}@{literal.language}"
+    if literal.datatype:
+        return f"{text}^^<{literal.datatype}>"
+    return text
+
+def term_text(term):
+    """N-Triples form of a term, e.g. <http://...> or "42"^^<...#integer>"""
+    if isinstance(term, Literal):
+        return literal_text(term)
+    return f"<{term}>"
+
+class IriColumn:
+    """IRIs of a column of local names in one namespace, e.g. RES + author_42"""
+
+    def __init__(self, namespace, names):
+        self.namespace = str(namespace)
+        self.names = list(names)
+
+    def __len__(self):
+        return len(self.names)
+
+    def where(self, mask):
+        """The IRIs whose mask value is true"""
+        return IriColumn(self.namespace, [name for name, keep in zip(self.names, mask) if keep])
+
+    def texts(self):
+        namespace = self.namespace
+        return [f"<{namespace}{name}>" for name in self.names]
+
+    def terms(self):
+        namespace = self.namespace
+        return [URIRef(namespace + name) for name in self.names]
+
+class LiteralColumn:
+    """Literals of one datatype (or plain strings) for a column of values whose str() is the lexical form"""
+
+    def __init__(self, values, datatype=None):
+        self.values = list(values)
+        self.datatype = datatype
+
+    def __len__(self):
+        return len(self.values)
+
+    def where(self, mask):
+        """The literals whose mask value is true"""
+        return LiteralColumn([value for value, keep in zip(self.values, mask) if keep], self.datatype)
+
+    def texts(self):
+        suffix = f"^^<{self.datatype}>" if self.datatype else ""
+        return [f'"{str(value).translate(LITERAL_ESCAPES)}"{suffix}' for value in self.values]
+
+    def terms(self):
+        datatype = self.datatype
+        return [Literal(value, datatype=datatype) for value in self.values]
+
+class TripleColumns:
+    """A batch of triples as blocks of (subject column, predicate, object column), in order. The predicate is
+    one URIRef for the whole block or an IriColumn; rdflib terms are only built when the batch is iterated"""
+
+    def __init__(self):
+        self.blocks = []
+
+    def __len__(self):
+        return sum(len(subjects) for subjects, _, _ in self.blocks)
+
+    def add(self, subjects, predicate, objects):
+        """Append a block; the columns must have the same length"""
+        if len(subjects):
+            self.blocks.append((subjects, predicate, objects))
+
+    def without(self, predicates):
+        """The triples whose predicate is not in `predicates` (blocks with a predicate column are kept whole)"""
+        kept = TripleColumns()
+        kept.blocks = [block for block in self.blocks if block[1] not in predicates]
+        return kept
+
+    def text_blocks(self):
+        """(subject texts, predicate text or texts, object texts) per block"""
+        for subjects, predicate, objects in self.blocks:
+            predicates = predicate.texts() if isinstance(predicate, IriColumn) else f"<{predicate}>"
+            yield subjects.texts(), predicates, objects.texts()
+
+    def lines(self, graph_iri=None):
+        """N-Triples lines (N-Quads with a graph IRI), the same as writers.nt_lines of the rdflib triples"""
+        end = f" <{graph_iri}> .\n" if graph_iri else " .\n"
+        for subjects, predicates, objects in self.text_blocks():
+            if isinstance(predicates, str):
+                yield from (f"{s} {predicates} {o}{end}" for s, o in zip(subjects, objects))
+            else:
+                yield from (f"{s} {p} {o}{end}" for s, p, o in zip(subjects, predicates, objects))
+
+    def __iter__(self):
+        for subjects, predicate, objects in self.blocks:
+            predicates = predicate.terms() if isinstance(predicate, IriColumn) else [predicate] * len(subjects)
+            yield from zip(subjects.terms(), predicates, objects.terms())
+
+class TermDictionary:
+    """N-Triples text of each distinct term <-> dense integer ID"""
+
+    def __init__(self):
+        self.ids = {}
+        self.texts = []
+
+    def __len__(self):
+        return len(self.texts)
+
+    def intern(self, term):
+        """ID of a term, assigning the next one if it is new"""
+        text = term_text(term)
+        term_id = self.ids.get(text)
+        if term_id is None:
+            term_id = self.ids[text] = len(self.texts)
+            self.texts.append(text)
+        return term_id
+
+    def intern_uris(self, uris):
+        """IDs for many URIRefs at once; URIs skip the Literal check of term_text"""
+        return self.intern_texts(f"<{uri}>" for uri in uris)
+
+    def intern_texts(self, term_texts):
+        """IDs for many terms given as N-Triples text"""
+        ids = self.ids
+        texts = self.texts
+        out = []
+        for text in term_texts:
+            term_id = ids.get(text)
+            if term_id is None:
+                term_id = ids[text] = len(texts)
+                texts.append(text)
+            out.append(term_id)
+        return out
+
+    def term(self, term_id):
+        """Rebuild the rdflib term for an ID"""
+        return from_n3(self.texts[term_id])
+
+class InternedTriples:
+    """An append-only triple table over a TermDictionary"""
+
+    def __init__(self):
+        self.terms = TermDictionary()
+        self.subjects = array('q')
+        self.predicates = array('q')
+        self.objects = array('q')
+
+    def __len__(self):
+        return len(self.subjects)
+
+    def add(self, triples):
+        """Intern and append a batch of (s, p, o) triples, or a TripleColumns straight from its column texts"""
+        if isinstance(triples, TripleColumns):
+            for subjects, predicates, objects in triples.text_blocks():
+                self.subjects.extend(self.terms.intern_texts(subjects))
+                if isinstance(predicates, str):
+                    self.predicates.extend([self.terms.intern_texts([predicates])[0]] * len(subjects))
+                else:
+                    self.predicates.extend(self.terms.intern_texts(predicates))
+                self.objects.extend(self.terms.intern_texts(objects))
+            return
+        if not triples:
+            return
+        subjects, predicates, objects = zip(*triples)
+        self.subjects.extend(self.terms.intern_uris(subjects))
+        # A stage uses a handful of predicates, so intern each distinct one once
+        predicate_ids = {p: self.terms.intern(p) for p in set(predicates)}
+        self.predicates.extend(predicate_ids[p] for p in predicates)
+        self.objects.extend(self.terms.intern(o) for o in objects)
+
+    def unique_rows(self):
+        """(n, 3) array of the distinct triples, in order of first appearance"""
+        rows = np.column_stack([np.frombuffer(column, dtype=np.int64)
+                                for column in (self.subjects, self.predicates, self.objects)])
+        if len(rows) == 0:
+            return rows
+        _, first = np.unique(rows, axis=0, return_index=True)
+        return rows[np.sort(first)]
+
+    def lines(self, rows, graph_iri=None):
+        """N-Triples lines (N-Quads with a graph IRI) for rows of term IDs"""
+        texts = self.terms.texts
+        end = f" <{graph_iri}> .\n" if graph_iri else " .\n"
+        for s, p, o in rows.tolist():
+            yield f"{texts[s]} {texts[p]} {texts[o]}{end}"
+
+    def to_graph(self, rows, graph=None):
+        """Materialize rows into an rdflib Graph, building each distinct term once"""
+        graph = Graph() if graph is None else graph
+        used = np.unique(rows)
+        terms = dict(zip(used.tolist(), (self.terms.term(term_id) for term_id in used.tolist())))
+        graph.addN((terms[s], terms[p], terms[o], graph) for s, p, o in rows.tolist())
+        return graph
@@ -0,0 +1,65 @@
+import argparse
+import os
+import time
+
+from rdflib import Graph
+
+from graph_store import RDF_PARSERS, iter_nt_lines
+from ontology import build_tbox
+from validation import AboxValidator
+
+# Generated ABox files tried in order when no file is given
+DEFAULT_ABOX = ["abox.nt", "abox.nt.gz", "abox.ttl", "abox.rdfs"]
+
+def build_parser(prog=None):
+    """Command line options of the ABox validator"""
+    parser = argparse.ArgumentParser(prog=prog,
+                                     description="Check a generated ABox against the domains and ranges of the TBox")
+    parser.add_argument("abox", nargs="?",
+                        help="ABox file (default: the first of abox.nt, abox.nt.gz, abox.ttl, abox.rdfs that exists); "
+                             "validate it before --materialize, whose entailed types satisfy every domain and range")
+    parser.add_argument("--tbox", help="TBox file to check against (default: the TBox of generate_tbox.py)")
+    parser.add_argument("--examples", type=int, default=3,
+                        help="example triples shown per violation (default: %(default)s)")
+    return parser
+
+def parse_args(argv=None, prog=None):
+    """Parse the command line, falling back to the first generated ABox file that exists"""
+    parser = build_parser(prog)
+    args = parser.parse_args(argv)
+    args.abox = args.abox or next((p for p in DEFAULT_ABOX if os.path.exists(p)), None)
+    if args.abox is None:
+        parser.error(f"no ABox file found (tried {', '.join(DEFAULT_ABOX)})")
+    return args
+
+def run(args):
+    """Validate the ABox for parsed options; exits with 1 when it has violations"""
+    if args.tbox:
+        tbox = Graph()
+        tbox.parse(args.tbox, format=RDF_PARSERS.get("." + args.tbox.rsplit(".", 1)[-1], "nt"))
+    else:
+        tbox = build_tbox()
+
+    # --- VALIDATE ABOX --- #
+    print(f"Reading {args.abox}...")
+    start = time.perf_counter()
+    lines = list(iter_nt_lines(args.abox))
+    read_seconds = time.perf_counter() - start
+
+    print(f"Validating {len(lines)} triples...")
+    start = time.perf_counter()
+    report = AboxValidator(tbox).validate(lines, args.examples)
+    seconds = time.perf_counter() - start
+
+    print(f"\nVALIDATION REPORT:")
+    report.print_report()
+    print(f"\n   {report.total} violations in {report.triples} triples (read {read_seconds:.2f}s, "
+          f"validated {seconds:.2f}s, {report.triples / seconds if seconds else 0:,.0f} triples/s)")
+    if report.total:
+        exit(1)
+
+def main(argv=None):
+    run(parse_args(argv))
+
+if __name__ == "__main__":
+    main()
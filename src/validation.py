@@ -0,0 +1,291 @@
+import gc
+
+import numpy as np
+import pandas as pd
+from rdflib import OWL, RDF, RDFS
+from rdflib.namespace import XSD
+
+from materialize import transitive_closure
+from ontology import RES
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    HAVE_PYARROW = True
+except ImportError:
+    HAVE_PYARROW = False
+
+# --- ABOX VALIDATION --- #
+# Check a generated ABox against the domains and ranges of the TBox, closed-world:
+# a resource's classes are its rdf:type classes plus the class its IRI is minted
+# under (res:paper_..., res:author_..., ...), each with its superclasses. The TBox
+# is compiled into integer lookup tables and the triples into integer codes, so
+# every check is a handful of numpy operations over all triples of a property.
+
+# Lexical forms accepted per literal datatype; other datatypes are not checked
+LEXICAL_PATTERNS = {
+    str(XSD.integer): r'-?\d+',
+    str(XSD.double): r'[-+]?(\d+(\.\d*)?|\.\d+)([eE][-+]?\d+)?|INF|-INF|NaN',
+    str(XSD.date): r'-?\d{4,}-\d{2}-\d{2}(Z|[-+]\d{2}:\d{2})?',
+}
+
+# Properties outside the TBox that the ABox may use: entity resolution links (generate_abox.py --resolve sameas)
+UNCHECKED_PROPERTIES = {str(OWL.sameAs)}
+
+PLAIN_LITERAL = str(XSD.string)
+LANG_LITERAL = str(RDF.langString)
+
+CHECK_DESCRIPTIONS = {
+    "unknown property": "predicate not defined in the TBox",
+    "unknown class": "rdf:type object is not a TBox class",
+    "untyped": "subject has no class (no rdf:type, IRI not minted under a class name)",
+    "domain": "subject is not of the property's domain",
+    "range": "object is not of the property's range",
+    "datatype": "object is not a literal of the property's datatype",
+    "lexical": "literal is not a valid form of its datatype",
+    "dangling": "object resource is never described (no literal or rdf:type triple of its own)",
+}
+
+class TBoxTables:
+    """Integer lookup tables compiled from a TBox graph"""
+
+    def __init__(self, tbox):
+        classes = set(tbox.subjects(RDF.type, RDFS.Class))
+        superclasses = transitive_closure(tbox.subject_objects(RDFS.subClassOf))
+        classes |= set(superclasses)
+        self.classes = sorted(str(cls) for cls in classes)
+        self.class_index = {cls: i for i, cls in enumerate(self.classes)}
+        # closure[i, j]: class i is class j or one of its subclasses
+        self.closure = np.zeros((len(self.classes), len(self.classes)), dtype=np.uint8)
+        for cls in classes:
+            for sup in superclasses.get(cls, {cls}):
+                self.closure[self.class_index[str(cls)], self.class_index[str(sup)]] = 1
+        # Local name a class's instances are minted under, e.g. paper for res:paper_<key>
+        self.prefixes = {cls[len(str(RES)):]: i for cls, i in self.class_index.items() if cls.startswith(str(RES))}
+
+        # Each property must satisfy its own domain/range and those of its superproperties
+        superproperties = transitive_closure(tbox.subject_objects(RDFS.subPropertyOf))
+        properties = set(tbox.subjects(RDF.type, RDF.Property)) | set(superproperties)
+        self.domains = {}
+        self.ranges = {}
+        self.datatypes = {}
+        for prop in properties:
+            for sup in superproperties.get(prop, {prop}):
+                for cls in tbox.objects(sup, RDFS.domain):
+                    if str(cls) in self.class_index:
+                        self.domains.setdefault(str(prop), set()).add(self.class_index[str(cls)])
+                for cls in tbox.objects(sup, RDFS.range):
+                    if str(cls) in self.class_index:
+                        self.ranges.setdefault(str(prop), set()).add(self.class_index[str(cls)])
+                    elif str(cls).startswith(str(XSD)):
+                        self.datatypes.setdefault(str(prop), set()).add(str(cls))
+        self.properties = {str(prop) for prop in properties}
+
+class ValidationReport:
+    """Violation counts and example lines per (check, property or class)"""
+
+    def __init__(self, examples=3):
+        self.examples = examples
+        self.violations = {}
+        self.triples = 0
+
+    def add(self, check, name, mask, lines):
+        """Record the triples selected by a boolean mask as violations of a check"""
+        count = int(mask.sum())
+        if count:
+            found = self.violations.setdefault((check, name), [0, []])
+            found[0] += count
+            found[1] += [lines[i] for i in np.flatnonzero(mask)[:self.examples - len(found[1])]]
+
+    @property
+    def total(self):
+        return sum(count for count, _ in self.violations.values())
+
+    def print_report(self):
+        for check in CHECK_DESCRIPTIONS:
+            found = [(name, count, examples) for (c, name), (count, examples) in sorted(self.violations.items())
+                     if c == check]
+            if not found:
+                continue
+            print(f"   {check}: {CHECK_DESCRIPTIONS[check]}")
+            for name, count, examples in found:
+                print(f"      {name:<40} {count:>9}")
+                for example in examples:
+                    print(f"         e.g. {example.rstrip()[:160]}")
+
+def local_name(iri):
+    """res:paper for http://research.org/research#paper, xsd:integer for its XSD IRI, other IRIs as is"""
+    for prefix, namespace in (("res", RES), ("xsd", XSD)):
+        if iri.startswith(str(namespace)):
+            return f"{prefix}:{iri[len(str(namespace)):]}"
+    return iri
+
+def row_mask(rows, n):
+    """Boolean mask of length n selecting the given row numbers"""
+    mask = np.zeros(n, dtype=bool)
+    mask[rows] = True
+    return mask
+
+class TripleCodes:
+    """N-Triples lines as integer codes: subjects and resource objects index one resource table,
+    predicates their IRIs, literal objects their suffix ("" plain, ^^<datatype> or @lang; -1 for resources)"""
+
+    def __init__(self, subject_codes, object_codes, resources, predicate_codes, predicates, suffix_codes, suffixes,
+                 objects):
+        self.subject_codes = subject_codes
+        self.object_codes = object_codes
+        self.resources = resources
+        self.predicate_codes = predicate_codes
+        self.predicates = predicates
+        self.suffix_codes = suffix_codes
+        self.suffixes = suffixes
+        self.objects = objects
+
+    def invalid_forms(self, rows, pattern):
+        """Boolean mask over the given literal rows: lexical form (between the quotes) not matching the pattern"""
+        if isinstance(self.objects, np.ndarray):
+            forms = pd.Series([o[1:o.rfind('"')] for o in self.objects[rows]], dtype=object)
+            return ~forms.str.fullmatch(pattern).to_numpy(dtype=bool)
+        literals = pc.split_pattern(self.objects.take(pa.array(rows)), '"', max_splits=1, reverse=True)
+        forms = pc.utf8_slice_codeunits(pc.list_element(literals, 0), 1)
+        return ~pc.match_substring_regex(forms, f"^(?:{pattern})$").to_numpy(zero_copy_only=False)
+
+def resource_codes(subjects, objects, is_literal):
+    """(subject codes, object codes with -1 for literals, distinct resources)"""
+    codes, resources = pd.factorize(np.concatenate([subjects, objects[~is_literal]]))
+    object_codes = np.full(len(objects), -1, dtype=np.int64)
+    object_codes[~is_literal] = codes[len(subjects):]
+    return codes[:len(subjects)], object_codes, np.asarray(resources, dtype=object)
+
+def encode_triples_python(lines):
+    """TripleCodes of N-Triples lines, splitting them in Python"""
+    # A plain split is several times faster than a regex per line; N-Triples
+    # subjects and predicates contain no spaces, so the rest is the object.
+    # The collector is paused: it would rescan the millions of new lists
+    gc.disable()
+    try:
+        parts = [line.split(" ", 2) for line in lines]
+        subjects = np.array([part[0] for part in parts], dtype=object)
+        predicates = [part[1][1:-1] for part in parts]
+        objects = np.array([rest[:-3] if rest.endswith(" .\n") else rest.rstrip()[:-1].rstrip()
+                            for _, _, rest in parts], dtype=object)
+        del parts
+        suffixes = [o[o.rfind('"') + 1:] if o[:1] == '"' else None for o in objects]
+    finally:
+        gc.enable()
+    suffix_codes, suffixes = pd.factorize(pd.Series(suffixes, dtype=object))
+    predicate_codes, predicates = pd.factorize(pd.Series(predicates, dtype=object))
+    subject_codes, object_codes, resources = resource_codes(subjects, objects, suffix_codes >= 0)
+    return TripleCodes(subject_codes, object_codes, resources, predicate_codes, list(predicates),
+                       suffix_codes, list(suffixes), objects)
+
+def dictionary_codes(array):
+    """(codes with -1 for nulls, distinct values) of a pyarrow array"""
+    encoded = array.dictionary_encode()
+    return encoded.indices.fill_null(-1).to_numpy().astype(np.int64), encoded.dictionary.to_pylist()
+
+def encode_triples_arrow(lines):
+    """TripleCodes of N-Triples lines, split and dictionary-encoded by pyarrow compute kernels"""
+    parts = pc.split_pattern(pa.array(lines, type=pa.large_string()), " ", max_splits=2)
+    subjects, predicates = pc.list_element(parts, 0), pc.list_element(parts, 1)
+    # No subject, IRI, literal or language tag ends in "." or whitespace
+    objects = pc.ascii_rtrim(pc.list_element(parts, 2), characters=" \t\r\n.")
+    is_literal = pc.starts_with(objects, '"').to_numpy(zero_copy_only=False)
+    # The suffix follows the last quote (quotes inside a literal are escaped)
+    after_quote = pc.split_pattern(objects.filter(is_literal), '"', max_splits=1, reverse=True)
+    literal_codes, suffixes = dictionary_codes(pc.list_element(after_quote, 1))
+    suffix_codes = np.full(len(lines), -1, dtype=np.int64)
+    suffix_codes[is_literal] = literal_codes
+    resources = pa.concat_arrays([subjects, objects.filter(pa.array(~is_literal))])
+    codes, resources = dictionary_codes(resources)
+    object_codes = np.full(len(lines), -1, dtype=np.int64)
+    object_codes[~is_literal] = codes[len(lines):]
+    predicate_codes, predicates = dictionary_codes(pc.utf8_slice_codeunits(predicates, 1, -1))
+    return TripleCodes(codes[:len(lines)], object_codes, np.array(resources, dtype=object), predicate_codes,
+                       predicates, suffix_codes, suffixes, objects)
+
+def encode_triples(lines):
+    """TripleCodes of N-Triples lines, with pyarrow when it is installed"""
+    return encode_triples_arrow(lines) if HAVE_PYARROW else encode_triples_python(lines)
+
+class AboxValidator:
+    """Bulk domain, range, datatype and dangling-reference checks of N-Triples lines against a TBox"""
+
+    def __init__(self, tbox):
+        self.tables = TBoxTables(tbox)
+
+    def validate(self, lines, examples=3):
+        """Check every triple of an ABox given as N-Triples lines and return a ValidationReport"""
+        tables = self.tables
+        report = ValidationReport(examples)
+        lines = list(lines)
+        report.triples = len(lines)
+        codes = encode_triples(lines)
+        subject_codes, object_codes, resources = codes.subject_codes, codes.object_codes, codes.resources
+        predicate_codes, predicate_iris = codes.predicate_codes, codes.predicates
+        suffix_codes, suffixes = codes.suffix_codes, codes.suffixes
+        is_literal = suffix_codes >= 0
+        rdf_type = predicate_iris.index(str(RDF.type)) if str(RDF.type) in predicate_iris else -1
+        is_type = predicate_codes == rdf_type
+
+        # --- RESOURCE CLASSES --- #
+        # member[r, c]: resource r is an instance of class c (before superclasses)
+        member = np.zeros((len(resources), len(tables.classes)), dtype=np.uint8)
+        namespace = f"<{RES}"
+        minted_as = pd.Series([r.partition("_")[0][len(namespace):] if r.startswith(namespace) else None
+                               for r in resources], dtype=object).map(tables.prefixes)
+        minted = minted_as.notna().to_numpy()
+        member[minted, minted_as[minted].astype(np.int64).to_numpy()] = 1
+        typed = np.flatnonzero(is_type & ~is_literal)
+        class_of = pd.Series(resources[object_codes[typed]], dtype=object).str.slice(1, -1).map(tables.class_index)
+        known = class_of.notna().to_numpy()
+        report.add("unknown class", "rdf:type", row_mask(typed[~known], len(lines)), lines)
+        member[subject_codes[typed[known]], class_of[known].astype(np.int64).to_numpy()] = 1
+        member = (member @ tables.closure) > 0
+
+        # Described resources: subjects of a literal or rdf:type triple
+        described = np.zeros(len(resources), dtype=bool)
+        described[subject_codes[is_literal | is_type]] = True
+        untyped_subjects = ~member.any(axis=1)[subject_codes]
+        first_use = row_mask(np.unique(subject_codes, return_index=True)[1], len(lines))
+        report.add("untyped", "resources", untyped_subjects & first_use, lines)
+
+        # --- LITERAL DATATYPES --- #
+        def datatype_of(suffix):
+            if suffix.startswith("^^<"):
+                return suffix[3:-1]
+            return LANG_LITERAL if suffix.startswith("@") else PLAIN_LITERAL
+        # One entry per distinct suffix, plus None at -1 for resources
+        datatypes = np.array([datatype_of(suffix) for suffix in suffixes] + [None], dtype=object)[suffix_codes]
+        for datatype, pattern in LEXICAL_PATTERNS.items():
+            rows = np.flatnonzero(datatypes == datatype)
+            if len(rows):
+                report.add("lexical", local_name(datatype),
+                           row_mask(rows[codes.invalid_forms(rows, pattern)], len(lines)), lines)
+
+        # --- PER-PROPERTY CHECKS --- #
+        order = np.argsort(predicate_codes, kind="stable")
+        bounds = np.searchsorted(predicate_codes[order], np.arange(len(predicate_iris) + 1))
+        for code, iri in enumerate(predicate_iris):
+            rows = order[bounds[code]:bounds[code + 1]]
+            name = local_name(iri)
+            if code == rdf_type or iri in UNCHECKED_PROPERTIES:
+                continue
+            if iri not in tables.properties:
+                report.add("unknown property", name, row_mask(rows, len(lines)), lines)
+                continue
+            for cls in tables.domains.get(iri, ()):
+                report.add("domain", f"{name} ({local_name(tables.classes[cls])})",
+                           row_mask(rows[~member[subject_codes[rows], cls]], len(lines)), lines)
+            for cls in tables.ranges.get(iri, ()):
+                resource_rows = rows[~is_literal[rows]]
+                report.add("range", f"{name} ({local_name(tables.classes[cls])})",
+                           row_mask(np.concatenate([rows[is_literal[rows]],
+                                                      resource_rows[~member[object_codes[resource_rows], cls]]]),
+                                      len(lines)), lines)
+                report.add("dangling", name,
+                           row_mask(resource_rows[~described[object_codes[resource_rows]]], len(lines)), lines)
+            for datatype in tables.datatypes.get(iri, ()):
+                report.add("datatype", f"{name} ({local_name(datatype)})",
+                           row_mask(rows[datatypes[rows] != datatype], len(lines)), lines)
+        return report
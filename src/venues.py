@@ -0,0 +1,49 @@
+import pandas as pd
+
+# --- VENUE CATALOG --- #
+# Journals and conferences are read once from journals.csv and conferences.csv
+# and shared by the journal, volume, conference, workshop and edition stages,
+# so no stage has to look a venue up in another table or in the graph.
+
+class VenueCatalog:
+    """Venue ID -> name/url/type (plus issn for journals), built once from the venue CSVs"""
+
+    def __init__(self, journals_df, conferences_df):
+        # Every CSV row, for the stages that emit one set of triples per row
+        self.journal_rows = journals_df.assign(ID=journals_df['ID'].map(str))
+        self.conference_rows = conferences_df.assign(ID=conferences_df['ID'].map(str))
+        journals = self.journal_rows.drop_duplicates(subset='ID', keep='first').set_index('ID')
+        conferences = self.conference_rows.drop_duplicates(subset='ID', keep='first').set_index('ID')
+        self.journals = pd.DataFrame({
+            'name': journals['Name'].map(str).str.strip(),
+            'url': journals.get('url'),
+            'issn': journals.get('issn'),
+            'type': 'journal',
+        }, index=journals.index)
+        self.conferences = pd.DataFrame({
+            'name': conferences['Name'].map(str).str.strip(),
+            'url': conferences.get('url'),
+            'type': 'conference',
+        }, index=conferences.index)
+
+    def journal_ids(self):
+        """Distinct journal IDs in CSV order"""
+        return self.journals.index
+
+    def conference_ids(self):
+        """Distinct conference IDs in CSV order"""
+        return self.conferences.index
+
+    def is_journal(self, ids):
+        """Vectorized membership test for a column of venue IDs"""
+        return pd.Series(ids).isin(self.journals.index).to_numpy()
+
+    def is_conference(self, ids):
+        """Vectorized membership test for a column of venue IDs"""
+        return pd.Series(ids).isin(self.conferences.index).to_numpy()
+
+    def conference_name(self, conf_id):
+        """First name listed for a conference, or None"""
+        if conf_id in self.conferences.index:
+            return self.conferences.at[conf_id, 'name']
+        return None
@@ -0,0 +1,65 @@
+import gzip
+
+from rdflib import Literal, URIRef
+
+from terms import TripleColumns, literal_text
+
+# --- STREAMING WRITERS --- #
+# Write triples straight to disk as each stage produces them, instead of
+# accumulating the whole ABox in an rdflib Graph. Duplicate triples are not
+# filtered here; stores treat N-Triples input as a set on load.
+
+STREAM_FORMATS = {"nt": "N-Triples", "nq": "N-Quads"}
+
+def object_text(o):
+    """N-Triples form of an object; subjects and predicates are written with their own n3()"""
+    return literal_text(o) if isinstance(o, Literal) else o.n3()
+
+def nt_lines(triples):
+    """N-Triples lines (with trailing newline) for a batch of triples"""
+    if isinstance(triples, TripleColumns):
+        return list(triples.lines())
+    return [f"{s.n3()} {p.n3()} {object_text(o)} .\n" for s, p, o in triples]
+
+class TripleStreamWriter:
+    """Stream triples to an N-Triples or N-Quads file, optionally gzip-compressed"""
+
+    def __init__(self, path, format="nt", graph_iri=None, compress=False):
+        if format not in STREAM_FORMATS:
+            raise ValueError(f"Unsupported stream format '{format}', expected one of {list(STREAM_FORMATS)}")
+        if format == "nq" and graph_iri is None:
+            raise ValueError("N-Quads output needs a graph IRI")
+        self.path = path
+        self.format = format
+        self.graph = URIRef(graph_iri) if graph_iri else None
+        self.count = 0
+        if compress:
+            self.file = gzip.open(path, "wt", encoding="utf-8")
+        else:
+            self.file = open(path, "w", encoding="utf-8")
+
+    def write(self, triples):
+        """Write a batch of (s, p, o) triples and return how many were written"""
+        if isinstance(triples, TripleColumns):
+            lines = list(triples.lines(self.graph if self.format == "nq" else None))
+        elif self.format == "nq":
+            graph = self.graph.n3()
+            lines = [f"{s.n3()} {p.n3()} {object_text(o)} {graph} .\n" for s, p, o in triples]
+        else:
+            lines = nt_lines(triples)
+        self.file.writelines(lines)
+        self.count += len(lines)
+        return len(lines)
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+def stream_output_path(basename, format, compress):
+    """Output file name for a streamed ABox, e.g. abox.nt.gz"""
+    return f"{basename}.{format}" + (".gz" if compress else "")